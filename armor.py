@@ -1,6 +1,24 @@
+from item_index import build_alias_index, lookup_alias
+
 ArmourDict = {
     "None": 0,
     ("Light Armor", "LA", "Light"): 6,
     ("Heavy Armor", "HA", "Heavy"): 5,
     ("Plate Armor", "PA", "Plate","Full Plate Armor","Full Plate"): 4,
 }
+
+# Alias -> ArmourDict key
+ArmourIndex = build_alias_index(ArmourDict)
+
+
+def find_armour_key(armor):
+    """Return the ArmourDict key that contains the given armour name, or None.
+    Matching is case and whitespace insensitive.
+    """
+    return lookup_alias(ArmourIndex, armor)
+
+
+def get_armour_save(armor):
+    """Return the base armour save for an armour name, or None if unknown."""
+    key = lookup_alias(ArmourIndex, armor)
+    return None if key is None else ArmourDict[key]
@@ -0,0 +1,448 @@
+import math
+
+import numpy as np
+
+from character_model import Character, CharacterSpec, CombatState, as_spec
+from combat_simulations import determine_strike_order, get_strike_profile
+from dice import CommonDice, DiceSource, DuelDice, TiltedDice, TiltedDuelDice, as_generator
+from leadership import (
+    batch_leadership_test,
+    break_test_reroll,
+    break_test_target,
+    psychology_reroll,
+    takes_fear_test,
+    takes_terror_test,
+)
+
+# z for a two-sided 95% confidence interval
+Z_95 = 1.959964
+
+
+def _d6(rng: np.random.Generator | DiceSource | DuelDice | TiltedDuelDice, size, phase: str = "d6", used: np.ndarray | None = None) -> np.ndarray:
+    """Roll a block of D6s as a small integer array.
+
+    phase names the roll for CommonDice and TiltedDice; used marks the dice
+    whose values matter (e.g. wound rolls of hits), which TiltedDice weight.
+    A DiceSource rolls through roll_many, so its rolls count the dice.
+    """
+    if isinstance(rng, (DuelDice, TiltedDuelDice)):
+        return rng.d6(size, phase, used)
+    if isinstance(rng, DiceSource):
+        return rng.roll_many(size)
+    return rng.integers(1, 7, size=size, dtype=np.int8)
+
+
+def _d6_where(rng: np.random.Generator | DiceSource | DuelDice | TiltedDuelDice, mask: np.ndarray, phase: str) -> np.ndarray:
+    """Roll a D6 for every set entry of mask, in mask order.
+
+    A Generator rolls just those dice. DuelDice roll the full shape and keep
+    the masked entries, so each position of mask always gets the same die.
+    """
+    if isinstance(rng, (DuelDice, TiltedDuelDice)):
+        return rng.d6(mask.shape, phase, mask)[mask]
+    return _d6(rng, int(mask.sum()))
+
+
+def _duel_dice(rng: np.random.Generator | CommonDice | TiltedDice, index: np.ndarray, *point):
+    """The rng to use for the duels in index at one point of the duel (CommonDice and TiltedDice need to know which)."""
+    return rng.view(index, *point) if isinstance(rng, (CommonDice, TiltedDice)) else rng
+
+
+def batch_strike(profile: dict, num_duels: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Resolve one strike in many independent duels at once.
+
+    Mirrors OneRoundMeleeCombat followed by resolve_melee_result, with every
+    die of a phase drawn as one (num_duels, attacks) array.
+
+    Args:
+        profile: Strike profile from get_strike_profile
+        num_duels: Number of duels in which this strike happens
+        rng: NumPy random Generator (or DiceSource or DuelDice) used for all dice
+
+    Returns:
+        tuple containing:
+        - np.ndarray: Wounds suffered by the defender in each duel (after all saves)
+        - np.ndarray: Whether the defender was slain outright by a Killing Blow
+    """
+    wounds = np.zeros(num_duels, dtype=np.int16)
+    slain = np.zeros(num_duels, dtype=bool)
+    attacks = profile['attacks']
+    if num_duels == 0 or not attacks or profile['to_wound'] is None:
+        return wounds, slain
+
+    # Roll to hit, rerolling 1s and (Hatred) failed hits
+    to_hit = profile['to_hit']
+    rolls = _d6(rng, (num_duels, attacks), "hit")
+    if profile['reroll_ones']:
+        ones = rolls == 1
+        rolls[ones] = _d6_where(rng, ones, "hit_reroll")
+    hits = rolls >= to_hit
+    if profile['hatred']:
+        missed = ~hits
+        rerolls = _d6_where(rng, missed, "hatred")
+        if profile['reroll_ones']:
+            ones = rerolls == 1
+            missed_ones = missed.copy()
+            missed_ones[missed] = ones
+            rerolls[ones] = _d6_where(rng, missed_ones, "hatred_reroll")
+        hits[missed] = rerolls >= to_hit
+    return batch_resolve_hits(profile, hits, rng)
+
+
+def batch_resolve_hits(profile: dict, hits: np.ndarray, rng: np.random.Generator | DiceSource) -> tuple[np.ndarray, np.ndarray]:
+    """Roll to wound and take every save for a block of hits.
+
+    The part of batch_strike after the hit rolls, shared with the shooting
+    resolver so shots and blows go through the same wound, armour, ward and
+    regeneration pipeline.
+
+    Args:
+        profile: Strike profile from get_strike_profile (or a shooting profile)
+        hits: (num_duels, attacks) boolean array of successful hits
+        rng: NumPy random Generator (or DiceSource or DuelDice) used for all dice
+
+    Returns:
+        tuple containing:
+        - np.ndarray: Wounds suffered by the defender in each duel (after all saves)
+        - np.ndarray: Whether the defender was slain outright by a Killing Blow
+    """
+    num_duels = hits.shape[0]
+    slain = np.zeros(num_duels, dtype=bool)
+    if profile['to_wound'] is None:
+        return np.zeros(num_duels, dtype=np.int16), slain
+
+    # Roll to wound; Killing Blow on any successful 6
+    wound_rolls = _d6(rng, hits.shape, "wound", hits)
+    wounded = hits & (wound_rolls >= profile['to_wound'])
+    killing_blow = None
+    if profile['killing_blow']:
+        killing_blow = (wounded & (wound_rolls == 6)).any(axis=1)
+
+    # Armour saves, with Armor Bane on wound rolls of 6
+    save_target = profile['save_target'] or 7
+    save_target_ab = profile['save_target_ab'] or 7
+    if min(save_target, save_target_ab) <= 6:
+        targets = np.where(wound_rolls == 6, save_target_ab, save_target)
+        wounded &= _d6(rng, hits.shape, "armour", wounded) < targets
+
+    ward_target = profile['ward_target']
+    regen_target = profile['regen_target']
+
+    # Killing Blow: ward save, then regeneration, else instant death
+    if killing_blow is not None and killing_blow.any():
+        kb_index = np.flatnonzero(killing_blow)
+        survives = np.zeros(kb_index.size, dtype=bool)
+        if ward_target is not None:
+            survives |= _d6_where(rng, killing_blow, "killing_blow_ward") >= ward_target
+        if regen_target is not None:
+            pending = ~survives
+            pending_duels = np.zeros(num_duels, dtype=bool)
+            pending_duels[kb_index[pending]] = True
+            survives[pending] = _d6_where(rng, pending_duels, "killing_blow_regeneration") >= regen_target
+        slain[kb_index[~survives]] = True
+
+    # Ward then regeneration saves against every unsaved wound
+    if ward_target is not None:
+        wounded &= _d6(rng, hits.shape, "ward", wounded) < ward_target
+    if regen_target is not None:
+        wounded &= _d6(rng, hits.shape, "regeneration", wounded) < regen_target
+
+    return wounded.sum(axis=1).astype(np.int16), slain
+
+
+def _strike_profile(fighters: dict, attacker_id: int, first_round: bool, feared: tuple[bool, bool]) -> dict:
+    """Strike profile with Weapon Skill 1 for any fighter that failed a Fear test."""
+    for fighter_id, fighter in fighters.items():
+        fighter.WeaponSkill = 1 if feared[fighter_id - 1] else fighter.spec.WeaponSkill
+    try:
+        return get_strike_profile(fighters[attacker_id], fighters[3 - attacker_id], is_first_round=first_round)
+    finally:
+        for fighter in fighters.values():
+            fighter.WeaponSkill = fighter.spec.WeaponSkill
+
+
+def batch_combat_simulation(
+    character_1: Character | CharacterSpec,
+    character_2: Character | CharacterSpec,
+    num_duels: int,
+    rounds: int = 2,
+    rng: DiceSource | np.random.Generator | CommonDice | int | None = None,
+    leadership: bool = False,
+) -> dict[str, np.ndarray]:
+    """Simulate many independent duels between two characters at once.
+
+    Follows the same combat flow as combat_simulation, but resolves each
+    strike for all still-undecided duels with NumPy arrays of dice.
+
+    Args:
+        character_1: First combatant
+        character_2: Second combatant
+        num_duels: Number of independent duels to simulate
+        rounds: Maximum number of combat rounds
+        rng: DiceSource or NumPy random Generator, or a seed for a new one;
+            or CommonDice, to roll the same dice as another matchup run with them,
+            or TiltedDice for importance sampling (see rare_events)
+        leadership: Whether Terror, Fear and break tests apply (see combat_simulation)
+
+    Returns:
+        dict containing one entry per duel:
+        - winner (np.ndarray[int8]): 1 or 2 for the winning character, 0 for a stalemate
+        - rounds (np.ndarray[int8]): Number of rounds fought
+        - wounds_1 (np.ndarray[int16]): Wounds character_1 has left
+        - wounds_2 (np.ndarray[int16]): Wounds character_2 has left
+        - killing_blow (np.ndarray[bool]): Whether the duel ended on a Killing Blow
+        - fled (np.ndarray[bool]): Whether the duel ended with the loser fleeing
+        - first_round_leader (np.ndarray[int8]): 1 or 2 for the character that
+          caused more wounds in the first round, 0 if level (or no round was fought)
+    """
+    rng = rng if isinstance(rng, (CommonDice, TiltedDice)) else as_generator(rng)
+    fighter_1 = CombatState(as_spec(character_1))
+    fighter_2 = CombatState(as_spec(character_2))
+    fighters = {1: fighter_1, 2: fighter_2}
+
+    wounds = {
+        1: np.full(num_duels, fighter_1.Wounds, dtype=np.int16),
+        2: np.full(num_duels, fighter_2.Wounds, dtype=np.int16),
+    }
+    winner = np.zeros(num_duels, dtype=np.int8)
+    rounds_fought = np.zeros(num_duels, dtype=np.int8)
+    killing_blow = np.zeros(num_duels, dtype=bool)
+    fled = np.zeros(num_duels, dtype=bool)
+    first_round_leader = np.zeros(num_duels, dtype=np.int8)
+    active = np.ones(num_duels, dtype=bool)
+
+    # Strike order and strike profiles don't change between rounds, apart from
+    # first round rules and failed Fear tests
+    order, simultaneous_combat = determine_strike_order(fighter_1, fighter_2, verbose=False)
+    sides = [(1 if attacker is fighter_1 else 2, 2 if attacker is fighter_1 else 1) for attacker, _ in order]
+    fear_tests = {
+        fighter_id: leadership and takes_fear_test(fighters[fighter_id], fighters[3 - fighter_id])
+        for fighter_id in (1, 2)
+    }
+    fear_combos = [(f1, f2) for f1 in (False, fear_tests[1]) for f2 in (False, fear_tests[2])]
+    fear_combos = list(dict.fromkeys(fear_combos))
+    profiles = {
+        (first_round, attacker_id, feared): _strike_profile(fighters, attacker_id, first_round, feared)
+        for first_round in (True, False)
+        for attacker_id, _ in sides
+        for feared in fear_combos
+    }
+    feared = {1: np.zeros(num_duels, dtype=bool), 2: np.zeros(num_duels, dtype=bool)}
+
+    def strike(round_number: int, attacker_id: int, index: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        first_round = round_number == 0
+        if len(fear_combos) == 1:
+            profile = profiles[(first_round, attacker_id, fear_combos[0])]
+            return batch_strike(profile, index.size, _duel_dice(rng, index, round_number, "strike", attacker_id))
+        dealt = np.zeros(index.size, dtype=np.int16)
+        slain = np.zeros(index.size, dtype=bool)
+        for combo in fear_combos:
+            group = (feared[1][index] == combo[0]) & (feared[2][index] == combo[1])
+            if group.any():
+                dice = _duel_dice(rng, index[group], round_number, "strike", attacker_id)
+                dealt[group], slain[group] = batch_strike(profiles[(first_round, attacker_id, combo)], int(group.sum()), dice)
+        return dealt, slain
+
+    if leadership:
+        # Terror: a failed test means fleeing before a blow is struck
+        for fighter_id in (1, 2):
+            fighter, enemy_id = fighters[fighter_id], 3 - fighter_id
+            if takes_terror_test(fighter, fighters[enemy_id]):
+                dice = _duel_dice(rng, np.arange(num_duels), 0, "terror", fighter_id)
+                flees = ~batch_leadership_test(fighter.Leadership, num_duels, dice, psychology_reroll(fighter))
+                winner[flees] = enemy_id
+                fled |= flees
+                active &= ~flees
+
+    for r in range(rounds):
+        if not active.any():
+            break
+        rounds_fought[active] = r + 1
+        start_index = np.flatnonzero(active)
+        wounds_at_start = {fighter_id: wounds[fighter_id][start_index] for fighter_id in (1, 2)}
+        for fighter_id in (1, 2):
+            if fear_tests[fighter_id]:
+                fighter = fighters[fighter_id]
+                feared[fighter_id][start_index] = ~batch_leadership_test(
+                    fighter.Leadership, start_index.size, _duel_dice(rng, start_index, r, "fear", fighter_id),
+                    psychology_reroll(fighter),
+                )
+
+        if simultaneous_combat:
+            index = np.flatnonzero(active)
+            strikes = [
+                (attacker_id, defender_id, *strike(r, attacker_id, index))
+                for attacker_id, defender_id in sides
+            ]
+            for attacker_id, defender_id, dealt, slain in strikes:
+                remaining = np.maximum(0, wounds[defender_id][index] - dealt)
+                remaining[slain] = 0
+                wounds[defender_id][index] = remaining
+                killing_blow[index[slain]] = True
+            c1_slain = wounds[1][index] <= 0
+            c2_slain = wounds[2][index] <= 0
+            winner[index[c2_slain & ~c1_slain]] = 1
+            winner[index[c1_slain & ~c2_slain]] = 2
+            active[index[c1_slain | c2_slain]] = False
+        else:
+            for attacker_id, defender_id in sides:
+                index = np.flatnonzero(active)
+                dealt, slain = strike(r, attacker_id, index)
+                remaining = np.maximum(0, wounds[defender_id][index] - dealt)
+                remaining[slain] = 0
+                wounds[defender_id][index] = remaining
+                killing_blow[index[slain]] = True
+                defeated = remaining <= 0
+                winner[index[defeated]] = attacker_id
+                active[index[defeated]] = False
+
+        # Wounds caused this round, by duel of start_index
+        caused_1 = wounds_at_start[2] - wounds[2][start_index]
+        caused_2 = wounds_at_start[1] - wounds[1][start_index]
+        if r == 0:
+            first_round_leader[start_index[caused_1 > caused_2]] = 1
+            first_round_leader[start_index[caused_2 > caused_1]] = 2
+
+        if leadership:
+            # Break test for the fighter that lost the round on wounds caused
+            standing = active[start_index]
+            index = start_index[standing]
+            caused_1, caused_2 = caused_1[standing], caused_2[standing]
+            for loser_id, lost_by in ((1, caused_2 - caused_1), (2, caused_1 - caused_2)):
+                lost = lost_by > 0
+                if not lost.any():
+                    continue
+                loser = fighters[loser_id]
+                target = break_test_target(loser, loser.Leadership, lost_by[lost])
+                dice = _duel_dice(rng, index[lost], r, "break", loser_id)
+                flees = index[lost][~batch_leadership_test(target, int(lost.sum()), dice, break_test_reroll(loser))]
+                winner[flees] = 3 - loser_id
+                fled[flees] = True
+                active[flees] = False
+
+    # No decisive winner after rounds: most wounds remaining wins
+    index = np.flatnonzero(active)
+    winner[index[wounds[1][index] > wounds[2][index]]] = 1
+    winner[index[wounds[2][index] > wounds[1][index]]] = 2
+
+    return {
+        'winner': winner,
+        'rounds': rounds_fought,
+        'wounds_1': wounds[1],
+        'wounds_2': wounds[2],
+        'killing_blow': killing_blow,
+        'fled': fled,
+        'first_round_leader': first_round_leader,
+    }
+
+
+def summarize_batch(results: dict[str, np.ndarray]) -> dict[str, float]:
+    """Summarize batch_combat_simulation results as win rates.
+
+    Returns:
+        dict with the fraction of duels won by character_1, won by
+        character_2, ended in a stalemate, ended by a Killing Blow, and
+        ended with the loser fleeing
+    """
+    winner = results['winner']
+    num_duels = max(1, winner.size)
+    return {
+        'character_1': np.count_nonzero(winner == 1) / num_duels,
+        'character_2': np.count_nonzero(winner == 2) / num_duels,
+        'stalemate': np.count_nonzero(winner == 0) / num_duels,
+        'killing_blow': np.count_nonzero(results['killing_blow']) / num_duels,
+        'fled': np.count_nonzero(results['fled']) / num_duels,
+    }
+
+
+def win_rate_interval(wins: int, games: int, z: float = Z_95) -> tuple[float, float, float]:
+    """Win rate with its Wilson score confidence interval.
+
+    Returns:
+        tuple containing:
+        - float: Win rate (NaN if no games were played)
+        - float: Lower bound of the interval
+        - float: Upper bound of the interval
+    """
+    if games <= 0:
+        return math.nan, 0.0, 1.0
+    p = wins / games
+    denominator = 1 + z * z / games
+    centre = (p + z * z / (2 * games)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denominator
+    return p, max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+def adaptive_combat_simulation(
+    character_1: Character | CharacterSpec,
+    character_2: Character | CharacterSpec,
+    half_width: float = 0.01,
+    max_duels: int = 1000000,
+    batch_size: int = 1000,
+    rounds: int = 2,
+    rng: DiceSource | np.random.Generator | int | None = None,
+    leadership: bool = False,
+    z: float = Z_95,
+) -> dict[str, float | int | bool]:
+    """Simulate duels in batches until character_1's win rate is known to within half_width.
+
+    After each batch the Wilson interval of character_1's win rate is
+    checked. Later batches are sized from the number of duels the current
+    estimate says are still needed (at least batch_size, and never more than
+    have been run so far), so lopsided matchups stop after a few hundred
+    duels while close ones keep going up to max_duels.
+
+    Args:
+        character_1: First combatant
+        character_2: Second combatant
+        half_width: Target half-width of the confidence interval
+        max_duels: Budget; stop after this many duels even if not converged
+        batch_size: Duels in the first batch, and the smallest later batch
+        rounds: Maximum number of combat rounds
+        rng: DiceSource or NumPy random Generator, or a seed for a new one
+        leadership: Whether Terror, Fear and break tests apply
+        z: Normal quantile of the interval (1.96 for 95%)
+
+    Returns:
+        dict with the same win rates as summarize_batch, plus:
+        - samples (int): Duels simulated
+        - ci_low (float): Lower bound of character_1's win rate
+        - ci_high (float): Upper bound of character_1's win rate
+        - half_width (float): Half-width reached
+        - converged (bool): Whether half_width was reached within max_duels
+    """
+    if max_duels < 1 or batch_size < 1:
+        raise ValueError("max_duels and batch_size must be positive")
+    if not half_width > 0:
+        raise ValueError("half_width must be positive")
+    rng = as_generator(rng)
+    counts = {'character_1': 0, 'character_2': 0, 'stalemate': 0, 'killing_blow': 0, 'fled': 0}
+    samples = 0
+    size = min(batch_size, max_duels)
+    while True:
+        results = batch_combat_simulation(character_1, character_2, size, rounds=rounds, rng=rng, leadership=leadership)
+        winner = results['winner']
+        counts['character_1'] += int(np.count_nonzero(winner == 1))
+        counts['character_2'] += int(np.count_nonzero(winner == 2))
+        counts['stalemate'] += int(np.count_nonzero(winner == 0))
+        counts['killing_blow'] += int(np.count_nonzero(results['killing_blow']))
+        counts['fled'] += int(np.count_nonzero(results['fled']))
+        samples += size
+
+        p, ci_low, ci_high = win_rate_interval(counts['character_1'], samples, z)
+        reached = (ci_high - ci_low) / 2
+        if reached <= half_width or samples >= max_duels:
+            break
+        # Normal approximation of the total needed at the current estimate
+        needed = math.ceil(z * z * max(p * (1 - p), 1 / samples) / (half_width * half_width))
+        size = min(max_duels - samples, max(batch_size, min(samples, needed - samples)))
+
+    summary = {key: int(count) / samples for key, count in counts.items()}
+    summary.update({
+        'samples': samples,
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'half_width': reached,
+        'converged': reached <= half_width,
+    })
+    return summary
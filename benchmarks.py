@@ -0,0 +1,296 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from character_model import Character, CombatState, as_spec
+from combat_simulations import (
+    OneRoundMeleeCombat,
+    RollArmorSave,
+    RollToHit,
+    RollToWound,
+    attempt_ward_save,
+    combat_simulation,
+)
+from dice import DiceSource
+from special_rules import DragonArmour
+
+# Representative duels: (character_1 kwargs, character_2 kwargs)
+MATCHUPS = {
+    "noble_great_weapon_vs_black_orc_boss": (
+        dict(name="Noble", faction_type="High Elves", profile_name="Noble",
+             Weapon="Great Weapon", Armor="Heavy Armor"),
+        dict(name="Black Orc Boss", faction_type="Orcs", profile_name="Black Orc Boss",
+             Weapon="Great Weapon", Armor="Heavy Armor"),
+    ),
+    # Killing Blow attacker against a warded defender
+    "korhil_chayal_vs_prince_dragon_armour": (
+        dict(name="Korhil", faction_type="High Elves", profile_name="Korhil", Weapon="Chayal"),
+        dict(name="Prince", faction_type="High Elves", profile_name="Prince",
+             Weapon="Hand Weapon", Armor="Heavy Armor", Shield="Shield", SpecialRules=[DragonArmour]),
+    ),
+}
+
+
+def _roll_to_hit(kwargs_1, kwargs_2, dice):
+    attacker, defender = Character(**kwargs_1), Character(**kwargs_2)
+    return lambda: RollToHit(attacker, defender, verbose=False, is_first_round=True, dice=dice)
+
+
+def _roll_to_wound(kwargs_1, kwargs_2, dice):
+    attacker, defender = Character(**kwargs_1), Character(**kwargs_2)
+    return lambda: RollToWound(attacker, defender, attacker.Attacks, verbose=False, dice=dice)
+
+
+def _roll_armor_save(kwargs_1, kwargs_2, dice):
+    attacker, defender = Character(**kwargs_1), Character(**kwargs_2)
+    return lambda: RollArmorSave(attacker, defender, attacker.Attacks, verbose=False, dice=dice)
+
+
+def _attempt_ward_save(kwargs_1, kwargs_2, dice):
+    defender = Character(**kwargs_2)
+    return lambda: attempt_ward_save(defender, 3, verbose=False, dice=dice)
+
+
+def _one_round_melee_combat(kwargs_1, kwargs_2, dice):
+    attacker = CombatState(as_spec(Character(**kwargs_1)))
+    defender = CombatState(as_spec(Character(**kwargs_2)))
+    return lambda: OneRoundMeleeCombat(attacker, defender, verbose=False, dice=dice)
+
+
+def _combat_simulation(kwargs_1, kwargs_2, dice):
+    spec_1, spec_2 = Character(**kwargs_1).to_spec(), Character(**kwargs_2).to_spec()
+    return lambda: combat_simulation(spec_1, spec_2, rounds=2, verbose=False, dice=dice)
+
+
+def _character_construction(kwargs_1, kwargs_2, dice):
+    return lambda: Character(**kwargs_1)
+
+
+# Benchmark name -> setup(kwargs_1, kwargs_2, dice) returning the call to time
+BENCHMARKS = {
+    "RollToHit": _roll_to_hit,
+    "RollToWound": _roll_to_wound,
+    "RollArmorSave": _roll_armor_save,
+    "attempt_ward_save": _attempt_ward_save,
+    "OneRoundMeleeCombat": _one_round_melee_combat,
+    "combat_simulation": _combat_simulation,
+    "Character": _character_construction,
+}
+
+
+def time_call(call, repeat: int = 5, min_time: float = 0.2) -> dict[str, float]:
+    """Time a zero-argument call.
+
+    The number of calls per repeat is calibrated so one repeat takes at least
+    min_time seconds; the fastest repeat gives the throughput, being the
+    least disturbed by other load on the machine.
+
+    Returns:
+        dict with calls_per_sec (best repeat), median_us and best_us per call
+    """
+    timer = timeit.Timer(call)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    best = min(times)
+    return {
+        "calls_per_sec": 1.0 / best,
+        "best_us": best * 1e6,
+        "median_us": statistics.median(times) * 1e6,
+    }
+
+
+def run_benchmarks(
+    names: list[str] | None = None,
+    matchups: list[str] | None = None,
+    repeat: int = 5,
+    min_time: float = 0.2,
+    seed: int = 0,
+    verbose: bool = True,
+) -> dict:
+    """Run benchmarks across matchups.
+
+    Args:
+        names: Benchmarks to run (defaults to all of BENCHMARKS)
+        matchups: Matchups to run them on (defaults to all of MATCHUPS)
+        repeat: Timed repeats per benchmark
+        min_time: Minimum seconds per repeat
+        seed: Dice seed, so every run times the same sequence of rolls
+        verbose: Whether to print each result as it completes
+
+    Returns:
+        dict with run metadata under "meta" and per-benchmark timings under
+        "results", keyed "<benchmark>/<matchup>"
+    """
+    names = list(BENCHMARKS) if names is None else names
+    matchups = list(MATCHUPS) if matchups is None else matchups
+    results = {}
+    for matchup in matchups:
+        kwargs_1, kwargs_2 = MATCHUPS[matchup]
+        for name in names:
+            call = BENCHMARKS[name](kwargs_1, kwargs_2, DiceSource(seed))
+            key = f"{name}/{matchup}"
+            results[key] = time_call(call, repeat=repeat, min_time=min_time)
+            if verbose:
+                print(f"{key:<60} {results[key]['calls_per_sec']:>12,.0f} calls/s  {results[key]['best_us']:>9.2f} us")
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+            "min_time": min_time,
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.1) -> list[dict]:
+    """Compare two benchmark runs.
+
+    Args:
+        baseline: Output of run_benchmarks (or its saved JSON) to compare against
+        current: Output of run_benchmarks for the code under test
+        threshold: Fractional throughput drop treated as noise (0.1 = 10%)
+
+    Returns:
+        list[dict]: One entry per benchmark present in both runs, with the
+        baseline and current calls_per_sec, their ratio, and whether the drop
+        exceeds the threshold (regression)
+    """
+    rows = []
+    for key, base in baseline["results"].items():
+        if key not in current["results"]:
+            continue
+        ratio = current["results"][key]["calls_per_sec"] / base["calls_per_sec"]
+        rows.append({
+            "benchmark": key,
+            "baseline": base["calls_per_sec"],
+            "current": current["results"][key]["calls_per_sec"],
+            "ratio": ratio,
+            "regression": ratio < 1.0 - threshold,
+        })
+    return rows
+
+
+# Cold-start import budgets in ms for the modules short jobs and pool workers
+# import; none of them may pull in NumPy before it is needed
+IMPORT_BUDGETS = {
+    "character_model": 25.0,
+    "combat_simulations": 50.0,
+}
+
+
+def measure_import(module: str, repeat: int = 5) -> dict[str, float | bool]:
+    """Time a cold import of module in fresh interpreters.
+
+    Uses -X importtime, so interpreter startup is left out and only the
+    module and everything it imports are counted.
+
+    Returns:
+        dict with best_ms and median_ms over the repeats, and whether the
+        import loaded NumPy
+    """
+    times = []
+    loads_numpy = False
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import sys, {module}; print('numpy' in sys.modules)"],
+            capture_output=True, text=True, check=True,
+        )
+        # The last importtime line is the module itself: "import time: self | cumulative | name"
+        last = [line for line in completed.stderr.splitlines() if line.startswith("import time:")][-1]
+        times.append(int(last.split("|")[1]) / 1000)
+        loads_numpy = completed.stdout.strip() == "True"
+    return {"best_ms": min(times), "median_ms": statistics.median(times), "numpy": loads_numpy}
+
+
+def check_import_budgets(budgets: dict[str, float] | None = None, repeat: int = 5) -> list[dict]:
+    """Measure every module in budgets and flag those over budget or loading NumPy.
+
+    Returns:
+        list[dict]: One entry per module, with its measure_import timings,
+        budget_ms, and ok (False if the best time is over budget or NumPy was loaded)
+    """
+    budgets = IMPORT_BUDGETS if budgets is None else budgets
+    rows = []
+    for module, budget_ms in budgets.items():
+        timing = measure_import(module, repeat)
+        rows.append({
+            "module": module,
+            **timing,
+            "budget_ms": budget_ms,
+            "ok": timing["best_ms"] <= budget_ms and not timing["numpy"],
+        })
+    return rows
+
+
+def _load(path: str) -> dict:
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the combat engine and compare against a baseline.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and write the results as JSON")
+    run_parser.add_argument("--output", default="benchmark_baseline.json", help="JSON file for the results")
+
+    compare_parser = subparsers.add_parser("compare", help="compare against a baseline, exiting 1 on regressions")
+    compare_parser.add_argument("baseline", help="baseline JSON from 'run'")
+    compare_parser.add_argument("current", nargs="?", help="results JSON to check (default: run the benchmarks now)")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="throughput drop treated as noise (default 0.1)")
+
+    imports_parser = subparsers.add_parser("imports", help="check cold-start import times, exiting 1 if over budget")
+    imports_parser.add_argument("--budget", action="append", metavar="MODULE=MS",
+                                help="import budget in ms (repeatable; default: IMPORT_BUDGETS)")
+    imports_parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module")
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--benchmark", action="append", choices=list(BENCHMARKS), help="benchmark to run (repeatable)")
+        sub.add_argument("--matchup", action="append", choices=list(MATCHUPS), help="matchup to run (repeatable)")
+        sub.add_argument("--repeat", type=int, default=5, help="timed repeats per benchmark")
+        sub.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per repeat")
+    args = parser.parse_args(argv)
+
+    if args.command == "imports":
+        budgets = None
+        if args.budget:
+            budgets = {module: float(ms) for module, ms in (budget.split("=") for budget in args.budget)}
+        rows = check_import_budgets(budgets, args.repeat)
+        for row in rows:
+            flag = "" if row["ok"] else ("LOADS NUMPY" if row["numpy"] else "OVER BUDGET")
+            print(f"{row['module']:<30} {row['best_ms']:>8.1f} ms (median {row['median_ms']:.1f}, budget {row['budget_ms']:.0f})  {flag}")
+        return 0 if all(row["ok"] for row in rows) else 1
+
+    if args.command == "compare" and args.current:
+        current = _load(args.current)
+    else:
+        current = run_benchmarks(args.benchmark, args.matchup, repeat=args.repeat, min_time=args.min_time)
+
+    if args.command == "run":
+        with open(args.output, "w") as handle:
+            json.dump(current, handle, indent=2)
+        print(f"Wrote {len(current['results'])} results to {args.output}")
+        return 0
+
+    rows = compare_results(_load(args.baseline), current, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['benchmark']:<60} {row['baseline']:>12,.0f} -> {row['current']:>12,.0f} calls/s  {row['ratio']:>6.2f}x  {flag}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%} out of {len(rows)} benchmarks")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
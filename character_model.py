@@ -1,10 +1,178 @@
-import numpy as np
+from armor import get_armour_save
+from elven_honors import apply_elven_honors
+from faction_profiles import RACE_NAMES, FactionProfiles
+from special_rules import (
+    BlessingsofAsuryan,
+    DragonArmour,
+    Ethereal,
+    Fear,
+    FirstRoundOnly,
+    FlamingAttacks,
+    Frenzy,
+    ImmuneToPsychology,
+    ImproveArmor1InCombat,
+    ImproveArmor2InShooting,
+    IthilmarWeapons,
+    KillingBlow,
+    KillingBlow6,
+    Magic,
+    RequiresTwoHands,
+    RerollHits1,
+    StrikeFirst,
+    StrikeLast,
+    Stubborn,
+    Terror,
+    ValourOfAges,
+    Veteran,
+    WitnesstoDestiny,
+)
+from weapons import find_weapon_key, get_weapon_special_rules, get_weapon_stats
 
-from armor import *
-from elven_honors import *
-from faction_profiles import *
-from magic_items import *
-from weapons import get_weapon_special_rules
+
+class CompiledRules:
+    """Special rules of a character, its weapon and its equipment, parsed once.
+
+    Built by compile_rules and cached on Character.compiled_rules, so the
+    die-rolling functions read plain fields instead of scanning rule strings.
+    """
+    __slots__ = (
+        'rules', 'reroll_hits', 'hatred', 'armour_bane', 'killing_blow',
+        'ward', 'ward_vs_flaming', 'regeneration', 'extra_attacks', 'armour_save', 'armour_save_shooting',
+        'strike_first', 'strike_last', 'is_magical', 'is_flaming', 'is_ethereal',
+        'weapon_strength', 'weapon_ap', 'weapon_first_round_only',
+        'causes_fear', 'causes_terror', 'immune_to_psychology', 'stubborn', 'veteran', 'valour_of_ages',
+    )
+
+    def __init__(self):
+        self.rules = ()                       # Character rules followed by weapon rules
+        self.reroll_hits = None               # RerollHits1 or IthilmarWeapons if 1s to hit are rerolled
+        self.hatred = None                    # "all", a lower-case race/name, or None
+        self.armour_bane = 0                  # Extra AP on wound rolls of 6
+        self.killing_blow = None              # Wound roll needed for a Killing Blow
+        self.ward = None                      # Best ward save
+        self.ward_vs_flaming = None           # Best ward save against Flaming attacks
+        self.regeneration = None              # Best regeneration save
+        self.extra_attacks = 0                # +XA weapon rules and Frenzy
+        self.armour_save = None               # Armour save incl. shield and AH bonuses, None if no/unknown armour
+        self.armour_save_shooting = None      # Armour save against shooting (no combat-only bonuses)
+        self.strike_first = False
+        self.strike_last = False
+        self.is_magical = False
+        self.is_flaming = False
+        self.is_ethereal = False
+        self.weapon_strength = None           # Weapon strength bonus
+        self.weapon_ap = 0                    # Weapon armour piercing
+        self.weapon_first_round_only = False  # Weapon bonuses only apply in the first round
+        self.causes_fear = False              # Fear, or Terror (which includes Fear)
+        self.causes_terror = False
+        self.immune_to_psychology = False     # No Fear, Terror or Panic tests
+        self.stubborn = False                 # Break tests ignore the combat result
+        self.veteran = False                  # Reroll failed Leadership tests
+        self.valour_of_ages = False           # Reroll failed Fear, Terror and Panic tests
+
+
+def compile_rules(special_rules, weapon=None, armor=None, shield=None) -> CompiledRules:
+    """Parse character, weapon and equipment rules into a CompiledRules.
+
+    Args:
+        special_rules: The character's SpecialRules (including honor rules)
+        weapon: Name of the equipped weapon
+        armor: Name of the worn armour, or None
+        shield: Shield, or None
+
+    Returns:
+        CompiledRules: The parsed flags and values
+    """
+    compiled = CompiledRules()
+    character_rules = [str(rule) for rule in special_rules] if special_rules else []
+    strength_bonus, ap_bonus, weapon_rules = get_weapon_stats(weapon, raise_on_missing=False)
+    weapon_rules = [str(rule) for rule in weapon_rules]
+    rules = character_rules + weapon_rules
+    compiled.rules = tuple(rules)
+    compiled.weapon_strength = strength_bonus
+    compiled.weapon_ap = ap_bonus or 0
+    compiled.weapon_first_round_only = FirstRoundOnly in weapon_rules
+
+    # Rerolls to hit: RerollHits1 with any weapon, Ithilmar Weapons with hand weapons only
+    if RerollHits1 in rules:
+        compiled.reroll_hits = RerollHits1
+    elif IthilmarWeapons in rules and weapon is not None and find_weapon_key(weapon) == find_weapon_key("HW"):
+        compiled.reroll_hits = IthilmarWeapons
+
+    # Strike First and Strike Last cancel each other out
+    compiled.strike_first = StrikeFirst in rules and StrikeLast not in rules
+    compiled.strike_last = StrikeLast in rules and StrikeFirst not in rules
+    compiled.is_magical = Magic in rules
+    compiled.is_flaming = FlamingAttacks in rules
+    compiled.is_ethereal = Ethereal in character_rules
+    compiled.causes_terror = Terror in character_rules
+    compiled.causes_fear = Fear in character_rules or compiled.causes_terror
+    compiled.immune_to_psychology = ImmuneToPsychology in character_rules
+    compiled.stubborn = Stubborn in character_rules
+    compiled.veteran = Veteran in character_rules
+    compiled.valour_of_ages = ValourOfAges in character_rules
+    if Frenzy in character_rules:
+        compiled.extra_attacks += 1
+
+    ward_targets = []
+    flaming_ward_targets = []
+    armour_bonus = 0
+    for rule in rules:
+        if rule.startswith("Hatred"):
+            # Hatred (all) or Hatred (X); the last Hatred rule wins
+            compiled.hatred = None
+            if rule.strip().lower() == "hatred (all)":
+                compiled.hatred = "all"
+            elif "(" in rule and ")" in rule:
+                compiled.hatred = rule[rule.find("(")+1:rule.find(")")].strip().lower() or None
+        elif rule.startswith("AB"):
+            try:
+                compiled.armour_bane += int(rule[2:])
+            except ValueError:
+                pass
+        elif rule.startswith("AH"):
+            try:
+                armour_bonus += int(rule[2:])
+            except ValueError:
+                pass
+        elif rule in (KillingBlow, KillingBlow6, "KillingBlow"):
+            compiled.killing_blow = 6
+        elif rule.startswith("Regen"):
+            try:
+                target = int(rule.replace("Regen", ""))
+                if compiled.regeneration is None or target < compiled.regeneration:
+                    compiled.regeneration = target
+            except ValueError:
+                pass
+        elif rule.startswith("Ward"):
+            try:
+                ward_targets.append(int(rule.replace("Ward", "")))
+            except ValueError:
+                pass
+        elif rule in (WitnesstoDestiny, DragonArmour):
+            ward_targets.append(6)
+        elif rule == BlessingsofAsuryan:
+            flaming_ward_targets.append(5)
+        elif rule.startswith("+") and rule.endswith("A"):
+            try:
+                compiled.extra_attacks += int(rule[1:-1])
+            except ValueError:
+                pass
+    shooting_bonus = armour_bonus + (2 if ImproveArmor2InShooting in rules else 0)
+    if ImproveArmor1InCombat in rules:
+        armour_bonus += 1
+    compiled.ward = min(ward_targets) if ward_targets else None
+    compiled.ward_vs_flaming = min(ward_targets + flaming_ward_targets) if ward_targets or flaming_ward_targets else None
+
+    # Armour save: ArmourDict entry, improved by shield and AH bonuses
+    if armor is not None:
+        base_save = get_armour_save(armor)
+        if base_save is not None:
+            if shield is not None:
+                base_save -= 1  # Shield improves armor save by 1
+            compiled.armour_save = base_save - armour_bonus  # Lower is better
+            compiled.armour_save_shooting = base_save - shooting_bonus
+    return compiled
 
 
 class Character:
@@ -50,11 +218,11 @@ class Character:
             self.Attacks = Attacks if Attacks is not None else profile["Attacks"]
             self.Leadership = Leadership if Leadership is not None else profile["Leadership"]
             self.Race = Race if Race is not None else profile["Race"]
-            self.Armor = Armor if Armor is not None else profile["Armor"]
-            self.Weapon = Weapon if Weapon != "HW" else profile["Weapon"]
-            self.Shield = Shield if Shield is not None else profile["Shield"]
+            self.Armor = Armor if Armor is not None else profile.get("Armor")
+            self.Weapon = Weapon if Weapon != "HW" else profile.get("Weapon", "HW")
+            self.Shield = Shield if Shield is not None else profile.get("Shield")
             # Always store SpecialRules as a list
-            base_rules = profile["SpecialRules"] if profile["SpecialRules"] else []
+            base_rules = list(profile["SpecialRules"]) if profile["SpecialRules"] else []
             if SpecialRules is not None:
                 if isinstance(SpecialRules, list):
                     self.SpecialRules = base_rules + SpecialRules
@@ -119,3 +287,130 @@ class Character:
         # Use centralized helper to apply stat mods, add special rules, and update equipment options
         if self.Race in RACE_NAMES["HIGH_ELVES"] and elven_honors:
             apply_elven_honors(self, elven_honors)
+
+        self._compiled_rules = None
+        self._compiled_rules_key = None
+
+    @property
+    def compiled_rules(self) -> CompiledRules:
+        """Parsed special rules, rebuilt only when rules or equipment change."""
+        key = (tuple(self.SpecialRules), self.Weapon, self.Armor, self.Shield)
+        if self._compiled_rules is None or key != self._compiled_rules_key:
+            self._compiled_rules = compile_rules(self.SpecialRules, self.Weapon, self.Armor, self.Shield)
+            self._compiled_rules_key = key
+        return self._compiled_rules
+
+    def to_spec(self) -> "CharacterSpec":
+        """Return an immutable CharacterSpec snapshot of this character."""
+        return CharacterSpec.from_character(self)
+
+
+# Profile stats shared by Character and CharacterSpec
+PROFILE_STATS = (
+    "Movement", "WeaponSkill", "BallisticSkill", "Strength", "Toughness",
+    "Initiative", "Wounds", "Attacks", "Leadership",
+)
+
+
+class CharacterSpec:
+    """Immutable snapshot of a Character: profile, equipment and compiled rules.
+
+    Specs are built once (Character.to_spec) and shared by any number of
+    simulations, which keep their mutable values in a CombatState.
+    """
+    __slots__ = (
+        "name", *PROFILE_STATS, "Race", "Armor", "Weapon", "Shield", "SpecialRules",
+        "original_Strength", "original_Initiative", "original_Weapon", "original_ArmourPiercing",
+        "compiled_rules",
+    )
+
+    def __init__(self, name, SpecialRules=(), Armor=None, Weapon="HW", Shield=None, Race=None, compiled_rules=None, **stats):
+        values = dict.fromkeys(PROFILE_STATS)
+        for stat, value in stats.items():
+            if stat not in values:
+                raise TypeError(f"Unknown stat for CharacterSpec: {stat}")
+            values[stat] = value
+        values.update(
+            name=name,
+            Race=Race,
+            Armor=Armor,
+            Weapon=Weapon,
+            Shield=Shield,
+            SpecialRules=tuple(SpecialRules) if SpecialRules else (),
+            original_Strength=values["Strength"],
+            original_Initiative=values["Initiative"],
+            original_Weapon=Weapon,
+            original_ArmourPiercing=0,
+        )
+        # Precompiled rules (e.g. from a roster table row) skip parsing the rule strings
+        if compiled_rules is None:
+            compiled_rules = compile_rules(values["SpecialRules"], Weapon, Armor, Shield)
+        values["compiled_rules"] = compiled_rules
+        for attr, value in values.items():
+            object.__setattr__(self, attr, value)
+
+    @classmethod
+    def from_character(cls, character: Character) -> "CharacterSpec":
+        """Snapshot a Character's current profile, equipment and rules."""
+        return cls(
+            character.name,
+            SpecialRules=character.SpecialRules,
+            Armor=character.Armor,
+            Weapon=character.Weapon,
+            Shield=character.Shield,
+            Race=character.Race,
+            **{stat: getattr(character, stat) for stat in PROFILE_STATS},
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CharacterSpec is immutable; use CombatState for per-simulation values")
+
+    def __getstate__(self):
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+    def __setstate__(self, state):
+        # Pickle support (e.g. sending specs to worker processes)
+        for attr, value in state.items():
+            object.__setattr__(self, attr, value)
+
+    def __delattr__(self, name):
+        raise AttributeError("CharacterSpec is immutable")
+
+    def __repr__(self):
+        return f"CharacterSpec({self.name!r}, Weapon={self.Weapon!r}, Armor={self.Armor!r}, Shield={self.Shield!r})"
+
+
+class CombatState:
+    """Per-simulation state of one fighter, backed by an immutable CharacterSpec.
+
+    Holds only the values combat changes (current wounds, weapon-modified
+    Strength and AP, Weapon Skill lowered by Fear, ward flag); every other
+    attribute is read from the spec, so a CombatState can stand in for a
+    Character in the combat functions.
+    """
+    __slots__ = ("spec", "WeaponSkill", "Strength", "ArmourPiercing", "Weapon", "current_wounds", "ward_applied")
+
+    def __init__(self, spec: CharacterSpec):
+        self.spec = spec
+        self.reset()
+
+    def reset(self) -> None:
+        """Restore the state to the start of a combat."""
+        spec = self.spec
+        self.WeaponSkill = spec.WeaponSkill
+        self.Strength = spec.Strength
+        self.ArmourPiercing = 0
+        self.Weapon = spec.Weapon
+        self.current_wounds = spec.Wounds
+        self.ward_applied = False
+
+    def __getattr__(self, name):
+        # Only called for attributes not held in the state itself
+        if name == "spec":
+            raise AttributeError(name)
+        return getattr(self.spec, name)
+
+
+def as_spec(character: Character | CharacterSpec) -> CharacterSpec:
+    """Return a CharacterSpec for a Character or CharacterSpec."""
+    return character if isinstance(character, CharacterSpec) else CharacterSpec.from_character(character)
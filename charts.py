@@ -1,10 +1,5 @@
 # Game Data 
 
-from armor import *
-from elven_honors import *
-from magic_items import *
-from weapons import *
-
 # The chart is a 2D list where the row(1st index) is the Attacker's WS
 # and the column (2nd index) is the Defender's WS
 WeaponSkillChart = [
@@ -0,0 +1,294 @@
+from collections import deque
+from typing import NamedTuple
+
+
+# Typed combat events. Each event stores the raw values of one step of combat
+# and only builds its text when text() is called, so events cost a tuple when
+# logged and nothing when logging is disabled.
+
+class RoundStart(NamedTuple):
+    round: int
+
+    def text(self) -> str:
+        return f"Round {self.round}"
+
+
+class StrikeOrder(NamedTuple):
+    character_1: str
+    character_2: str
+    reason: str                 # "strike_first", "strike_last", "both_strike_first", "both_strike_last" or "initiative"
+    first: str | None           # Name of the fighter striking first, None if simultaneous
+    initiative_1: int
+    initiative_2: int
+
+    def text(self) -> str:
+        lines = ["\nDetermining strike order..."]
+        c1, c2 = self.character_1, self.character_2
+        if self.reason == "strike_first":
+            other = c2 if self.first == c1 else c1
+            lines.append(f"{self.first} has Strike First and {other} doesn't - {self.first} strikes first")
+            return "\n".join(lines)
+        if self.reason == "strike_last":
+            last = c2 if self.first == c1 else c1
+            lines.append(f"{last} has Strike Last and must strike after {self.first}")
+            return "\n".join(lines)
+        if self.reason == "both_strike_first":
+            lines.append(f"Both {c1} and {c2} have Strike First")
+        elif self.reason == "both_strike_last":
+            lines.append(f"Both {c1} and {c2} have Strike Last")
+        else:
+            lines.append("No Strike First/Last rules - comparing Initiative values")
+            lines.append(f"{c1}: Initiative {self.initiative_1}")
+            lines.append(f"{c2}: Initiative {self.initiative_2}")
+        if self.first is None:
+            lines.append("Equal Initiative - both strike simultaneously")
+        else:
+            lines.append(f"{self.first} has higher Initiative and strikes first")
+        return "\n".join(lines)
+
+
+class StrikeStart(NamedTuple):
+    attacker: str
+    defender: str
+    simultaneous: bool = False
+
+    def text(self) -> str:
+        if self.simultaneous:
+            return f"\n{self.attacker} strikes:"
+        return f"\n{self.attacker} strikes at {self.defender}!"
+
+
+class HitReroll(NamedTuple):
+    reason: str                 # "Hatred", "RerollHits1" or "Ithilmar Weapons"
+    old_roll: int
+    new_roll: int
+    on_hatred_reroll: bool = False
+
+    def text(self) -> str:
+        if self.reason == "Hatred":
+            return f"Hatred: Rerolling failed hit roll of {self.old_roll} -> New roll: {self.new_roll}"
+        suffix = " on hatred reroll" if self.on_hatred_reroll else ""
+        return f"{self.reason}: Rerolling hit roll of 1{suffix} -> New roll: {self.new_roll}"
+
+
+class HitRoll(NamedTuple):
+    roll: int
+    target: int
+    hit: bool
+    hatred_reroll: bool = False
+
+    def text(self) -> str:
+        label = "Hatred reroll" if self.hatred_reroll else "Hit roll"
+        return f"{label}: {self.roll} vs target {self.target} - {'Hit!' if self.hit else 'Miss!'}"
+
+
+class WoundRoll(NamedTuple):
+    defender: str
+    roll: int
+    target: int
+    wounded: bool
+    killing_blow: bool = False
+    armour_bane: bool = False
+
+    def text(self) -> str:
+        if self.killing_blow:
+            return (f"Killing Blow triggered! Wound roll: {self.roll}. "
+                    f"{self.defender} will be instantly killed unless a Ward save is made.")
+        if self.wounded:
+            ab_text = " (Armor Bane triggered!)" if self.armour_bane else ""
+            return f"Wound roll: {self.roll} vs target {self.target} - Wounded!{ab_text}"
+        return f"Wound roll: {self.roll} vs target {self.target} - Failed to wound!"
+
+
+class CannotWound(NamedTuple):
+    attacker: str
+    defender: str
+    reason: str                 # "ethereal" or "too_weak"
+
+    def text(self) -> str:
+        if self.reason == "ethereal":
+            return f"{self.defender} is Ethereal and can only be wounded by magical attacks!"
+        return f"{self.attacker} is too weak to wound {self.defender}!"
+
+
+class ArmourSave(NamedTuple):
+    wound: int                  # 1-based index of the wound being saved
+    roll: int | None            # None if no save was possible
+    target: int
+    saved: bool
+
+    def text(self) -> str:
+        if self.roll is None:
+            return f"Armor save roll {self.wound}: No save possible! (Save of {self.target}+ required)"
+        return f"Armor save roll {self.wound}: {self.roll} vs target {self.target}+ - {'Saved!' if self.saved else 'Failed!'}"
+
+
+class SaveAttempt(NamedTuple):
+    kind: str                   # "ward" or "regeneration"
+    target: int
+
+    def text(self) -> str:
+        return f"Attempting {self.kind} save: {self.target}+ required"
+
+
+class WardSave(NamedTuple):
+    roll: int
+    target: int
+    saved: bool
+
+    def text(self) -> str:
+        return f"Ward save roll: {self.roll} vs target {self.target}+ - {'Saved!' if self.saved else 'Failed!'}"
+
+
+class RegenerationSave(NamedTuple):
+    roll: int
+    target: int
+    saved: bool
+
+    def text(self) -> str:
+        return f"Regeneration save roll: {self.roll} vs target {self.target}+ - {'Regenerated!' if self.saved else 'Failed!'}"
+
+
+class KillingBlowOutcome(NamedTuple):
+    defender: str
+    outcome: str                # "triggered", "warded", "regenerated" or "slain"
+
+    def text(self) -> str:
+        if self.outcome == "triggered":
+            return f"Killing Blow triggered against {self.defender}!"
+        if self.outcome == "warded":
+            return f"{self.defender} wards off the Killing Blow!"
+        if self.outcome == "regenerated":
+            return f"{self.defender} regenerates from the Killing Blow!"
+        return f"{self.defender} is slain by the Killing Blow!"
+
+
+class WoundsApplied(NamedTuple):
+    defender: str
+    wounds: int                 # Wounds after armour saves
+    suffered: int               # Wounds left after ward and regeneration saves
+    remaining: int              # Defender's wounds left
+
+    def text(self) -> str:
+        lines = []
+        saved = self.wounds - self.suffered
+        if saved > 0:
+            lines.append(f"{self.defender} saved {saved} wound(s) through wards/regeneration.")
+        if self.suffered > 0:
+            lines.append(f"{self.defender} suffers {self.suffered} wound(s). Remaining Wounds: {self.remaining}")
+        return "\n".join(lines)
+
+
+class Volley(NamedTuple):
+    shooter: str
+    target: str
+    shots: int
+    hits: int
+    wounds: int                 # Wounds after all saves
+    remaining: int              # Target's wounds left
+
+    def text(self) -> str:
+        return (f"{self.shooter} shoots at {self.target}: {self.shots} shot(s), {self.hits} hit(s), "
+                f"{self.wounds} wound(s). Remaining Wounds: {self.remaining}")
+
+
+class LeadershipTest(NamedTuple):
+    character: str
+    test: str                   # "Fear", "Terror", "Break" or "Panic"
+    target: int
+    roll: int
+    passed: bool
+
+    def text(self) -> str:
+        return f"{self.character} takes a {self.test} test: {self.roll} vs {self.target} - {'Passed!' if self.passed else 'Failed!'}"
+
+
+class Flee(NamedTuple):
+    character: str
+    enemy: str
+
+    def text(self) -> str:
+        return f"{self.character} breaks and flees from {self.enemy}!"
+
+
+class StrikeResult(NamedTuple):
+    attacker: str
+    defender: str
+    result: dict
+
+    def text(self) -> str:
+        return f"{self.attacker} vs {self.defender}: {self.result}"
+
+
+class Victory(NamedTuple):
+    winner: str
+    loser: str
+
+    def text(self) -> str:
+        return f"{self.winner} stands victorious, the blood of {self.loser} stains the field of battle"
+
+
+class Stalemate(NamedTuple):
+    both_slain: bool = False
+
+    def text(self) -> str:
+        if self.both_slain:
+            return "Both fighters fall together - the battle ends in a bloody stalemate."
+        return "The battle ends in a bloody stalemate."
+
+
+class Message(NamedTuple):
+    message: str
+
+    def text(self) -> str:
+        return self.message
+
+
+def print_event(event) -> None:
+    """Text renderer: print one event the way verbose combat output reads."""
+    text = event.text()
+    if text:
+        print(text)
+
+
+class CombatLog:
+    """Destination for combat events.
+
+    Every emitted event is passed to each sink (a callable taking the event)
+    and, if buffer_size is set, kept in a ring buffer of the most recent
+    events. Combat functions take log=None to skip event creation entirely.
+
+    Args:
+        *sinks: Callables receiving each event, e.g. print_event
+        buffer_size: Number of recent events to keep (None keeps none, 0 keeps all)
+    """
+    __slots__ = ("sinks", "buffer")
+
+    def __init__(self, *sinks, buffer_size: int | None = None):
+        self.sinks = sinks
+        self.buffer = None if buffer_size is None else deque(maxlen=buffer_size or None)
+
+    def emit(self, event) -> None:
+        if self.buffer is not None:
+            self.buffer.append(event)
+        for sink in self.sinks:
+            sink(event)
+
+    def events(self) -> list:
+        """Buffered events, oldest first."""
+        return list(self.buffer) if self.buffer is not None else []
+
+    def render(self) -> str:
+        """Render the buffered events as text."""
+        return "\n".join(text for text in (event.text() for event in self.events()) if text)
+
+
+# Log used for verbose=True when no log is given
+PRINT_LOG = CombatLog(print_event)
+
+
+def resolve_log(verbose: bool, log: CombatLog | None) -> CombatLog | None:
+    """Return the log to emit to: the given log, PRINT_LOG if verbose, else None."""
+    if log is not None:
+        return log
+    return PRINT_LOG if verbose else None
@@ -0,0 +1,105 @@
+from time import perf_counter
+from typing import NamedTuple
+
+from dice import DiceSource
+
+# Phases timed by CombatProfiler: shooting before melee, then the order a strike goes through
+PHASES = ("shooting", "strike_order", "weapon_stats", "to_hit", "to_wound", "armour_save", "ward_save", "regeneration")
+
+
+class PhaseStats(NamedTuple):
+    phase: str
+    calls: int
+    seconds: float
+    dice: int
+
+    @property
+    def mean_us(self) -> float:
+        """Mean time per call in microseconds."""
+        return self.seconds / self.calls * 1e6 if self.calls else 0.0
+
+
+class ProfileReport:
+    """Per-phase totals collected by a CombatProfiler.
+
+    Attributes:
+        phases: PhaseStats for every phase, keyed by phase name
+        combats: Number of combat_simulation calls profiled
+    """
+
+    def __init__(self, phases: dict[str, PhaseStats], combats: int):
+        self.phases = phases
+        self.combats = combats
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(stats.seconds for stats in self.phases.values())
+
+    @property
+    def total_dice(self) -> int:
+        return sum(stats.dice for stats in self.phases.values())
+
+    def as_dict(self) -> dict:
+        """Plain dict of the report, e.g. for JSON."""
+        return {
+            "combats": self.combats,
+            "phases": {name: stats._asdict() for name, stats in self.phases.items()},
+        }
+
+    def format(self) -> str:
+        """Text table of calls, time, share of time and dice per phase."""
+        total = self.total_seconds or 1.0
+        lines = [f"{'phase':<14}{'calls':>10}{'total ms':>12}{'mean us':>10}{'share':>8}{'dice':>12}"]
+        for stats in self.phases.values():
+            lines.append(
+                f"{stats.phase:<14}{stats.calls:>10}{stats.seconds * 1e3:>12.2f}"
+                f"{stats.mean_us:>10.2f}{stats.seconds / total:>8.1%}{stats.dice:>12}"
+            )
+        lines.append(f"{'total':<14}{'':>10}{self.total_seconds * 1e3:>12.2f}{'':>10}{'':>8}{self.total_dice:>12}")
+        lines.append(f"{self.combats} combat(s) profiled")
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.format()
+
+
+class CombatProfiler:
+    """Accumulates time, calls and dice rolled per combat phase.
+
+    Pass one as profiler= to OneRoundMeleeCombat, resolve_melee_result or
+    combat_simulation; the same profiler can be reused across any number of
+    combats. Each phase is timed with a start()/lap() pair around it, so with
+    profiler=None the combat code pays only for the None checks.
+
+    Dice are counted from DiceSource.rolls, so only rolls drawn from the
+    DiceSource passed to lap() are attributed to a phase.
+    """
+    __slots__ = ("calls", "seconds", "dice", "combats")
+
+    def __init__(self):
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.dice = dict.fromkeys(PHASES, 0)
+        self.combats = 0
+
+    def start(self, dice: DiceSource) -> tuple[float, int]:
+        """Mark the start of a phase; returns a token for lap()."""
+        return perf_counter(), dice.rolls
+
+    def lap(self, phase: str, token: tuple[float, int], dice: DiceSource) -> tuple[float, int]:
+        """Charge the time and dice since token to phase; returns a token for the next phase."""
+        now, rolls = perf_counter(), dice.rolls
+        self.calls[phase] += 1
+        self.seconds[phase] += now - token[0]
+        self.dice[phase] += rolls - token[1]
+        return now, rolls
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def report(self) -> ProfileReport:
+        """Snapshot of the totals so far."""
+        return ProfileReport(
+            {phase: PhaseStats(phase, self.calls[phase], self.seconds[phase], self.dice[phase]) for phase in PHASES},
+            self.combats,
+        )
@@ -1,16 +1,59 @@
-import numpy as np
-
-from armor import *
-from character_model import *
-from charts import *
-from elven_honors import *
-from faction_profiles import *
-from magic_items import *
-from special_rules import FirstRoundOnly, StrikeFirst, StrikeLast
-from weapons import get_weapon_special_rules, get_weapon_stats
-
-
-def RollToHit(attacker: Character, defender: Character, verbose: bool = True, is_first_round: bool = False) -> int:
+from character_model import Character, CharacterSpec, CombatState, as_spec
+from charts import WeaponSkillChart, Wounds_vs_ToughnessChart
+from combat_events import (
+    ArmourSave,
+    CannotWound,
+    CombatLog,
+    Flee,
+    HitReroll,
+    HitRoll,
+    KillingBlowOutcome,
+    LeadershipTest,
+    Message,
+    RegenerationSave,
+    RoundStart,
+    SaveAttempt,
+    Stalemate,
+    StrikeOrder,
+    StrikeResult,
+    StrikeStart,
+    Victory,
+    WardSave,
+    WoundRoll,
+    WoundsApplied,
+    resolve_log,
+)
+from combat_profiler import CombatProfiler
+from dice import DiceSource, get_default_dice
+from leadership import (
+    break_test_reroll,
+    break_test_target,
+    leadership_test,
+    psychology_reroll,
+    takes_fear_test,
+    takes_terror_test,
+)
+from special_rules import RerollHits1
+
+
+def is_hated_enemy(attacker: Character, defender: Character) -> bool:
+    """Return True if the attacker has a Hatred rule that applies to the defender.
+
+    Hatred (all) applies to every enemy; Hatred (X) applies when X appears in the
+    defender's race or name.
+    """
+    hated_str = attacker.compiled_rules.hatred
+    if not hated_str:
+        return False
+    if hated_str == "all":
+        return True
+    # Defender's race or name
+    defender_race = getattr(defender, "Race", "").lower() if getattr(defender, "Race", None) else ""
+    defender_name = getattr(defender, "name", "").lower() if getattr(defender, "name", None) else ""
+    return hated_str in defender_race or hated_str in defender_name
+
+
+def RollToHit(attacker: Character, defender: Character, verbose: bool = True, is_first_round: bool = False, dice: DiceSource | None = None, log: CombatLog | None = None) -> int:
     """Roll dice for attacker to hit defender based on Weapon Skill comparison.
     
     Args:
@@ -18,6 +61,8 @@ def RollToHit(attacker: Character, defender: Character, verbose: bool = True, is
         defender: The defending Character being attacked
         verbose: Whether to print detailed roll results
         is_first_round: Whether this is the first round of combat (affects Hatred)
+        dice: DiceSource for all rolls (defaults to the module-wide source)
+        log: CombatLog receiving HitRoll/HitReroll events (overrides verbose)
     
     Returns:
         int: Number of successful hits scored
@@ -27,80 +72,53 @@ def RollToHit(attacker: Character, defender: Character, verbose: bool = True, is
         - RerollHits1: Reroll hit rolls of 1 with any weapon
         - Hatred(X): In first round only, reroll all failed hits vs specified enemy type
     """
+    dice = dice if dice is not None else get_default_dice()
+    log = resolve_log(verbose, log)
     to_hit_target = WeaponSkillChart[attacker.WeaponSkill - 1][defender.WeaponSkill - 1]
     successful_hits = 0
 
     # Check for reroll abilities
-    has_reroll = False
-    has_ithilmar = False
-    has_hatred = False
-    hatred_target = None
-    if attacker.SpecialRules:
-        has_reroll = RerollHits1 in attacker.SpecialRules
-        has_ithilmar = IthilmarWeapons in attacker.SpecialRules
-        for rule in attacker.SpecialRules:
-            if str(rule).startswith("Hatred"):
-                has_hatred = True
-                hatred_target = rule
+    reroll_source = attacker.compiled_rules.reroll_hits
+    can_reroll_1 = reroll_source is not None
+    reroll_reason = "RerollHits1" if reroll_source == RerollHits1 else "Ithilmar Weapons"
 
     # Determine if defender is hated
-    is_hated_enemy = False
-    if has_hatred and hatred_target:
-        # Hatred (all) or Hatred (X)
-        if hatred_target.strip().lower() == "hatred (all)":
-            is_hated_enemy = True
-        elif "(" in hatred_target and ")" in hatred_target:
-            # Extract the race or type from Hatred (X)
-            hated_str = hatred_target[hatred_target.find("(")+1:hatred_target.find(")")].strip().lower()
-            # Defender's race or name
-            defender_race = getattr(defender, "Race", "").lower() if getattr(defender, "Race", None) else ""
-            defender_name = getattr(defender, "name", "").lower() if getattr(defender, "name", None) else ""
-            if hated_str and (hated_str in defender_race or hated_str in defender_name):
-                is_hated_enemy = True
+    is_hated = is_hated_enemy(attacker, defender)
 
     for attack in range(attacker.Attacks):
-        roll = np.random.randint(1, 7)  # Roll a D6
-        # Check if a reroll is allowed
-        can_reroll_1 = has_reroll or (has_ithilmar and attacker.Weapon == "HW")
+        roll = dice.roll()  # Roll a D6
         # If roll is 1 and has reroll ability, reroll
         if roll == 1 and can_reroll_1:
             old_roll = roll
-            roll = np.random.randint(1, 7)  # Reroll
-            if verbose:
-                if has_reroll:
-                    print(f"RerollHits1: Rerolling hit roll of 1 -> New roll: {roll}")
-                else:
-                    print(f"Ithilmar Weapons: Rerolling hit roll of 1 -> New roll: {roll}")
+            roll = dice.roll()  # Reroll
+            if log is not None:
+                log.emit(HitReroll(reroll_reason, old_roll, roll))
         if roll >= to_hit_target:
             successful_hits += 1
-            if verbose:
-                print(f"Hit roll: {roll} vs target {to_hit_target} - Hit!")
-        elif is_first_round and is_hated_enemy:
+            if log is not None:
+                log.emit(HitRoll(roll, to_hit_target, True))
+        elif is_first_round and is_hated:
             # Hatred: reroll failed hit in first round
-            reroll = np.random.randint(1, 7)
-            if verbose:
-                print(f"Hatred: Rerolling failed hit roll of {roll} -> New roll: {reroll}")
+            reroll = dice.roll()
+            if log is not None:
+                log.emit(HitReroll("Hatred", roll, reroll))
             # Reroll 1s if reroll abilities apply
             if reroll == 1 and can_reroll_1:
                 old_reroll = reroll
-                reroll = np.random.randint(1, 7)
-                if verbose:
-                    if has_reroll:
-                        print(f"RerollHits1: Rerolling hit roll of 1 on hatred reroll -> New roll: {reroll}")
-                    else:
-                        print(f"Ithilmar Weapons: Rerolling hit roll of 1 on hatred reroll -> New roll: {reroll}")
-            if reroll >= to_hit_target:
+                reroll = dice.roll()
+                if log is not None:
+                    log.emit(HitReroll(reroll_reason, old_reroll, reroll, on_hatred_reroll=True))
+            hit = reroll >= to_hit_target
+            if hit:
                 successful_hits += 1
-                if verbose:
-                    print(f"Hatred reroll: {reroll} vs target {to_hit_target} - Hit!")
-            elif verbose:
-                print(f"Hatred reroll: {reroll} vs target {to_hit_target} - Miss!")
-        elif verbose:
-            print(f"Hit roll: {roll} vs target {to_hit_target} - Miss!")
+            if log is not None:
+                log.emit(HitRoll(reroll, to_hit_target, hit, hatred_reroll=True))
+        elif log is not None:
+            log.emit(HitRoll(roll, to_hit_target, False))
     return successful_hits
 
 
-def RollToWound(attacker: Character, defender: Character, num_hits: int, verbose: bool = True) -> tuple[int, list[int], bool, int | None, bool, bool]:
+def RollToWound(attacker: Character, defender: Character, num_hits: int, verbose: bool = True, dice: DiceSource | None = None, log: CombatLog | None = None) -> tuple[int, list[int], bool, int | None, bool, bool]:
     """Roll dice to wound based on Strength vs Toughness comparison.
     
     Args:
@@ -108,6 +126,8 @@ def RollToWound(attacker: Character, defender: Character, num_hits: int, verbose
         defender: The defending Character being wounded
         num_hits: Number of successful hits to roll for wounds
         verbose: Whether to print detailed roll results
+        dice: DiceSource for all rolls (defaults to the module-wide source)
+        log: CombatLog receiving WoundRoll/CannotWound events (overrides verbose)
     
     Returns:
         tuple containing:
@@ -124,92 +144,74 @@ def RollToWound(attacker: Character, defender: Character, num_hits: int, verbose
         - Armor Bane: Track 6s for increased AP
         - Magic/Flaming: Track for ward save interactions
     """
-    # Check for Ethereal rule on defender
-    is_ethereal = False
-    if defender.SpecialRules:
-        is_ethereal = Ethereal in defender.SpecialRules
-
-    # Check if attack is magical
-    is_magical = False
-    # Check if attack is flaming
-    is_flaming = False
-    # Check attacker's special rules
-    if attacker.SpecialRules:
-        is_magical = "Magic" in attacker.SpecialRules
-        is_flaming = FlamingAttacks in attacker.SpecialRules
-    # Check weapon's special rules
-    weapon_rules = get_weapon_special_rules(attacker.Weapon)
-    if weapon_rules:
-        # set flags based on canonical tokens
-        if Magic in weapon_rules:
-            is_magical = True
-        if FlamingAttacks in weapon_rules:
-            is_flaming = True
+    dice = dice if dice is not None else get_default_dice()
+    log = resolve_log(verbose, log)
+    attacker_rules = attacker.compiled_rules
+    is_ethereal = defender.compiled_rules.is_ethereal
+    is_magical = attacker_rules.is_magical
+    is_flaming = attacker_rules.is_flaming
 
     # If defender is Ethereal and attack is not magical, no wounds can be caused
     if is_ethereal and not is_magical:
-        if verbose:
-            print(f"{defender.name} is Ethereal and can only be wounded by magical attacks!")
+        if log is not None:
+            log.emit(CannotWound(attacker.name, defender.name, "ethereal"))
         return 0, [], False, None
 
     to_wound_target = Wounds_vs_ToughnessChart[attacker.Strength - 1][
         defender.Toughness - 1
     ]
     if to_wound_target is None:
-        if verbose:
-            print(f"{attacker.name} is too weak to wound {defender.name}!")
+        if log is not None:
+            log.emit(CannotWound(attacker.name, defender.name, "too_weak"))
         return 0, [], False, None
 
     successful_wounds = 0
     wound_rolls = []  # Store the roll value for each successful wound
     killing_blow_triggered = False
-    killing_blow_value = None
 
-    # Check if weapon has Armor Bane
-    weapon_rules = get_weapon_special_rules(attacker.Weapon)
-    has_armor_bane = any(str(r).startswith("AB") for r in weapon_rules) if weapon_rules else False
-    
-    
-    # Check character special rules for Armor Bane and Killing Blow
-    killing_blow_rule = None
-    if attacker.SpecialRules:
-        if isinstance(attacker.SpecialRules, list):
-            if KillingBlow in attacker.SpecialRules:
-                killing_blow_rule = KillingBlow in attacker.SpecialRules
-            has_armor_bane = has_armor_bane or any(str(rule).startswith('AB') for rule in attacker.SpecialRules)
-        elif isinstance(attacker.SpecialRules, str):
-            if attacker.SpecialRules.startswith('KillingBlow'):
-                killing_blow_rule = attacker.SpecialRules
-            has_armor_bane = has_armor_bane or str(attacker.SpecialRules).startswith('AB')
-
-    if killing_blow_rule:
-        killing_blow_value = 6  # fallback
+    # Armor Bane and Killing Blow from character and weapon rules
+    has_armor_bane = attacker_rules.armour_bane > 0
+    killing_blow_value = attacker_rules.killing_blow
 
     for hit in range(num_hits):
-        roll = np.random.randint(1, 7)  # Roll a D6
+        roll = dice.roll()  # Roll a D6
         if roll >= to_wound_target:
             successful_wounds += 1
             wound_rolls.append(roll)  # Store the roll value
             # Check for Killing Blow
-            if killing_blow_value and roll == 6:
+            if killing_blow_value and roll >= killing_blow_value:
                 killing_blow_triggered = True
-                if verbose:
-                    print(f"Killing Blow triggered! Wound roll: 6. {defender.name} will be instantly killed unless a Ward save is made.")
-            else:
-                if verbose:
-                    ab_text = " (Armor Bane triggered!)" if (roll == 6 and has_armor_bane) else ""
-                    print(
-                        f"Wound roll: {roll} vs target {to_wound_target} - Wounded!{ab_text}"
-                    )
-        elif verbose:
-            print(
-                f"Wound roll : {roll} vs target {to_wound_target} - Failed to wound!"
-            )
+                if log is not None:
+                    log.emit(WoundRoll(defender.name, roll, to_wound_target, True, killing_blow=True))
+            elif log is not None:
+                log.emit(WoundRoll(defender.name, roll, to_wound_target, True, armour_bane=(roll == 6 and has_armor_bane)))
+        elif log is not None:
+            log.emit(WoundRoll(defender.name, roll, to_wound_target, False))
 
     return successful_wounds, wound_rolls, killing_blow_triggered, killing_blow_value, is_flaming, is_magical
 
 
-def RollArmorSave(attacker: Character, defender: Character, num_wounds: int, wound_rolls: list[int] | None = None, verbose: bool = True) -> int:
+def get_base_armor_save(defender: Character) -> int | None:
+    """Return the defender's armour save before armour piercing is applied.
+
+    Args:
+        defender: The Character making armor saves
+
+    Returns:
+        int | None: Save target (lower is better), or None if the defender has
+        no armour or the armour type is unknown
+
+    Special Rules Handled:
+        - AHX: Improves armor save by X
+        - ImproveArmor1InCombat: +1 to armor saves in combat
+        - Shield: +1 to armor saves if equipped
+    """
+    if defender.Armor is None:
+        return None
+    return defender.compiled_rules.armour_save
+
+
+def RollArmorSave(attacker: Character, defender: Character, num_wounds: int, wound_rolls: list[int] | None = None, verbose: bool = True, dice: DiceSource | None = None, log: CombatLog | None = None) -> int:
     """Roll armor saves for wounds, accounting for AP and save modifiers.
     
     Args:
@@ -218,6 +220,8 @@ def RollArmorSave(attacker: Character, defender: Character, num_wounds: int, wou
         num_wounds: Number of wounds to attempt to save
         wound_rolls: List of the original wound roll values (for Armor Bane)
         verbose: Whether to print detailed roll results
+        dice: DiceSource for all rolls (defaults to the module-wide source)
+        log: CombatLog receiving ArmourSave events (overrides verbose)
     
     Returns:
         int: Number of wounds successfully saved by armor
@@ -231,66 +235,19 @@ def RollArmorSave(attacker: Character, defender: Character, num_wounds: int, wou
     if defender.Armor is None:
         return 0  # No armor, no saves possible
 
-    # Find matching armor key in ArmourDict
-    armor_key = None
-    for key in ArmourDict:
-        if isinstance(key, tuple):
-            if defender.Armor in key:
-                armor_key = key
-                break
-        elif defender.Armor == key:
-            armor_key = key
-            break
-    
+    log = resolve_log(verbose, log)
+    armor_save_target = get_base_armor_save(defender)
+    if armor_save_target is None:
+        if log is not None:
+            log.emit(Message(f"{defender.name} has unknown armor type: {defender.Armor}"))
+        return 0
 
-    if defender.Armor is None:
-        return 0  # No armor, no saves possible
+    dice = dice if dice is not None else get_default_dice()
 
-    # Find matching armor key in ArmourDict
-    armor_key = None
-    for key in ArmourDict:
-        if isinstance(key, tuple):
-            if defender.Armor in key:
-                armor_key = key
-                break
-        elif defender.Armor == key:
-            armor_key = key
-            break
-    if armor_key is None:
-        if verbose:
-            print(f"{defender.name} has unknown armor type: {defender.Armor}")
-        return 0
+    # Get base armor piercing and AB value from character and weapon rules
+    base_ap = abs(attacker.ArmourPiercing)
+    ab_value = attacker.compiled_rules.armour_bane
 
-    armor_save_target = ArmourDict[armor_key]
-    if defender.Shield is not None:
-        armor_save_target -= 1  # Shield improves armor save by 1
-
-    # Check for 'AHX' special rule (improves armor save by X)
-    ah_bonus = 0
-    if defender.SpecialRules:
-        for rule in defender.SpecialRules:
-            if str(rule).startswith('AH'):
-                try:
-                    ah_bonus += int(str(rule).replace('AH',''))
-                except Exception:
-                    pass
-            if ImproveArmor1InCombat in defender.SpecialRules:
-                ah_bonus += 1
-                
-    armor_save_target -= ah_bonus  # Lower is better
-
-    # Get base armor piercing and AB value if weapon has it
-    base_ap = np.abs(attacker.ArmourPiercing)
-    ab_value = 0
-
-    # Use helper to inspect weapon stats and rules for AB and Killing Blow parsing
-    try:
-        strength_bonus, ap_bonus, weapon_rules = get_weapon_stats(attacker.Weapon)
-    except ValueError:
-        # If weapon not found, fall back to defaults and continue (warn)
-        print(f"Warning: Weapon '{getattr(attacker, 'Weapon', None)}' not found; using defaults")
-        strength_bonus, ap_bonus, weapon_rules = (None, 0, [])
-                
     successful_saves = 0
     wound_rolls = wound_rolls if wound_rolls else [0] * num_wounds  # Default to 0 if no wound rolls provided
 
@@ -306,17 +263,16 @@ def RollArmorSave(attacker: Character, defender: Character, num_wounds: int, wou
         current_save_target = max(2, current_save_target)
             
         if current_save_target > 6:  # No save possible
-            if verbose:
-                print(f"Armor save roll {wound_index + 1}: No save possible! (Save of {current_save_target}+ required)")
+            if log is not None:
+                log.emit(ArmourSave(wound_index + 1, None, current_save_target, False))
             continue
             
-        roll = np.random.randint(1, 7)  # Roll a D6
-        if roll >= current_save_target:
+        roll = dice.roll()  # Roll a D6
+        saved = roll >= current_save_target
+        if saved:
             successful_saves += 1
-            if verbose:
-                print(f"Armor save roll {wound_index + 1}: {roll} vs target {current_save_target}+ - Saved!")
-        elif verbose:
-            print(f"Armor save roll {wound_index + 1}: {roll} vs target {current_save_target}+ - Failed!")
+        if log is not None:
+            log.emit(ArmourSave(wound_index + 1, roll, current_save_target, saved))
             
     return successful_saves
 
@@ -334,22 +290,7 @@ def apply_extra_attacks(character: Character) -> int:
         - +XA weapon rule: Adds X additional attacks
         - Frenzy: +1 attack
     """
-    extra_attacks = 0
-    # Check weapon for special rules that grant extra attacks
-    weapon_rules = get_weapon_special_rules(character.Weapon)
-    if weapon_rules:
-        # Example: "+1A" tokens
-        for r in weapon_rules:
-            if isinstance(r, str) and r.startswith("+") and r.endswith("A"):
-                try:
-                    extra_attacks += int(r[1:-1])
-                except ValueError:
-                    pass
-    # Check for Frenzy special rule
-    if character.SpecialRules:
-        if 'Frenzy' in character.SpecialRules:
-            extra_attacks += 1
-    return character.Attacks + extra_attacks
+    return character.Attacks + character.compiled_rules.extra_attacks
 
 
 def apply_weapon_stats(character: Character, is_first_round: bool = False, verbose: bool = True) -> None:
@@ -367,29 +308,14 @@ def apply_weapon_stats(character: Character, is_first_round: bool = False, verbo
         
     Note: Use reset_weapon_stats to revert these changes after combat round.
     """
-    try:
-        strength_bonus, ap_bonus, weapon_rules = get_weapon_stats(character.Weapon)
-    except ValueError:
-        # missing weapon — treat as no bonus
-        strength_bonus, ap_bonus, weapon_rules = (None, 0, [])
-    # Apply strength bonus only if not FirstRoundOnly or if it's the first round
-    if strength_bonus is not None:
-        if FirstRoundOnly in weapon_rules:
-            if is_first_round:
-                character.Strength = (character.Strength or 0) + strength_bonus
-        else:
-            character.Strength = (character.Strength or 0) + strength_bonus
-    # Apply armour piercing similarly
-    if ap_bonus:
-        if FirstRoundOnly in weapon_rules:
-            if is_first_round:
-                character.ArmourPiercing = (character.ArmourPiercing or 0) + ap_bonus
-        else:
-            character.ArmourPiercing = (character.ArmourPiercing or 0) + ap_bonus
-    # Handle first round only tokens
-    if is_first_round and weapon_rules and 'First Round Only' in weapon_rules:
-        # Already handled via weapon rules presence; no-op here unless more logic desired
-        pass
+    rules = character.compiled_rules
+    # Apply weapon bonuses only if not FirstRoundOnly or if it's the first round
+    if rules.weapon_first_round_only and not is_first_round:
+        return
+    if rules.weapon_strength is not None:
+        character.Strength = (character.Strength or 0) + rules.weapon_strength
+    if rules.weapon_ap:
+        character.ArmourPiercing = (character.ArmourPiercing or 0) + rules.weapon_ap
 
 
 def reset_weapon_stats(character: Character) -> None:
@@ -408,13 +334,33 @@ def reset_weapon_stats(character: Character) -> None:
     character.Weapon = getattr(character, 'original_Weapon', character.Weapon)
 
 
-def attempt_regeneration_save(defender: Character, num_wounds: int, verbose: bool = True) -> int:
+def get_regeneration_target(defender: Character) -> int | None:
+    """Return the best (lowest) regeneration target from RegenX rules, or None."""
+    return defender.compiled_rules.regeneration
+
+
+def get_ward_save_target(defender: Character, is_flaming: bool = False) -> int | None:
+    """Return the best (lowest) ward save target applicable to an attack, or None.
+
+    Ward Save Sources:
+        - WardX special rule: Save on X+
+        - Witness to Destiny: Save on 6+
+        - Dragon Armour: Save on 6+
+        - Blessings of Asuryan: Save on 5+ vs Flaming only
+    """
+    rules = defender.compiled_rules
+    return rules.ward_vs_flaming if is_flaming else rules.ward
+
+
+def attempt_regeneration_save(defender: Character, num_wounds: int, verbose: bool = True, dice: DiceSource | None = None, log: CombatLog | None = None) -> int:
     """Attempt regeneration saves against wounds using best available regeneration.
     
     Args:
         defender: The Character attempting regeneration
         num_wounds: Number of wounds to attempt to regenerate
         verbose: Whether to print detailed roll results
+        dice: DiceSource for all rolls (defaults to the module-wide source)
+        log: CombatLog receiving RegenerationSave events (overrides verbose)
     
     Returns:
         int: Number of wounds successfully regenerated
@@ -423,41 +369,28 @@ def attempt_regeneration_save(defender: Character, num_wounds: int, verbose: boo
         - RegenX special rule: Regenerate on X+
         Uses the lowest (best) regeneration target if multiple sources exist.
     """
-    if not defender.SpecialRules:
-        return 0
-
-    # Find regeneration target if any
-    regen_target = None
-    for rule in defender.SpecialRules:
-        rule_str = str(rule)
-        if rule_str.startswith('Regen'):
-            try:
-                target = int(rule_str.replace('Regen', ''))
-                if regen_target is None or target < regen_target:
-                    regen_target = target
-            except ValueError:
-                pass
-
+    regen_target = get_regeneration_target(defender)
     if regen_target is None:
         return 0
 
-    if verbose:
-        print(f"Attempting regeneration save: {regen_target}+ required")
+    log = resolve_log(verbose, log)
+    if log is not None:
+        log.emit(SaveAttempt("regeneration", regen_target))
 
+    dice = dice if dice is not None else get_default_dice()
     successful_regens = 0
     for _ in range(num_wounds):
-        roll = np.random.randint(1, 7)  # Roll D6
-        if roll >= regen_target:
+        roll = dice.roll()  # Roll D6
+        saved = roll >= regen_target
+        if saved:
             successful_regens += 1
-            if verbose:
-                print(f"Regeneration save roll: {roll} vs target {regen_target}+ - Regenerated!")
-        elif verbose:
-            print(f"Regeneration save roll: {roll} vs target {regen_target}+ - Failed!")
+        if log is not None:
+            log.emit(RegenerationSave(roll, regen_target, saved))
 
     return successful_regens
 
 
-def attempt_ward_save(defender: Character, num_wounds: int, is_flaming: bool = False, verbose: bool = False) -> int:
+def attempt_ward_save(defender: Character, num_wounds: int, is_flaming: bool = False, verbose: bool = False, dice: DiceSource | None = None, log: CombatLog | None = None) -> int:
     """Attempt ward saves against wounds using best available ward save.
     
     Args:
@@ -465,6 +398,8 @@ def attempt_ward_save(defender: Character, num_wounds: int, is_flaming: bool = F
         num_wounds: Number of wounds to attempt to save
         is_flaming: Whether the wounds are from a Flaming attack
         verbose: Whether to print detailed roll results
+        dice: DiceSource for all rolls (defaults to the module-wide source)
+        log: CombatLog receiving WardSave events (overrides verbose)
     
     Returns:
         int: Number of wounds successfully saved by wards
@@ -478,44 +413,24 @@ def attempt_ward_save(defender: Character, num_wounds: int, is_flaming: bool = F
     Effects:
         - Sets defender.ward_applied when any ward save succeeds
     """
-    if not defender.SpecialRules:
-        return 0
-
-    # Find all ward save targets
-    ward_targets = []
-    for rule in defender.SpecialRules:
-        # Check for WardX format
-        rule_str = str(rule)
-        if rule_str.startswith('Ward'):
-            try:
-                target = int(rule_str.replace('Ward', ''))
-                ward_targets.append(target)
-            except ValueError:
-                pass
-        # Check named ward sources
-        elif rule_str == "Witness to Destiny (6+ Ward)" or rule_str == "Dragon Armour (6+ Ward)":
-            ward_targets.append(6)
-        elif rule_str == "Blessings of Asuryan (5+ Ward vs Flaming)" and is_flaming:
-            ward_targets.append(5)
-
-    if not ward_targets:
+    ward_target = get_ward_save_target(defender, is_flaming)
+    if ward_target is None:
         return 0  # No applicable ward saves
 
-    # Use lowest valid target
-    ward_target = min(ward_targets)
-    if verbose:
-        print(f"Attempting ward save: {ward_target}+ required")
+    log = resolve_log(verbose, log)
+    if log is not None:
+        log.emit(SaveAttempt("ward", ward_target))
 
+    dice = dice if dice is not None else get_default_dice()
     successful_wards = 0
     for _ in range(num_wounds):
-        roll = np.random.randint(1, 7)  # Roll D6
-        if roll >= ward_target:
+        roll = dice.roll()  # Roll D6
+        saved = roll >= ward_target
+        if saved:
             successful_wards += 1
-            if verbose:
-                print(f"Ward save roll: {roll} vs target {ward_target}+ - Saved!")
-                defender.ward_applied = True  # Flag that a ward succeeded
-        elif verbose:
-            print(f"Ward save roll: {roll} vs target {ward_target}+ - Failed!")
+            defender.ward_applied = True  # Flag that a ward succeeded
+        if log is not None:
+            log.emit(WardSave(roll, ward_target, saved))
 
     return successful_wards
 
@@ -525,6 +440,9 @@ def OneRoundMeleeCombat(
     defender: Character,
     verbose: bool = True,
     is_first_round: bool = True,
+    dice: DiceSource | None = None,
+    log: CombatLog | None = None,
+    profiler: CombatProfiler | None = None,
 ) -> dict[str, int | bool | list[int] | None]:
     """Execute one round of melee combat between two characters.
     
@@ -533,6 +451,9 @@ def OneRoundMeleeCombat(
         defender: The Character being attacked
         verbose: Whether to print detailed combat results
         is_first_round: Whether this is first round (affects various rules)
+        dice: DiceSource for all rolls (defaults to the module-wide source)
+        log: CombatLog receiving the roll events (overrides verbose)
+        profiler: CombatProfiler charged with the time and dice of each phase
     
     Returns:
         dict containing:
@@ -549,9 +470,19 @@ def OneRoundMeleeCombat(
         - Temporarily modifies attacker's stats based on weapon
         - Resets attacker's stats after combat
     """
+    dice = dice if dice is not None else get_default_dice()
+    log = resolve_log(verbose, log)
+    if profiler is not None:
+        token = profiler.start(dice)
     apply_weapon_stats(attacker, is_first_round=is_first_round)
-    hits = RollToHit(attacker, defender, verbose=verbose, is_first_round=is_first_round)
-    wounds_info = RollToWound(attacker, defender, hits, verbose=verbose)
+    if profiler is not None:
+        token = profiler.lap("weapon_stats", token, dice)
+    hits = RollToHit(attacker, defender, verbose=False, is_first_round=is_first_round, dice=dice, log=log)
+    if profiler is not None:
+        token = profiler.lap("to_hit", token, dice)
+    wounds_info = RollToWound(attacker, defender, hits, verbose=False, dice=dice, log=log)
+    if profiler is not None:
+        token = profiler.lap("to_wound", token, dice)
     # Unpack minimal expected tuple safely
     if wounds_info is None:
         total_wounds = 0
@@ -570,26 +501,16 @@ def OneRoundMeleeCombat(
 
 
     # Do not auto-kill here; return killing blow info for higher-level resolution
-    saves = RollArmorSave(attacker, defender, total_wounds, wound_rolls, verbose=verbose)
+    saves = RollArmorSave(attacker, defender, total_wounds, wound_rolls, verbose=False, dice=dice, log=log)
+    if profiler is not None:
+        profiler.lap("armour_save", token, dice)
     
     # Effective wounds after saves
     effective_wounds = max(0, total_wounds - saves)
     reset_weapon_stats(attacker)
-    # Determine if the attack was flaming (weapon or attacker rules)
-    is_flaming = False
-    try:
-        # Check attacker and weapon for flaming
-        if attacker.SpecialRules and FlamingAttacks in attacker.SpecialRules:
-            is_flaming = True
-    except Exception:
-        pass
-    weapon_rules = get_weapon_special_rules(attacker.Weapon)
-    if weapon_rules and FlamingAttacks in weapon_rules:
-        is_flaming = True
-        
-    if weapon_rules and Magic in weapon_rules:
-        is_magical = True
-
+    # Determine if the attack was flaming or magical (weapon or attacker rules)
+    is_flaming = attacker.compiled_rules.is_flaming
+    is_magical = attacker.compiled_rules.is_magical
 
     return {
         'hits': hits,
@@ -603,26 +524,311 @@ def OneRoundMeleeCombat(
     }
 
 
-def combat_simulation(
+def get_strike_profile(attacker: Character, defender: Character, is_first_round: bool = True) -> dict[str, int | bool | None]:
+    """Resolve every rule that shapes one attacker->defender strike into plain numbers.
+
+    The profile describes the same strike as OneRoundMeleeCombat followed by
+    resolve_melee_result, but without rolling any dice, so batch and exact
+    engines can share the rule handling of the scalar functions.
+
+    Args:
+        attacker: The Character making the attack
+        defender: The Character being attacked
+        is_first_round: Whether this is first round (affects weapon bonuses and Hatred)
+
+    Returns:
+        dict containing:
+        - attacks (int): Number of attacks rolled to hit
+        - to_hit (int): D6 target to hit
+        - reroll_ones (bool): Whether hit rolls of 1 are rerolled
+        - hatred (bool): Whether failed hit rolls are rerolled (Hatred)
+        - to_wound (int | None): D6 target to wound, or None if no wounds are possible
+        - killing_blow (bool): Whether wound rolls of 6 trigger a Killing Blow
+        - save_target (int | None): Armour save against a wound, or None if no save
+        - save_target_ab (int | None): Armour save against a wound rolled on a 6
+        - ward_target (int | None): Defender's ward save against this attack
+        - regen_target (int | None): Defender's regeneration save
+        - is_flaming (bool): Whether the attack is Flaming
+        - is_magical (bool): Whether the attack is Magical
+    """
+    apply_weapon_stats(attacker, is_first_round=is_first_round, verbose=False)
+    try:
+        strength = attacker.Strength
+        armour_piercing = abs(attacker.ArmourPiercing or 0)
+    finally:
+        reset_weapon_stats(attacker)
+
+    # Attack properties from the attacker's and weapon's special rules
+    attacker_rules = attacker.compiled_rules
+    is_magical = attacker_rules.is_magical
+    is_flaming = attacker_rules.is_flaming
+    is_ethereal = defender.compiled_rules.is_ethereal
+
+    to_wound = None
+    if not (is_ethereal and not is_magical):
+        to_wound = Wounds_vs_ToughnessChart[strength - 1][defender.Toughness - 1]
+
+    # Armour saves, with extra AP from Armor Bane on wound rolls of 6
+    save_target = None
+    save_target_ab = None
+    base_save = get_base_armor_save(defender)
+    if base_save is not None:
+        ab_value = attacker_rules.armour_bane
+        save_target = max(2, base_save + armour_piercing)
+        save_target_ab = max(2, base_save + armour_piercing + ab_value)
+        save_target = save_target if save_target <= 6 else None
+        save_target_ab = save_target_ab if save_target_ab <= 6 else None
+
+    return {
+        'attacks': attacker.Attacks,
+        'to_hit': WeaponSkillChart[attacker.WeaponSkill - 1][defender.WeaponSkill - 1],
+        'reroll_ones': attacker_rules.reroll_hits is not None,
+        'hatred': is_first_round and is_hated_enemy(attacker, defender),
+        'to_wound': to_wound,
+        'killing_blow': attacker_rules.killing_blow is not None,
+        'save_target': save_target,
+        'save_target_ab': save_target_ab,
+        'ward_target': get_ward_save_target(defender, is_flaming),
+        'regen_target': get_regeneration_target(defender),
+        'is_flaming': is_flaming,
+        'is_magical': is_magical,
+    }
+
+
+def determine_strike_order(
     character_1: Character,
     character_2: Character,
+    verbose: bool = True,
+    log: CombatLog | None = None,
+) -> tuple[list[tuple[Character, Character]], bool]:
+    """Determine who strikes first in a round of combat.
+
+    Args:
+        character_1: First combatant
+        character_2: Second combatant
+        verbose: Whether to print how the strike order was decided
+        log: CombatLog receiving a StrikeOrder event (overrides verbose)
+
+    Returns:
+        tuple containing:
+        - list[tuple[Character, Character]]: (attacker, defender) pairs in strike order
+        - bool: Whether both characters strike simultaneously
+
+    Strike Order:
+        - Strike First beats no rule, no rule beats Strike Last
+        - If both have the same rule (or neither has one), higher Initiative strikes first
+        - Equal Initiative means both strike simultaneously
+    """
+    # Decide strike timing this round
+    simultaneous_combat = False
+    c1_first = False
+
+    # Check for Strike First/Last
+    c1_strikes_first = character_1.compiled_rules.strike_first
+    c2_strikes_first = character_2.compiled_rules.strike_first
+    c1_strikes_last = character_1.compiled_rules.strike_last
+    c2_strikes_last = character_2.compiled_rules.strike_last
+
+    if c1_strikes_first and not c2_strikes_first:
+        c1_first = True
+        reason = "strike_first"
+    elif c2_strikes_first and not c1_strikes_first:
+        reason = "strike_first"
+    elif c1_strikes_last and not c2_strikes_last:
+        reason = "strike_last"
+    elif c2_strikes_last and not c1_strikes_last:
+        c1_first = True
+        reason = "strike_last"
+    else:
+        # Same rule on both sides (or none) - fall back to Initiative
+        if c1_strikes_first:
+            reason = "both_strike_first"
+        elif c1_strikes_last:
+            reason = "both_strike_last"
+        else:
+            reason = "initiative"
+
+        if character_1.Initiative == character_2.Initiative:
+            simultaneous_combat = True
+        elif character_1.Initiative > character_2.Initiative:
+            c1_first = True
+
+    log = resolve_log(verbose, log)
+    if log is not None:
+        first = None if simultaneous_combat else (character_1 if c1_first else character_2).name
+        log.emit(StrikeOrder(character_1.name, character_2.name, reason, first,
+                             character_1.Initiative, character_2.Initiative))
+
+    if c1_first or simultaneous_combat:
+        order = [(character_1, character_2), (character_2, character_1)]
+    else:
+        order = [(character_2, character_1), (character_1, character_2)]
+    return order, simultaneous_combat
+
+
+def resolve_melee_result(
+    attacker: Character,
+    defender: Character,
+    result: dict[str, int | bool | list[int] | None],
+    verbose: bool = True,
+    dice: DiceSource | None = None,
+    log: CombatLog | None = None,
+    profiler: CombatProfiler | None = None,
+) -> bool:
+    """Apply one OneRoundMeleeCombat result to the defender.
+
+    Args:
+        attacker: The Character that made the attack
+        defender: The Character that was attacked
+        result: The dict returned by OneRoundMeleeCombat
+        verbose: Whether to print detailed results
+        dice: DiceSource for all rolls (defaults to the module-wide source)
+        log: CombatLog receiving the save and wound events (overrides verbose)
+        profiler: CombatProfiler charged with the time and dice of ward and
+            regeneration saves
+
+    Returns:
+        bool: True if the defender was slain
+
+    Effects:
+        - Resolves a Killing Blow: ward save, then regeneration, else instant death
+        - Rolls ward then regeneration saves against the remaining wounds
+        - Reduces defender.current_wounds by the wounds that get through
+    """
+    dice = dice if dice is not None else get_default_dice()
+    log = resolve_log(verbose, log)
+    wounds = result.get('wounds', 0)
+    is_flaming = result.get('is_flaming', False)
+
+    # First handle potential killing blow
+    if result.get('killing_blow_triggered', False):
+        if log is not None:
+            log.emit(KillingBlowOutcome(defender.name, "triggered"))
+        # First attempt ward save against the killing blow
+        if profiler is not None:
+            token = profiler.start(dice)
+        warded = attempt_ward_save(defender, 1, is_flaming, False, dice, log)
+        if profiler is not None:
+            token = profiler.lap("ward_save", token, dice)
+        if warded:
+            if log is not None:
+                log.emit(KillingBlowOutcome(defender.name, "warded"))
+        # Then attempt regeneration save against the killing blow
+        else:
+            regenerated = attempt_regeneration_save(defender, 1, False, dice, log)
+            if profiler is not None:
+                profiler.lap("regeneration", token, dice)
+            if regenerated:
+                if log is not None:
+                    log.emit(KillingBlowOutcome(defender.name, "regenerated"))
+            else:
+                # Neither ward nor regeneration succeeded - instant death
+                defender.current_wounds = 0
+                if log is not None:
+                    log.emit(KillingBlowOutcome(defender.name, "slain"))
+                return True
+
+    # Handle regular wounds (if no killing blow or it was warded)
+    if wounds:
+        # First attempt ward saves against regular wounds
+        if profiler is not None:
+            token = profiler.start(dice)
+        wounds_after_wards = wounds - attempt_ward_save(defender, wounds, is_flaming, False, dice, log)
+        if profiler is not None:
+            token = profiler.lap("ward_save", token, dice)
+
+        # Then attempt regeneration for any wounds that weren't warded
+        wounds_after_regen = 0
+        if wounds_after_wards > 0:
+            wounds_after_regen = wounds_after_wards - attempt_regeneration_save(defender, wounds_after_wards, False, dice, log)
+            if profiler is not None:
+                profiler.lap("regeneration", token, dice)
+
+        # Apply any wounds that weren't warded or regenerated
+        if wounds_after_regen > 0:
+            defender.current_wounds = max(0, defender.current_wounds - wounds_after_regen)
+        if log is not None:
+            log.emit(WoundsApplied(defender.name, wounds, wounds_after_regen, defender.current_wounds))
+
+    return defender.current_wounds <= 0
+
+
+def take_leadership_test(
+    character: Character,
+    test: str,
+    target: int,
+    reroll: bool = False,
+    dice: DiceSource | None = None,
+    log: CombatLog | None = None,
+) -> bool:
+    """Roll a Fear, Terror, Break or Panic test for a character.
+
+    Args:
+        character: The Character taking the test
+        test: Name of the test, for the log
+        target: 2D6 total needed or less
+        reroll: Whether a failed test is rerolled
+        dice: DiceSource for all rolls (defaults to the module-wide source)
+        log: CombatLog receiving a LeadershipTest event
+
+    Returns:
+        bool: True if the test was passed
+    """
+    dice = dice if dice is not None else get_default_dice()
+    passed, roll = leadership_test(target, dice, reroll)
+    if log is not None:
+        log.emit(LeadershipTest(character.name, test, target, roll, passed))
+    return passed
+
+
+def combat_simulation(
+    character_1: Character | CharacterSpec,
+    character_2: Character | CharacterSpec,
     rounds: int = 2,
     Shooting: bool = False,
     verbose: bool = True,
-) -> Character | None:
+    dice: DiceSource | int | None = None,
+    log: CombatLog | None = None,
+    profiler: CombatProfiler | None = None,
+    leadership: bool = False,
+    ranged_weapons: tuple[str | None, str | None] = (None, None),
+) -> Character | CharacterSpec | None:
     """Simulate a full combat between two characters.
     
     Args:
-        character_1: First combatant
-        character_2: Second combatant
+        character_1: First combatant (Character or CharacterSpec)
+        character_2: Second combatant (Character or CharacterSpec)
         rounds: Maximum number of combat rounds
-        Shooting: Whether this is a shooting phase (not yet implemented)
+        Shooting: Whether both fighters shoot with their ranged weapons (if
+            any) before the first round of melee
         verbose: Whether to print detailed combat results
+        dice: DiceSource for all rolls, or a seed for a new one (defaults to the
+            module-wide source)
+        log: CombatLog receiving every combat event (overrides verbose). With
+            verbose=False and no log, no events are built at all.
+        profiler: CombatProfiler accumulating time, calls and dice per phase
+            (shooting, strike order, weapon stats, to-hit, to-wound, armour,
+            ward and regeneration saves); read the totals with profiler.report()
+        leadership: Whether Terror, Fear and break tests apply, so a fighter
+            can flee instead of being slain
+        ranged_weapons: Ranged weapon each fighter shoots with when Shooting,
+            kept apart from the melee Weapon it fights with; None falls back to
+            the fighter's Weapon, so it only shoots if that is a ranged weapon
     
     Returns:
-        Character | None: Winning character, or None if combat was a draw
+        Character | CharacterSpec | None: The winning combatant as passed in,
+        or None if combat was a draw
+
+    The combatants are never modified: the combat runs on a CombatState per
+    fighter, so the same Character or CharacterSpec can be reused for any
+    number of simulations. Pass CharacterSpecs to skip the snapshot step.
+
+    verbose=True prints each event through PRINT_LOG; to keep events instead,
+    pass e.g. CombatLog(buffer_size=200) and read log.events() or log.render().
         
     Combat Flow:
+        0. Shooting (if enabled): each fighter with a ranged weapon (from
+           ranged_weapons, else its Weapon) fires once
         1. Determine strike order (StrikeFirst/Last, Initiative)
         2. Each character attacks in order
         3. For each attack:
@@ -633,224 +839,151 @@ def combat_simulation(
             - Apply regeneration saves
         4. Apply remaining wounds
         5. Check for victory conditions
-    
+        With leadership, a Terror test comes before the first round, Fear
+        tests start every round and the loser of each round takes a break test.
+
     Victory Conditions:
         - Instant win on successful Killing Blow (after saves)
         - Win when opponent reaches 0 wounds
+        - Win when opponent fails a Terror or break test and flees
         - Most wounds remaining after all rounds
-        - Draw if equal wounds remaining
+        - Draw if equal wounds remaining (or both slain in a simultaneous strike)
     """
-    # Initialize current wounds at start of combat
-    character_1.current_wounds = character_1.Wounds
-    character_2.current_wounds = character_2.Wounds
-    for r in range(rounds):
-        if verbose:
-            print(f"Round {r+1}")
-
-        # Determine strike order: check StrikeFirst/StrikeLast rules and Initiative
-        c1_rules = character_1.SpecialRules if character_1.SpecialRules else []
-        c2_rules = character_2.SpecialRules if character_2.SpecialRules else []
+    if dice is None:
+        dice = get_default_dice()
+    elif not isinstance(dice, DiceSource):
+        dice = DiceSource(dice)
+
+    # Fresh combat state per fighter; wounds start at the profile value
+    fighter_1 = CombatState(as_spec(character_1))
+    fighter_2 = CombatState(as_spec(character_2))
+    combatants = {id(fighter_1): character_1, id(fighter_2): character_2}
+    log = resolve_log(verbose, log)
+    if profiler is not None:
+        profiler.combats += 1
+
+    if Shooting:
+        # Imported here: shooting builds on the batch engine, which imports this module
+        from shooting import get_ranged_weapon, shoot_character
+        pairs = ((fighter_1, fighter_2), (fighter_2, fighter_1))
+        for (shooter, _), ranged_weapon in zip(pairs, ranged_weapons):
+            if ranged_weapon is not None:
+                get_ranged_weapon(shooter, ranged_weapon)  # Raises ValueError for anything but a ranged weapon
+        if profiler is not None:
+            token = profiler.start(dice)
+        for (shooter, target), ranged_weapon in zip(pairs, ranged_weapons):
+            shoot_character(shooter, target, dice, ranged_weapon=ranged_weapon, log=log)
+        if profiler is not None:
+            profiler.lap("shooting", token, dice)
+        c1_slain = fighter_1.current_wounds <= 0
+        c2_slain = fighter_2.current_wounds <= 0
+        if c1_slain and c2_slain:
+            if log is not None:
+                log.emit(Stalemate(both_slain=True))
+            return None
+        if c1_slain or c2_slain:
+            winner, loser = (fighter_2, fighter_1) if c1_slain else (fighter_1, fighter_2)
+            if log is not None:
+                log.emit(Victory(winner.name, loser.name))
+            return combatants[id(winner)]
+
+    if leadership:
+        # Terror: a failed test means fleeing before a blow is struck
+        for fighter, enemy in ((fighter_1, fighter_2), (fighter_2, fighter_1)):
+            if takes_terror_test(fighter, enemy) and not take_leadership_test(
+                fighter, "Terror", fighter.Leadership, psychology_reroll(fighter), dice, log
+            ):
+                if log is not None:
+                    log.emit(Flee(fighter.name, enemy.name))
+                    log.emit(Victory(enemy.name, fighter.name))
+                return combatants[id(enemy)]
 
-        # Decide strike timing this round
-        simultaneous_combat = False
-        c1_first = False
-        c2_first = False
-        
-        if verbose:
-            print("\nDetermining strike order...")
-
-        # Check for Strike First/Last
-        c1_strikes_first = 'Strike First' in c1_rules
-        c2_strikes_first = 'Strike First' in c2_rules
-        c1_strikes_last = 'Strike Last' in c1_rules
-        c2_strikes_last = 'Strike Last' in c2_rules
-
-        if c1_strikes_first and c2_strikes_first:
-            # Both have Strike First - simultaneous based on Initiative
-            if verbose:
-                print(f"Both {character_1.name} and {character_2.name} have Strike First")
-            if character_1.Initiative == character_2.Initiative:
-                simultaneous_combat = True
-                if verbose:
-                    print("Equal Initiative - both strike simultaneously")
-            elif character_1.Initiative > character_2.Initiative:
-                c1_first = True
-                if verbose:
-                    print(f"{character_1.name} has higher Initiative and strikes first")
-            else:
-                c2_first = True
-                if verbose:
-                    print(f"{character_2.name} has higher Initiative and strikes first")
-        elif c1_strikes_last and c2_strikes_last:
-            # Both have Strike Last - simultaneous based on Initiative
-            if verbose:
-                print(f"Both {character_1.name} and {character_2.name} have Strike Last")
-            if character_1.Initiative == character_2.Initiative:
-                simultaneous_combat = True
-                if verbose:
-                    print("Equal Initiative - both strike simultaneously")
-            elif character_1.Initiative > character_2.Initiative:
-                c1_first = True
-                if verbose:
-                    print(f"{character_1.name} has higher Initiative and strikes first")
-            else:
-                c2_first = True
-                if verbose:
-                    print(f"{character_2.name} has higher Initiative and strikes first")
-        elif c1_strikes_first and not c2_strikes_first:
-            c1_first = True
-            if verbose:
-                print(f"{character_1.name} has Strike First and {character_2.name} doesn't - {character_1.name} strikes first")
-        elif c2_strikes_first and not c1_strikes_first:
-            c2_first = True
-            if verbose:
-                print(f"{character_2.name} has Strike First and {character_1.name} doesn't - {character_2.name} strikes first")
-        elif c1_strikes_last and not c2_strikes_last:
-            c1_first = False
-            if verbose:
-                print(f"{character_1.name} has Strike Last and must strike after {character_2.name}")
-        elif c2_strikes_last and not c1_strikes_last:
-            c2_first = False
-            if verbose:
-                print(f"{character_2.name} has Strike Last and must strike after {character_1.name}")
-        else:
-            # No Strike First/Last - fall back to Initiative
-            if verbose:
-                print("No Strike First/Last rules - comparing Initiative values")
-                print(f"{character_1.name}: Initiative {character_1.Initiative}")
-                print(f"{character_2.name}: Initiative {character_2.Initiative}")
-            
-            if character_1.Initiative == character_2.Initiative:
-                simultaneous_combat = True
-                if verbose:
-                    print("Equal Initiative - both strike simultaneously")
-            elif character_1.Initiative > character_2.Initiative:
-                c1_first = True
-                if verbose:
-                    print(f"{character_1.name} has higher Initiative and strikes first")
-            else:
-                c2_first = True
-                if verbose:
-                    print(f"{character_2.name} has higher Initiative and strikes first")
+    for r in range(rounds):
+        if log is not None:
+            log.emit(RoundStart(r + 1))
+
+        if leadership:
+            # Fear: a failed test drops Weapon Skill to 1 for the round
+            wounds_at_start = (fighter_1.current_wounds, fighter_2.current_wounds)
+            for fighter, enemy in ((fighter_1, fighter_2), (fighter_2, fighter_1)):
+                fighter.WeaponSkill = fighter.spec.WeaponSkill
+                if takes_fear_test(fighter, enemy) and not take_leadership_test(
+                    fighter, "Fear", fighter.Leadership, psychology_reroll(fighter), dice, log
+                ):
+                    fighter.WeaponSkill = 1
+
+        if profiler is not None:
+            token = profiler.start(dice)
+        order, simultaneous_combat = determine_strike_order(fighter_1, fighter_2, verbose=False, log=log)
+        if profiler is not None:
+            profiler.lap("strike_order", token, dice)
 
-        # Create list of attackers and track pending strikes
-        order = []
         if simultaneous_combat:
             # Both strike at once - calculate all results before applying any
+            if log is not None:
+                log.emit(Message("\nSimultaneous combat round - both fighters strike before wounds are applied"))
             pending_results = []
-            
-            # Both characters strike
-            if verbose:
-                print(f"\nSimultaneous combat round - both fighters strike before wounds are applied")
-            
-            # First character strikes
-            if verbose:
-                print(f"\n{character_1.name} strikes:")
-            result1 = OneRoundMeleeCombat(character_1, character_2, verbose=verbose, is_first_round=(r==0))
-            pending_results.append((character_1, character_2, result1))
-            
-            # Second character strikes
-            if verbose:
-                print(f"\n{character_2.name} strikes:")
-            result2 = OneRoundMeleeCombat(character_2, character_1, verbose=verbose, is_first_round=(r==0))
-            pending_results.append((character_2, character_1, result2))
-            
-            if verbose:
-                print("\nApplying all combat results:")
-            
-            # Now apply all results
+            for attacker, defender in order:
+                if log is not None:
+                    log.emit(StrikeStart(attacker.name, defender.name, simultaneous=True))
+                result = OneRoundMeleeCombat(attacker, defender, verbose=False, is_first_round=(r==0), dice=dice, log=log, profiler=profiler)
+                pending_results.append((attacker, defender, result))
+
+            if log is not None:
+                log.emit(Message("\nApplying all combat results:"))
             for attacker, defender, result in pending_results:
-                if verbose:
-                    print(f"{attacker.name} vs {defender.name}: {result}")
-                if result:
-                    defender.current_wounds = max(0, defender.current_wounds - result)
+                if log is not None:
+                    log.emit(StrikeResult(attacker.name, defender.name, result))
+                resolve_melee_result(attacker, defender, result, False, dice, log, profiler)
+
+            c1_slain = fighter_1.current_wounds <= 0
+            c2_slain = fighter_2.current_wounds <= 0
+            if c1_slain and c2_slain:
+                if log is not None:
+                    log.emit(Stalemate(both_slain=True))
+                return None
+            if c1_slain or c2_slain:
+                winner, loser = (fighter_2, fighter_1) if c1_slain else (fighter_1, fighter_2)
+                if log is not None:
+                    log.emit(Victory(winner.name, loser.name))
+                return combatants[id(winner)]
         else:
             # Normal sequential combat
-            if c1_first:
-                order = [(character_1, character_2), (character_2, character_1)]
-            else:
-                order = [(character_2, character_1), (character_1, character_2)]
-                
-            # Execute strikes in order
             for attacker, defender in order:
-                if verbose:
-                    print(f"\n{attacker.name} strikes at {defender.name}!")
-                result = OneRoundMeleeCombat(attacker, defender, verbose=verbose, is_first_round=(r==0))
-                if result:
-                    wounds = result['wounds'] if isinstance(result, dict) else result
-                    if wounds and verbose:
-                        print(f"{defender.name} takes {wounds} wounds!")
-                    defender.current_wounds = max(0, defender.current_wounds - wounds)
-            if verbose:
-                print(f"{attacker.name} strikes at {defender.name}!")
-            result = OneRoundMeleeCombat(attacker, defender, verbose=verbose, is_first_round=(r==0))
-            # Process wounds and killing blows
-            wounds = result.get('wounds', 0) if isinstance(result, dict) else 0
-            is_flaming = result.get('is_flaming', False) if isinstance(result, dict) else False
-            killing_blow = result.get('killing_blow_triggered', False) if isinstance(result, dict) else False
-
-            # First handle potential killing blow
-            if killing_blow:
-                if verbose:
-                    print(f"Killing Blow triggered against {defender.name}!")
-                # First attempt ward save against the killing blow
-                wards_vs_killing = attempt_ward_save(defender, 1, is_flaming, verbose)
-                if wards_vs_killing:
-                    if verbose:
-                        print(f"{defender.name} wards off the Killing Blow!")
-                    # Killing blow warded; proceed with normal wound resolution
-                else:
-                    # Attempt regeneration save against the killing blow
-                    regen_vs_killing = attempt_regeneration_save(defender, 1, verbose)
-                    if regen_vs_killing:
-                        if verbose:
-                            print(f"{defender.name} regenerates from the Killing Blow!")
-                        # Killing blow regenerated; proceed with normal wound resolution
-                    else:
-                        # Neither ward nor regeneration succeeded - instant death
-                        defender.Wounds = 0
-                        winner = attacker
-                        loser = defender
-                        print(f"{winner.name} stands victorious, the blood of {loser.name} stains the field of battle")
-                        return winner
-
-            # Handle regular wounds (if no killing blow or it was warded)
-            if wounds:
-                # First attempt ward saves against regular wounds
-                wounds_after_wards = wounds - attempt_ward_save(defender, wounds, is_flaming, verbose)
-                
-                # Then attempt regeneration for any wounds that weren't warded
-                if wounds_after_wards > 0:
-                    wounds_after_regen = wounds_after_wards - attempt_regeneration_save(defender, wounds_after_wards, verbose)
-                    
-                    # Apply any wounds that weren't warded or regenerated
-                    if wounds_after_regen > 0:
-                        defender.Wounds = max(0, defender.Wounds - wounds_after_regen)
-                        if verbose:
-                            saved_wounds = wounds - wounds_after_regen
-                            if saved_wounds > 0:
-                                print(f"{defender.name} saved {saved_wounds} wound(s) through wards/regeneration.")
-                            print(f"{defender.name} suffers {wounds_after_regen} wound(s). Remaining Wounds: {defender.Wounds}")
-
-            # Check if defender died from regular wounds
-            if defender.Wounds <= 0:
-                winner = attacker
-                loser = defender
-                print(f"{winner.name} stands victorious, the blood of {loser.name} stains the field of battle")
-                return winner
+                if log is not None:
+                    log.emit(StrikeStart(attacker.name, defender.name))
+                result = OneRoundMeleeCombat(attacker, defender, verbose=False, is_first_round=(r==0), dice=dice, log=log, profiler=profiler)
+                if resolve_melee_result(attacker, defender, result, False, dice, log, profiler):
+                    if log is not None:
+                        log.emit(Victory(attacker.name, defender.name))
+                    return combatants[id(attacker)]
+
+        if leadership:
+            # Break test for the fighter that lost the round on wounds caused
+            caused_1 = wounds_at_start[1] - fighter_2.current_wounds
+            caused_2 = wounds_at_start[0] - fighter_1.current_wounds
+            if caused_1 != caused_2:
+                winner, loser = (fighter_1, fighter_2) if caused_1 > caused_2 else (fighter_2, fighter_1)
+                target = break_test_target(loser, loser.Leadership, abs(caused_1 - caused_2))
+                if not take_leadership_test(loser, "Break", target, break_test_reroll(loser), dice, log):
+                    if log is not None:
+                        log.emit(Flee(loser.name, winner.name))
+                        log.emit(Victory(winner.name, loser.name))
+                    return combatants[id(winner)]
 
     # No decisive winner after rounds
-    if character_1.current_wounds > character_2.current_wounds:
-        winner = character_1
-        loser = character_2
-    elif character_2.current_wounds > character_1.current_wounds:
-        winner = character_2
-        loser = character_1
+    if fighter_1.current_wounds > fighter_2.current_wounds:
+        winner = fighter_1
+        loser = fighter_2
+    elif fighter_2.current_wounds > fighter_1.current_wounds:
+        winner = fighter_2
+        loser = fighter_1
     else:
         # Tie -> no one stands victorious
-        if verbose:
-            print("The battle ends in a bloody stalemate.")
+        if log is not None:
+            log.emit(Stalemate())
         return None
 
-    print(f"{winner.name} stands victorious, the blood of {loser.name} stains the field of battle")
-    return winner
+    if log is not None:
+        log.emit(Victory(winner.name, loser.name))
+    return combatants[id(winner)]
@@ -0,0 +1,288 @@
+# NumPy is imported on first use, so importing the scalar engine doesn't pay for it
+
+# Dice in a source's first refill; each refill doubles until buffer_size, so a
+# source seeded for one duel doesn't draw (and convert) a full buffer
+FIRST_REFILL = 64
+
+
+class DiceSource:
+    """Source of D6 rolls backed by a seeded NumPy random Generator.
+
+    Single dice are served from a pre-drawn buffer that is refilled in bulk,
+    which avoids a NumPy call per die. Refills start at FIRST_REFILL dice
+    and double up to buffer_size, so short-lived sources stay cheap. Two
+    sources built from the same seed produce the same dice, and spawn() gives
+    independent child streams for parallel workers.
+
+    Args:
+        seed: Seed (int, SeedSequence or None for fresh entropy)
+        buffer_size: Largest number of dice drawn per refill
+    """
+
+    def __init__(self, seed: "int | np.random.SeedSequence | None" = None, buffer_size: int = 65536):
+        import numpy as np
+
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.generator = np.random.default_rng(self.seed_sequence)
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._position = 0
+        self._drawn = 0  # Dice drawn before the current buffer
+        self._refill_size = min(FIRST_REFILL, buffer_size)
+
+    def _refill(self) -> None:
+        self._drawn += self._position
+        # Python ints index much faster than NumPy scalars
+        self._buffer = self.generator.integers(1, 7, size=self._refill_size, dtype="int8").tolist()
+        self._position = 0
+        self._refill_size = min(2 * self._refill_size, self.buffer_size)
+
+    def roll(self) -> int:
+        """Roll one D6."""
+        if self._position >= len(self._buffer):
+            self._refill()
+        value = self._buffer[self._position]
+        self._position += 1
+        return value
+
+    def roll_many(self, size) -> "np.ndarray":
+        """Roll a block of D6s as a NumPy int8 array of the given shape."""
+        rolls = self.generator.integers(1, 7, size=size, dtype="int8")
+        self._drawn += rolls.size
+        return rolls
+
+    @property
+    def rolls(self) -> int:
+        """Total number of dice rolled from this source so far."""
+        return self._drawn + self._position
+
+    def spawn(self, count: int) -> list["DiceSource"]:
+        """Return independent child sources, e.g. one per worker process."""
+        return [DiceSource(child, self.buffer_size) for child in self.seed_sequence.spawn(count)]
+
+
+_default_dice = None
+
+
+def get_default_dice() -> DiceSource:
+    """Return the module-wide DiceSource used when no dice are passed in."""
+    global _default_dice
+    if _default_dice is None:
+        _default_dice = DiceSource()
+    return _default_dice
+
+
+def seed_dice(seed: "int | np.random.SeedSequence | None" = None) -> DiceSource:
+    """Replace the module-wide DiceSource with a freshly seeded one and return it."""
+    global _default_dice
+    _default_dice = DiceSource(seed)
+    return _default_dice
+
+
+def as_generator(rng: "DiceSource | np.random.Generator | np.random.SeedSequence | int | None") -> "np.random.Generator":
+    """Return a NumPy Generator for a DiceSource, Generator, or seed."""
+    import numpy as np
+
+    if isinstance(rng, DiceSource):
+        return rng.generator
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+# SplitMix64 constants
+_GOLDEN = 0x9E3779B97F4A7C15
+_MIX_1 = 0xBF58476D1CE4E5B9
+_MIX_2 = 0x94D049BB133111EB
+
+
+def _mix(x: "np.ndarray") -> "np.ndarray":
+    """SplitMix64 finaliser over a uint64 array (wrapping arithmetic)."""
+    import numpy as np
+
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(_MIX_1)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(_MIX_2)
+    return x ^ (x >> np.uint64(31))
+
+
+class CommonDice:
+    """Counter-based dice for common-random-number comparisons.
+
+    Every die is a hash of the seed, the duel's number, the point of the duel
+    it is rolled at (e.g. round 2, fighter 1's to-wound rolls) and its slot,
+    rather than the next draw of a stream. Two simulations driven by the same
+    CommonDice therefore roll the same dice wherever their duels line up,
+    even when one variant rolls more dice or skips a phase: a Halberd and a
+    Great Weapon Prince see the same to-hit dice against the same opponent,
+    who in turn sees the same dice against both.
+
+    Only batch_combat_simulation understands CommonDice; it takes one
+    wherever it takes an rng.
+
+    Args:
+        seed: Seed (int, SeedSequence or None for fresh entropy)
+        antithetic: Mirror every die (d -> 7 - d, u -> 1 - u)
+        offset: Number of the first duel, so consecutive chunks of a run
+            continue the sequence instead of repeating it
+    """
+
+    def __init__(self, seed: "int | np.random.SeedSequence | None" = None, antithetic: bool = False, offset: int = 0):
+        import numpy as np
+
+        seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.seed_sequence = seed_sequence
+        self.key = int(seed_sequence.generate_state(1, np.uint64)[0])
+        self.antithetic = antithetic
+        self.offset = offset
+
+    def mirrored(self) -> "CommonDice":
+        """The antithetic twin: the same dice, each replaced by 7 minus its value."""
+        return CommonDice(self.seed_sequence, not self.antithetic, self.offset)
+
+    def shifted(self, offset: int) -> "CommonDice":
+        """The same dice, starting at duel number offset."""
+        return CommonDice(self.seed_sequence, self.antithetic, offset)
+
+    def view(self, duels: "np.ndarray", *point) -> "DuelDice":
+        """Dice for the given duel indices at one point of the duel, e.g. view(index, 2, "strike", 1)."""
+        return DuelDice(self, duels, point)
+
+
+class DuelDice:
+    """CommonDice for a block of duels at one point of the duel.
+
+    Stands in for a NumPy Generator in the batch engine's dice functions:
+    d6() rolls one row of dice per duel and random() one uniform number per
+    duel, each for a named phase of that point.
+    """
+
+    def __init__(self, dice: CommonDice, duels: "np.ndarray", point: tuple):
+        import hashlib
+
+        import numpy as np
+
+        self.antithetic = dice.antithetic
+        self.size = len(duels)
+        digest = hashlib.blake2b(repr(point).encode(), digest_size=8, key=dice.key.to_bytes(8, "little")).digest()
+        self._key = int.from_bytes(digest, "little")
+        numbers = np.asarray(duels, dtype=np.uint64) + np.uint64(dice.offset)
+        self._duels = _mix(numbers * np.uint64(_GOLDEN) ^ np.uint64(self._key))
+
+    def _bits(self, shape, phase: str) -> "np.ndarray":
+        import hashlib
+
+        import numpy as np
+
+        shape = (shape,) if isinstance(shape, (int, np.integer)) else tuple(shape)
+        if not shape or shape[0] != self.size:
+            raise ValueError(f"Dice shape {shape} doesn't match the {self.size} duels of this view")
+        phase_key = int.from_bytes(hashlib.blake2b(phase.encode(), digest_size=8).digest(), "little")
+        bits = self._duels ^ np.uint64(phase_key)
+        if len(shape) == 1:
+            return _mix(bits)
+        slots = np.arange(1, shape[1] + 1, dtype=np.uint64) * np.uint64(_GOLDEN)
+        return _mix(bits[:, None] + slots[None, :])
+
+    def d6(self, shape, phase: str, used: "np.ndarray | None" = None) -> "np.ndarray":
+        """D6s as an int8 array of shape (duels,) or (duels, dice) for one phase.
+
+        used (which dice the caller will look at) only matters to TiltedDice.
+        """
+        import numpy as np
+
+        rolls = (((self._bits(shape, phase) >> np.uint64(32)) * np.uint64(6)) >> np.uint64(32)).astype(np.int8) + 1
+        return 7 - rolls if self.antithetic else rolls
+
+    def random(self, size: int, phase: str = "uniform") -> "np.ndarray":
+        """One uniform number in [0, 1) per duel, like Generator.random."""
+        import numpy as np
+
+        uniform = (self._bits(size, phase) >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+        return 1.0 - uniform if self.antithetic else uniform
+
+
+def tilt_probabilities(theta: float) -> "np.ndarray":
+    """Face probabilities of an exponentially tilted D6: P(v) proportional to exp(theta * v)."""
+    import numpy as np
+
+    weights = np.exp(theta * np.arange(1, 7))
+    return weights / weights.sum()
+
+
+class TiltedDice:
+    """Biased dice for importance sampling, with per-duel likelihood ratios.
+
+    tilt(point, phase) gives the face probabilities (six floats, or None for
+    fair dice) of the dice rolled at a point of the duel, e.g. (0, "strike", 1)
+    for fighter 1's first-round strike, and phase, e.g. "wound". Each duel's
+    log_weight collects log(fair / tilted probability) of every die it used,
+    so averaging exp(log_weight) * indicator over the duels is an unbiased
+    estimate of the indicator's probability under fair dice. Leadership
+    tests are not tilted.
+
+    With record set, counts[(point, phase)] holds how often each duel used
+    each face there, for refitting the tilt (see rare_events).
+
+    Args:
+        rng: NumPy random Generator, or a seed for a new one
+        tilt: Function of (point, phase) returning face probabilities or None
+        num_duels: Number of duels of the simulation these dice are for
+        record: Whether to count the faces each duel used
+    """
+
+    def __init__(self, rng: "np.random.Generator | int | None", tilt, num_duels: int, record: bool = False):
+        import numpy as np
+
+        self.generator = as_generator(rng)
+        self.tilt = tilt
+        self.num_duels = num_duels
+        self.log_weight = np.zeros(num_duels)
+        self.counts = {} if record else None
+
+    def view(self, duels: "np.ndarray", *point) -> "TiltedDuelDice":
+        """Dice for the given duel indices at one point of the duel."""
+        return TiltedDuelDice(self, duels, point)
+
+    @property
+    def weights(self) -> "np.ndarray":
+        """Likelihood ratio of each duel."""
+        import numpy as np
+
+        return np.exp(self.log_weight)
+
+
+class TiltedDuelDice:
+    """TiltedDice for a block of duels at one point of the duel (see DuelDice)."""
+
+    def __init__(self, dice: TiltedDice, duels: "np.ndarray", point: tuple):
+        self.dice = dice
+        self.duels = duels
+        self.point = point
+
+    def d6(self, shape, phase: str, used: "np.ndarray | None" = None) -> "np.ndarray":
+        """D6s of shape (duels,) or (duels, dice); only the used dice count towards the weights."""
+        import numpy as np
+
+        dice = self.dice
+        probabilities = dice.tilt(self.point, phase)
+        if probabilities is None:
+            rolls = dice.generator.integers(1, 7, size=shape, dtype=np.int8)
+        else:
+            probabilities = np.asarray(probabilities, dtype=np.float64)
+            cumulative = np.cumsum(probabilities[:-1]) / probabilities.sum()
+            rolls = (np.searchsorted(cumulative, dice.generator.random(shape), side="right") + 1).astype(np.int8)
+            ratios = (np.log(1 / 6) - np.log(probabilities / probabilities.sum()))[rolls - 1]
+            if used is not None:
+                ratios = np.where(used, ratios, 0.0)
+            dice.log_weight[self.duels] += ratios.sum(axis=1) if ratios.ndim > 1 else ratios
+        if dice.counts is not None:
+            counts = dice.counts.setdefault((self.point, phase), np.zeros((dice.num_duels, 6), dtype=np.int32))
+            faces = rolls if used is None else np.where(used, rolls, 0)
+            faces = faces.reshape(len(self.duels), -1)
+            for face in range(1, 7):
+                counts[self.duels, face - 1] += np.count_nonzero(faces == face, axis=1)
+        return rolls
+
+    def random(self, size: int) -> "np.ndarray":
+        """Uniform numbers in [0, 1), untilted."""
+        return self.dice.generator.random(size)
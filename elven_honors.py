@@ -1,4 +1,4 @@
-from special_rules import *
+from special_rules import BlessingsofAsuryan, DragonArmour
 
 ElvenHonors = {
     "Loremaster": {
@@ -18,7 +18,7 @@ ElvenHonors = {
     },
     
     "BloodofCaledor":{
-        "stat_mods": {+1:"WeaponSkill"},
+        "stat_mods": {"WeaponSkill": 1},
         "special_rules":[DragonArmour,"Impetous","FreeFullPlate"],
         "equipment_options": {"weapons": []}
     },
@@ -0,0 +1,314 @@
+from math import comb
+
+import numpy as np
+
+from character_model import Character, CharacterSpec, CombatState, as_spec
+from batch_simulations import _strike_profile
+from combat_simulations import determine_strike_order, get_strike_profile
+from leadership import break_test_probability, psychology_test_probability, takes_fear_test, takes_terror_test
+
+
+def d6_success(target: int | None) -> float:
+    """Probability that one D6 rolls target or higher (0 if target is None or above 6)."""
+    if target is None or target > 6:
+        return 0.0
+    return (7 - max(1, target)) / 6
+
+
+def hit_probability(profile: dict) -> float:
+    """Probability that a single attack hits, with rerolls folded in.
+
+    Handles rerolled 1s (Ithilmar Weapons, RerollHits1) and first-round
+    Hatred, which rerolls failed hits (again rerolling 1s if allowed).
+    """
+    p = d6_success(profile['to_hit'])
+    if profile['reroll_ones']:
+        p += p / 6  # A 1 is rerolled and hits with the same chance
+    if profile['hatred']:
+        p += (1 - p) * p
+    return p
+
+
+def strike_outcome_probabilities(profile: dict) -> np.ndarray:
+    """Probabilities of the outcomes of a single attack.
+
+    Returns:
+        np.ndarray: 2x2 array indexed by [unsaved wound, Killing Blow], where
+        each index is 0 or 1
+    """
+    outcome = np.zeros((2, 2))
+    to_wound = profile['to_wound']
+    if to_wound is None:
+        outcome[0, 0] = 1.0
+        return outcome
+
+    p_hit = hit_probability(profile)
+    p_wound_on_6 = p_hit / 6
+    p_wound_below_6 = p_hit * max(0, 6 - max(2, to_wound)) / 6
+    p_save = d6_success(profile['save_target'])
+    p_save_ab = d6_success(profile['save_target_ab'])
+
+    kb = 1 if profile['killing_blow'] else 0
+    outcome[1, kb] += p_wound_on_6 * (1 - p_save_ab)
+    outcome[0, kb] += p_wound_on_6 * p_save_ab
+    outcome[1, 0] += p_wound_below_6 * (1 - p_save)
+    outcome[0, 0] += 1 - p_wound_on_6 - p_wound_below_6 + p_wound_below_6 * p_save
+    return outcome
+
+
+def joint_wound_distribution(profile: dict) -> np.ndarray:
+    """Combine the per-attack outcomes of a strike over all of its attacks.
+
+    Returns:
+        np.ndarray: joint[k, b], the probability of k wounds after armor saves
+        with b = 1 if any Killing Blow was triggered, shape (attacks + 1, 2)
+    """
+    attacks = max(0, profile['attacks'] or 0)
+    outcome = strike_outcome_probabilities(profile)
+    joint = np.zeros((attacks + 1, 2))
+    joint[0, 0] = 1.0
+    for _ in range(attacks):
+        combined = np.zeros_like(joint)
+        for wound in (0, 1):
+            for kb in (0, 1):
+                p = outcome[wound, kb]
+                if not p:
+                    continue
+                shifted = joint[:attacks + 1 - wound] * p
+                combined[wound:, kb] += shifted[:, 0]
+                combined[wound:, 1] += shifted[:, 1]
+        joint = combined
+    return joint
+
+
+def OneRoundMeleeCombatExact(
+    attacker: Character | CharacterSpec,
+    defender: Character | CharacterSpec,
+    is_first_round: bool = True,
+) -> dict[str, float | np.ndarray]:
+    """Exact outcome distribution of one round of melee, without rolling dice.
+
+    Analytic counterpart of OneRoundMeleeCombat: every attack is independent,
+    so the per-attack outcome probabilities are convolved over all attacks.
+
+    Args:
+        attacker: The Character making the attack
+        defender: The Character being attacked
+        is_first_round: Whether this is first round (affects various rules)
+
+    Returns:
+        dict containing:
+        - wound_distribution (np.ndarray): P(k wounds after armor saves), k = 0..attacks
+        - joint_distribution (np.ndarray): P(k wounds, Killing Blow triggered), shape (attacks + 1, 2)
+        - killing_blow_probability (float): P(at least one Killing Blow)
+        - expected_wounds (float): Mean wounds after armor saves
+        - hit_probability (float): Chance that a single attack hits
+    """
+    attacker = CombatState(as_spec(attacker))
+    profile = get_strike_profile(attacker, defender, is_first_round=is_first_round)
+    attacks = max(0, profile['attacks'] or 0)
+    joint = joint_wound_distribution(profile)
+
+    wound_distribution = joint.sum(axis=1)
+    return {
+        'wound_distribution': wound_distribution,
+        'joint_distribution': joint,
+        'killing_blow_probability': float(joint[:, 1].sum()),
+        'expected_wounds': float(wound_distribution @ np.arange(attacks + 1)),
+        'hit_probability': hit_probability(profile),
+    }
+
+
+def strike_damage_distribution(profile: dict) -> tuple[np.ndarray, float]:
+    """Exact effect of one strike on the defender, after ward and regeneration saves.
+
+    Returns:
+        tuple containing:
+        - np.ndarray: P(defender loses d wounds and survives the Killing Blow), d = 0..attacks
+        - float: P(defender is slain outright by a Killing Blow)
+    """
+    attacks = max(0, profile['attacks'] or 0)
+    joint = joint_wound_distribution(profile)
+
+    # A wound (or Killing Blow) gets through only if both ward and regeneration fail
+    p_through = (1 - d6_success(profile['ward_target'])) * (1 - d6_success(profile['regen_target']))
+    p_slain = float(joint[:, 1].sum()) * p_through
+    surviving = joint[:, 0] + joint[:, 1] * (1 - p_through)
+
+    # Thin the unsaved wounds binomially by the ward/regeneration chance
+    damage = np.zeros(attacks + 1)
+    for wounds, p in enumerate(surviving):
+        if not p:
+            continue
+        for dealt in range(wounds + 1):
+            damage[dealt] += p * comb(wounds, dealt) * p_through ** dealt * (1 - p_through) ** (wounds - dealt)
+    return damage, p_slain
+
+
+def _apply_strike(state: np.ndarray, damage: np.ndarray, p_slain: float, axis: int) -> np.ndarray:
+    """Apply a strike to a wounds distribution; index 0 on the defender's axis means slain."""
+    state = np.moveaxis(state, axis, 0)
+    result = np.zeros_like(state)
+    result[0] += state.sum(axis=0) * p_slain
+    for wounds in range(state.shape[0]):
+        for dealt, p in enumerate(damage):
+            if p:
+                result[max(0, wounds - dealt)] += state[wounds] * p
+    return np.moveaxis(result, 0, axis)
+
+
+def _exact_round(
+    state: np.ndarray,
+    strikes: dict,
+    sides: list[int],
+    simultaneous_combat: bool,
+    first_round: bool,
+    feared: tuple[bool, bool] = (False, False),
+) -> tuple[np.ndarray, np.ndarray]:
+    """Advance a wounds distribution through one round of strikes.
+
+    Returns:
+        tuple containing:
+        - np.ndarray: Distribution of the duels where both fighters still stand
+        - np.ndarray: P(character_1 slays, character_2 slays, stalemate, Killing Blow)
+    """
+    decided = np.zeros(4)
+    if simultaneous_combat:
+        p_slain = [strikes[(first_round, i, feared)][1] for i in (0, 1)]
+        decided[3] += state.sum() * (1 - (1 - p_slain[0]) * (1 - p_slain[1]))
+        for attacker_index in (0, 1):
+            damage, slain = strikes[(first_round, attacker_index, feared)]
+            state = _apply_strike(state, damage, slain, axis=1 - attacker_index)
+        decided[2] += state[0, 0]
+        decided[0] += state[1:, 0].sum()
+        decided[1] += state[0, 1:].sum()
+        state[0, :] = 0
+        state[:, 0] = 0
+    else:
+        for attacker_index in sides:
+            damage, slain = strikes[(first_round, attacker_index, feared)]
+            decided[3] += state.sum() * slain
+            state = _apply_strike(state, damage, slain, axis=1 - attacker_index)
+            if attacker_index == 0:
+                decided[0] += state[:, 0].sum()
+                state[:, 0] = 0
+            else:
+                decided[1] += state[0, :].sum()
+                state[0, :] = 0
+    return state, decided
+
+
+def exact_combat_simulation(
+    character_1: Character | CharacterSpec,
+    character_2: Character | CharacterSpec,
+    rounds: int = 2,
+    leadership: bool = False,
+) -> dict[str, float | np.ndarray]:
+    """Exact outcome probabilities of combat_simulation, without rolling dice.
+
+    Treats the duel as a Markov chain over (wounds of character_1, wounds of
+    character_2), advanced strike by strike for each round. With leadership,
+    each round is a mixture over the Fear test outcomes, and break tests are
+    resolved per starting (w1, w2) cell since they depend on wounds caused
+    within the round.
+
+    Args:
+        character_1: First combatant
+        character_2: Second combatant
+        rounds: Maximum number of combat rounds
+        leadership: Whether Terror, Fear and break tests apply (see combat_simulation)
+
+    Returns:
+        dict containing:
+        - character_1 (float): Probability that character_1 wins
+        - character_2 (float): Probability that character_2 wins
+        - stalemate (float): Probability of a draw
+        - killing_blow (float): Probability that the duel ends on a Killing Blow
+        - fled (float): Probability that the duel ends with the loser fleeing
+        - rounds_to_kill (np.ndarray): Shape (2, rounds); P(character_1 / character_2
+          slays the other in round r + 1)
+        - final_wounds (np.ndarray): P(wounds left of character_1, character_2) for
+          duels that go the distance
+    """
+    fighter_1 = CombatState(as_spec(character_1))
+    fighter_2 = CombatState(as_spec(character_2))
+    fighters = {1: fighter_1, 2: fighter_2}
+
+    # state[w1, w2]: probability that both fighters are still standing with w1, w2 wounds
+    state = np.zeros((fighter_1.Wounds + 1, fighter_2.Wounds + 1))
+    state[fighter_1.Wounds, fighter_2.Wounds] = 1.0
+    rounds_to_kill = np.zeros((2, rounds))
+    fled_wins = np.zeros(2)
+    stalemate = 0.0
+    killing_blow = 0.0
+
+    # P(failing a Fear test) for each fighter, and the weight of each combination of outcomes
+    p_fear = [
+        1 - psychology_test_probability(fighters[i]) if leadership and takes_fear_test(fighters[i], fighters[3 - i]) else 0.0
+        for i in (1, 2)
+    ]
+    fear_combos = {
+        (f1, f2): (p_fear[0] if f1 else 1 - p_fear[0]) * (p_fear[1] if f2 else 1 - p_fear[1])
+        for f1 in (False, True)
+        for f2 in (False, True)
+    }
+    fear_combos = {combo: weight for combo, weight in fear_combos.items() if weight}
+
+    order, simultaneous_combat = determine_strike_order(fighter_1, fighter_2, verbose=False)
+    sides = [(0 if attacker is fighter_1 else 1) for attacker, _ in order]
+    strikes = {
+        (first_round, attacker_index, feared): strike_damage_distribution(
+            _strike_profile(fighters, attacker_index + 1, first_round, feared)
+        )
+        for first_round in (True, False)
+        for attacker_index in sides
+        for feared in fear_combos
+    }
+
+    if leadership:
+        # Terror: character_1 tests first, and whoever fails flees before a blow is struck
+        for i in (1, 2):
+            if takes_terror_test(fighters[i], fighters[3 - i]):
+                p_flee = 1 - psychology_test_probability(fighters[i])
+                fled_wins[2 - i] += state.sum() * p_flee
+                state *= 1 - p_flee
+
+    for r in range(rounds):
+        first_round = r == 0
+        if not leadership:
+            state, decided = _exact_round(state, strikes, sides, simultaneous_combat, first_round)
+        else:
+            start, state, decided = state, np.zeros_like(state), np.zeros(4)
+            w1, w2 = np.indices(state.shape)
+            for s1, s2 in zip(*np.nonzero(start)):
+                cell = np.zeros_like(start)
+                cell[s1, s2] = start[s1, s2]
+                for feared, weight in fear_combos.items():
+                    end, cell_decided = _exact_round(cell * weight, strikes, sides, simultaneous_combat, first_round, feared)
+                    decided += cell_decided
+                    # Break test for the fighter that lost the round on wounds caused
+                    lost_by = (s1 - w1) - (s2 - w2)
+                    flee = np.zeros_like(end)
+                    for i, lost in ((1, lost_by > 0), (2, lost_by < 0)):
+                        for margin in np.unique(np.abs(lost_by[lost & (end > 0)])):
+                            group = lost & (np.abs(lost_by) == margin)
+                            flee[group] = 1 - break_test_probability(fighters[i], fighters[i].Leadership, int(margin))
+                    fled_wins[0] += (end * flee)[lost_by < 0].sum()
+                    fled_wins[1] += (end * flee)[lost_by > 0].sum()
+                    state += end * (1 - flee)
+        rounds_to_kill[0, r] += decided[0]
+        rounds_to_kill[1, r] += decided[1]
+        stalemate += decided[2]
+        killing_blow += decided[3]
+
+    # No decisive winner after rounds: most wounds remaining wins
+    w1, w2 = np.indices(state.shape)
+    return {
+        'character_1': float(rounds_to_kill[0].sum() + fled_wins[0] + state[w1 > w2].sum()),
+        'character_2': float(rounds_to_kill[1].sum() + fled_wins[1] + state[w2 > w1].sum()),
+        'stalemate': float(stalemate + state[w1 == w2].sum()),
+        'killing_blow': float(killing_blow),
+        'fled': float(fled_wins.sum()),
+        'rounds_to_kill': rounds_to_kill,
+        'final_wounds': state,
+    }
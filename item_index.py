@@ -0,0 +1,36 @@
+# Alias indexes for the equipment tables (MeleeWeaponDict, ArmourDict, MagicItemDict)
+
+def normalize_item_name(name):
+    """Return the lookup form of an item name: lower case with all whitespace removed."""
+    if not isinstance(name, str):
+        return None
+    return "".join(name.split()).lower()
+
+
+def build_alias_index(table):
+    """Map every alias of every table key to that key.
+
+    Keys may be a single name or a tuple of aliases. Each alias is indexed both
+    exactly and in its normalized form, so lookups of the canonical spelling
+    skip normalization.
+    """
+    index = {}
+    for key in table:
+        aliases = key if isinstance(key, tuple) else (key,)
+        for alias in aliases:
+            for name in (alias, normalize_item_name(alias)):
+                if index.get(name, key) != key:
+                    raise ValueError(f"Alias '{alias}' is used by both {index[name]} and {key}")
+                index[name] = key
+    return index
+
+
+def lookup_alias(index, name):
+    """Return the table key for a name (any alias, case and whitespace insensitive), or None."""
+    try:
+        key = index.get(name)
+    except TypeError:  # Unhashable name
+        return None
+    if key is None and isinstance(name, str):
+        key = index.get(normalize_item_name(name))
+    return key
@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+from armor import find_armour_key
+from batch_simulations import adaptive_combat_simulation, batch_combat_simulation, summarize_batch, win_rate_interval
+from faction_profiles import FactionProfiles
+from matchup_matrix import build_loadout_spec
+from result_cache import loadout_hash
+from weapons import find_weapon_key
+
+# Request fields and their defaults; fighter_1 and fighter_2 are required
+REQUEST_DEFAULTS = {
+    'rounds': 2,
+    'samples': 10000,
+    'seed': None,
+    'leadership': False,
+    'half_width': None,
+}
+
+
+def _option_name(name: str | None, options: list[str], find_key) -> str | None:
+    """The spelling of name used in a profile's equipment_options (e.g. "GW" -> "Great Weapon")."""
+    if name is None or name in options:
+        return name
+    key = find_key(name)
+    for option in options:
+        if key is not None and find_key(option) == key:
+            return option
+    return name
+
+
+def parse_fighter(data: dict) -> dict:
+    """Normalise a fighter from a request into a loadout for build_loadout_spec.
+
+    Takes faction and profile (required) plus optional weapon, armor, shield
+    and honors; anything left out comes from the profile's base profile.
+    Weapons and armour may be given by any alias. Raises KeyError for
+    unknown profiles.
+    """
+    faction, profile_name = data['faction'], data['profile']
+    profile = FactionProfiles[faction][profile_name]
+    base, options = profile['base_profile'], profile['equipment_options']
+    return {
+        'faction': faction,
+        'profile': profile_name,
+        'weapon': _option_name(data.get('weapon', base.get('Weapon', 'Hand Weapon')), options['weapons'], find_weapon_key),
+        'armor': _option_name(data.get('armor', base.get('Armor')), options['armor'] or [], find_armour_key),
+        'shield': data.get('shield', base.get('Shield')),
+        'honors': data.get('honors'),
+    }
+
+
+def parse_request(line: str, line_number: int) -> tuple[str, dict]:
+    """Parse one JSONL request into its id and a normalised job.
+
+    The id defaults to the line number. Raises ValueError (or KeyError) for
+    malformed requests.
+
+    Returns:
+        tuple containing:
+        - str: The request id
+        - dict: Job with fighter_1, fighter_2 and every REQUEST_DEFAULTS field
+    """
+    request = json.loads(line)
+    if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+    request_id = request.get('id', line_number)
+    job = {key: request.get(key, default) for key, default in REQUEST_DEFAULTS.items()}
+    job['fighter_1'] = parse_fighter(request['fighter_1'])
+    job['fighter_2'] = parse_fighter(request['fighter_2'])
+    if job['samples'] < 1 or job['rounds'] < 1:
+        raise ValueError("samples and rounds must be positive")
+    return request_id, job
+
+
+def job_key(job: dict) -> str:
+    """Key under which identical jobs are run once.
+
+    Fighters are compared by loadout_hash, so different spellings of the same
+    equipment (e.g. "GW" and "Great Weapon") count as the same request.
+    """
+    specs = [build_loadout_spec(job[fighter]) for fighter in ('fighter_1', 'fighter_2')]
+    return json.dumps({
+        'fighters': [loadout_hash(spec, include_name=True) for spec in specs],
+        **{key: job[key] for key in REQUEST_DEFAULTS},
+    }, sort_keys=True)
+
+
+def run_job(job: dict) -> dict:
+    """Simulate one job; the work done by each worker process.
+
+    With half_width set, runs adaptive_combat_simulation with samples as the
+    budget; otherwise simulates exactly samples duels.
+
+    Returns:
+        dict with the fraction of duels won by fighter_1 (character_1), won
+        by fighter_2 (character_2), drawn, ended by a Killing Blow and ended
+        by a flee, the samples used and character_1's 95% interval
+    """
+    spec_1 = build_loadout_spec(job['fighter_1'])
+    spec_2 = build_loadout_spec(job['fighter_2'])
+    if job['half_width'] is not None:
+        return adaptive_combat_simulation(
+            spec_1, spec_2, half_width=job['half_width'], max_duels=job['samples'],
+            rounds=job['rounds'], rng=job['seed'], leadership=job['leadership'],
+        )
+    results = batch_combat_simulation(spec_1, spec_2, job['samples'], rounds=job['rounds'], rng=job['seed'], leadership=job['leadership'])
+    summary = {key: float(value) for key, value in summarize_batch(results).items()}
+    _, ci_low, ci_high = win_rate_interval(round(summary['character_1'] * job['samples']), job['samples'])
+    return {**summary, 'samples': job['samples'], 'ci_low': ci_low, 'ci_high': ci_high}
+
+
+class _InProcessExecutor:
+    """Runs jobs on submit, for workers=1; the same interface as ProcessPoolExecutor."""
+
+    def submit(self, function, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+
+def run_jobs(lines, workers: int | None = None, ordered: bool = True, window: int | None = None):
+    """Run JSONL requests across a worker pool, yielding one result per request.
+
+    Requests are read lazily, with at most window distinct jobs in flight, so
+    inputs of any length stream through in constant memory (apart from the
+    dedupe table). Identical requests (see job_key) are simulated once and
+    the result is returned for each of them. Malformed requests and failed
+    jobs give an "error" result rather than stopping the run.
+
+    Args:
+        lines: Iterable of JSONL request lines (e.g. an open file or sys.stdin)
+        workers: Worker processes (defaults to the CPU count; 1 runs in-process)
+        ordered: Yield results in input order; otherwise as they complete
+        window: Distinct jobs in flight (defaults to 4 per worker)
+
+    Yields:
+        dict: Result tagged with the request's "id", and "duplicate_of" for
+        requests answered by an earlier identical one
+    """
+    workers = workers or os.cpu_count() or 1
+    window = window or 4 * workers
+    executor = _InProcessExecutor() if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+    pending = deque()  # (request id, future or error result, id of the first identical request)
+    jobs = {}  # job_key -> (future, first request id)
+
+    def finished(request_id, outcome, first_id) -> dict:
+        if isinstance(outcome, dict):
+            return {'id': request_id, **outcome}
+        try:
+            result = {'id': request_id, **outcome.result()}
+        except Exception as error:
+            result = {'id': request_id, 'error': f"{type(error).__name__}: {error}"}
+        if first_id != request_id:
+            result['duplicate_of'] = first_id
+        return result
+
+    def running() -> list[Future]:
+        return list({id(entry[1]): entry[1] for entry in pending if isinstance(entry[1], Future) and not entry[1].done()}.values())
+
+    def drain(limit: int):
+        # Yield results until at most limit distinct jobs are still running
+        while True:
+            yield from ready()
+            futures = running()
+            if len(futures) <= limit:
+                return
+            wait([pending[0][1]] if ordered else futures, return_when=FIRST_COMPLETED)
+
+    def ready():
+        if ordered:
+            while pending and not (isinstance(pending[0][1], Future) and not pending[0][1].done()):
+                yield finished(*pending.popleft())
+        else:
+            for entry in [entry for entry in pending if not isinstance(entry[1], Future) or entry[1].done()]:
+                pending.remove(entry)
+                yield finished(*entry)
+
+    with executor:
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            message = None
+            try:
+                message = json.loads(line)
+                request_id, job = parse_request(line, line_number)
+                key = job_key(job)
+            except (ValueError, KeyError, TypeError) as error:
+                # Tag the error with the request's own id whenever the line decoded
+                request_id = message.get('id', line_number) if isinstance(message, dict) else line_number
+                pending.append((request_id, {'error': f"{type(error).__name__}: {error}"}, request_id))
+                yield from ready()
+                continue
+            if key not in jobs:
+                jobs[key] = (executor.submit(run_job, job), request_id)
+            future, first_id = jobs[key]
+            pending.append((request_id, future, first_id))
+            yield from drain(window)
+        yield from drain(0)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run duel simulation requests from JSONL, writing JSONL results.")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL requests file (default: stdin)")
+    parser.add_argument("--output", default="-", help="JSONL results file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--unordered", action="store_true", help="write results as they complete, tagged by id")
+    parser.add_argument("--window", type=int, default=None, help="distinct jobs in flight (default: 4 per worker)")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    sink = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for result in run_jobs(source, workers=args.workers, ordered=not args.unordered, window=args.window):
+            sink.write(json.dumps(result) + "\n")
+            sink.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from character_model import Character, CharacterSpec, CombatState
+from dice import DiceSource
+
+# The tables are plain tuples, so the scalar engine can use them without NumPy
+
+# P(2D6 = total), total = 0..12
+TWO_D6 = tuple(
+    sum(1 for first in range(1, 7) for second in range(1, 7) if first + second == total) / 36
+    for total in range(13)
+)
+
+# P(passing a Leadership test against target t), t = 0..12. A double 1
+# (Insane Courage) always passes, so no test is ever lost for certain.
+LEADERSHIP_TEST = tuple(max(sum(TWO_D6[:target + 1]), 1 / 36) for target in range(13))
+# The same with one reroll of a failed test
+LEADERSHIP_TEST_REROLL = tuple(1 - (1 - p) ** 2 for p in LEADERSHIP_TEST)
+
+# Combat result bonus per rank after the first, and its cap
+MAX_RANK_BONUS = 3
+
+
+def leadership_pass_probability(target, reroll: bool = False):
+    """P(passing a Leadership test on 2D6 against target), by table lookup.
+
+    Works on a single target or an array of targets (e.g. one per duel).
+    """
+    table = LEADERSHIP_TEST_REROLL if reroll else LEADERSHIP_TEST
+    if isinstance(target, int):
+        return table[min(max(target, 0), 12)]
+    import numpy as np
+
+    return np.asarray(table)[np.clip(target, 0, 12)]
+
+
+def leadership_test(target: int, dice: DiceSource, reroll: bool = False) -> tuple[bool, int]:
+    """Roll a Leadership test: pass on 2D6 <= target, or on a double 1.
+
+    Returns:
+        tuple containing:
+        - bool: Whether the test was passed
+        - int: The (last) 2D6 total rolled
+    """
+    for _ in range(2 if reroll else 1):
+        first, second = dice.roll(), dice.roll()
+        total = first + second
+        if total <= target or total == 2:
+            return True, total
+    return False, total
+
+
+def batch_leadership_test(target, size: int, rng: "np.random.Generator", reroll: bool = False) -> "np.ndarray":
+    """Roll size Leadership tests at once; returns a boolean array of passes.
+
+    Draws one uniform number per test against the pass table rather than
+    rolling the dice, which is all a pass/fail outcome needs. rng may also
+    be a dice.DuelDice, which has the same random() method.
+    """
+    return rng.random(size) < leadership_pass_probability(target, reroll)
+
+
+def _rules(character: Character | CharacterSpec | CombatState):
+    return character.compiled_rules
+
+
+def takes_fear_test(character, enemy) -> bool:
+    """Whether character must test for Fear of enemy at the start of each round.
+
+    Fear-causing models and Immune to Psychology models never test.
+    """
+    rules, enemy_rules = _rules(character), _rules(enemy)
+    return enemy_rules.causes_fear and not (rules.causes_fear or rules.immune_to_psychology)
+
+
+def takes_terror_test(character, enemy) -> bool:
+    """Whether character must test for Terror of enemy before combat starts.
+
+    Terror-causing models and Immune to Psychology models never test.
+    """
+    rules, enemy_rules = _rules(character), _rules(enemy)
+    return enemy_rules.causes_terror and not (rules.causes_terror or rules.immune_to_psychology)
+
+
+def psychology_reroll(character) -> bool:
+    """Whether character rerolls failed Fear, Terror and Panic tests (Veteran, Valour of Ages)."""
+    rules = _rules(character)
+    return rules.veteran or rules.valour_of_ages
+
+
+def break_test_target(character, leadership: int, lost_by: int) -> int:
+    """2D6 target for a break test after losing combat by lost_by (Stubborn ignores it)."""
+    return leadership if _rules(character).stubborn else leadership - lost_by
+
+
+def break_test_reroll(character) -> bool:
+    """Whether character rerolls failed break tests (Veteran)."""
+    return _rules(character).veteran
+
+
+def combat_result(wounds_caused: int, ranks: int = 1) -> int:
+    """Combat result score: wounds caused plus +1 per rank after the first (max +3)."""
+    return wounds_caused + min(max(ranks - 1, 0), MAX_RANK_BONUS)
+
+
+def break_test_probability(character, leadership: int, lost_by: int) -> float:
+    """P(character holds after losing combat by lost_by)."""
+    return float(leadership_pass_probability(break_test_target(character, leadership, lost_by), break_test_reroll(character)))
+
+
+def psychology_test_probability(character) -> float:
+    """P(character passes a Fear, Terror or Panic test on its own Leadership)."""
+    return float(leadership_pass_probability(character.Leadership, psychology_reroll(character)))
@@ -0,0 +1,201 @@
+import argparse
+import math
+
+import numpy as np
+
+from batch_simulations import batch_combat_simulation, win_rate_interval
+from character_model import Character, CharacterSpec, as_spec
+from dice import as_generator
+from elven_honors import ElvenHonors
+from faction_profiles import RACE_NAMES, FactionProfiles
+from matchup_matrix import build_loadout_spec, enumerate_loadouts, loadout_label
+from result_cache import loadout_hash
+
+
+def profile_loadouts(faction: str, profile_name: str, honors: bool = True) -> list[dict]:
+    """List every legal loadout of one FactionProfiles profile.
+
+    Weapon, armour and shield combinations come from enumerate_loadouts; for
+    High Elves each is also tried with every Elven Honor (one per character).
+    Loadouts that Character rejects, and duplicates that would fight exactly
+    the same way, are left out.
+
+    Args:
+        faction: Faction in FactionProfiles, e.g. "High Elves"
+        profile_name: Profile in that faction, e.g. "Prince"
+        honors: Whether to include Elven Honors
+
+    Returns:
+        list[dict]: Loadouts with keys faction, profile, weapon, armor, shield and honors
+    """
+    data = FactionProfiles[faction][profile_name]
+    honor_options = [None]
+    if honors and data["base_profile"]["Race"] in RACE_NAMES["HIGH_ELVES"]:
+        honor_options += [[honor] for honor in ElvenHonors]
+
+    loadouts = []
+    seen = set()
+    for loadout in enumerate_loadouts({faction: {profile_name: data}}):
+        for honor in honor_options:
+            candidate = dict(loadout, honors=honor)
+            try:
+                key = loadout_hash(build_loadout_spec(candidate))
+            except (KeyError, ValueError):
+                continue
+            if key not in seen:
+                seen.add(key)
+                loadouts.append(candidate)
+    return loadouts
+
+
+def _as_opponent(opponent: Character | CharacterSpec | dict) -> CharacterSpec:
+    return build_loadout_spec(opponent) if isinstance(opponent, dict) else as_spec(opponent)
+
+
+def optimize_loadout(
+    faction: str,
+    profile_name: str,
+    opponents: Character | CharacterSpec | dict | list,
+    budget: int = 200000,
+    rounds: int = 2,
+    keep: int = 1,
+    eta: int = 2,
+    honors: bool = True,
+    leadership: bool = False,
+    rng: np.random.Generator | int | None = None,
+) -> list[dict]:
+    """Rank the loadouts of a profile against an opponent or a field of opponents.
+
+    Uses successive halving: every loadout starts with a small share of the
+    budget, and after each stage only the best 1/eta carry on and get more
+    duels. Weak loadouts are dropped after a few hundred duels, and most of
+    the budget goes to the contenders. Duels are spread evenly over the
+    opponents, so a loadout's win rate is its average over the field.
+
+    Args:
+        faction: Faction in FactionProfiles, e.g. "High Elves"
+        profile_name: Profile in that faction, e.g. "Prince"
+        opponents: Opponent, or list of opponents, as Characters, CharacterSpecs
+            or loadout dicts from enumerate_loadouts
+        budget: Total duels to simulate across all stages
+        rounds: Maximum number of combat rounds per duel
+        keep: Stop halving once this many loadouts are left
+        eta: Fraction of loadouts kept after each stage is 1 / eta
+        honors: Whether to include Elven Honors in the search
+        leadership: Whether Terror, Fear and break tests apply
+        rng: NumPy random Generator, or a seed for a new one
+
+    Returns:
+        list[dict]: One row per loadout, best first, containing:
+        - rank (int): 1 for the best loadout
+        - label (str): Human-readable loadout name
+        - loadout (dict): The loadout
+        - win_rate (float): Fraction of duels won
+        - ci_low (float): Lower bound of the 95% confidence interval
+        - ci_high (float): Upper bound of the 95% confidence interval
+        - duels (int): Duels simulated
+        - stage (int): Last stage the loadout took part in
+    """
+    rng = as_generator(rng)
+    if not isinstance(opponents, list):
+        opponents = [opponents]
+    opponent_specs = [_as_opponent(opponent) for opponent in opponents]
+    loadouts = profile_loadouts(faction, profile_name, honors=honors)
+    if not loadouts:
+        raise ValueError(f"No legal loadouts for {faction} {profile_name}")
+    specs = [build_loadout_spec(loadout) for loadout in loadouts]
+
+    wins = np.zeros(len(loadouts), dtype=np.int64)
+    duels = np.zeros(len(loadouts), dtype=np.int64)
+    stage_reached = np.zeros(len(loadouts), dtype=np.int64)
+
+    keep = max(1, keep)
+    stages = max(1, math.ceil(math.log(max(len(loadouts) / keep, 1), eta)) + 1)
+    alive = list(range(len(loadouts)))
+    for stage in range(stages):
+        # Each stage gets an equal share of the budget, split over the survivors
+        per_opponent = max(1, budget // (stages * len(alive) * len(opponent_specs)))
+        for i in alive:
+            for opponent in opponent_specs:
+                winner = batch_combat_simulation(specs[i], opponent, per_opponent, rounds=rounds, rng=rng, leadership=leadership)['winner']
+                wins[i] += np.count_nonzero(winner == 1)
+                duels[i] += per_opponent
+            stage_reached[i] = stage + 1
+        if len(alive) <= keep:
+            break
+        alive.sort(key=lambda i: wins[i] / duels[i], reverse=True)
+        alive = alive[:max(keep, math.ceil(len(alive) / eta))]
+
+    table = []
+    for i, loadout in enumerate(loadouts):
+        win_rate, ci_low, ci_high = win_rate_interval(int(wins[i]), int(duels[i]))
+        table.append({
+            'label': loadout_label(loadout),
+            'loadout': loadout,
+            'win_rate': win_rate,
+            'ci_low': ci_low,
+            'ci_high': ci_high,
+            'duels': int(duels[i]),
+            'stage': int(stage_reached[i]),
+        })
+    # Loadouts that got further rank above those dropped earlier
+    table.sort(key=lambda row: (row['stage'], row['win_rate']), reverse=True)
+    for rank, row in enumerate(table, start=1):
+        row['rank'] = rank
+    return table
+
+
+def format_ranking(table: list[dict], limit: int | None = None) -> str:
+    """Text table of optimize_loadout results."""
+    rows = table if limit is None else table[:limit]
+    width = max([len("Loadout")] + [len(row['label']) for row in rows])
+    lines = [f"{'Rank':>4}  {'Loadout':<{width}}  {'Win rate':>8}  {'95% CI':>15}  {'Duels':>8}  {'Stage':>5}"]
+    for row in rows:
+        interval = f"{row['ci_low']:.3f}-{row['ci_high']:.3f}"
+        lines.append(
+            f"{row['rank']:>4}  {row['label']:<{width}}  {row['win_rate']:>8.3f}  {interval:>15}  {row['duels']:>8}  {row['stage']:>5}"
+        )
+    return "\n".join(lines)
+
+
+def _parse_profile(value: str) -> tuple[str, str]:
+    faction, _, profile_name = value.partition(":")
+    if faction not in FactionProfiles or profile_name not in FactionProfiles[faction]:
+        raise argparse.ArgumentTypeError(f"unknown profile {value!r}, expected 'Faction:Profile'")
+    return faction, profile_name
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Find the best loadouts of a profile against one or more opponents.")
+    parser.add_argument("profile", type=_parse_profile, help="profile to optimise, e.g. 'High Elves:Prince'")
+    parser.add_argument("--opponent", type=_parse_profile, action="append", required=True,
+                        help="opponent profile, e.g. 'Orcs:Black Orc Boss'; every loadout of it joins the field (repeatable)")
+    parser.add_argument("--budget", type=int, default=200000, help="total duels to simulate")
+    parser.add_argument("--rounds", type=int, default=2, help="maximum combat rounds per duel")
+    parser.add_argument("--keep", type=int, default=1, help="stop halving once this many loadouts are left")
+    parser.add_argument("--no-honors", action="store_true", help="leave Elven Honors out of the search")
+    parser.add_argument("--leadership", action="store_true", help="apply Terror, Fear and break tests")
+    parser.add_argument("--top", type=int, default=20, help="rows to print")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible results")
+    args = parser.parse_args(argv)
+
+    field = [
+        loadout
+        for faction, profile_name in args.opponent
+        for loadout in enumerate_loadouts({faction: {profile_name: FactionProfiles[faction][profile_name]}})
+    ]
+    table = optimize_loadout(
+        *args.profile,
+        field,
+        budget=args.budget,
+        rounds=args.rounds,
+        keep=args.keep,
+        honors=not args.no_honors,
+        leadership=args.leadership,
+        rng=args.seed,
+    )
+    print(format_ranking(table, args.top))
+
+
+if __name__ == "__main__":
+    main()
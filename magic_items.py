@@ -1,7 +1,22 @@
-from faction_profiles import *
-from special_rules import *
+from item_index import build_alias_index, lookup_alias
+from special_rules import ImproveArmor1InCombat, ImproveArmor2InShooting
 
 MagicItemDict = {
     "Pelt of Charandis": [ImproveArmor1InCombat,ImproveArmor2InShooting, "Regen5"],
 }
 
+# Alias -> MagicItemDict key
+MagicItemIndex = build_alias_index(MagicItemDict)
+
+
+def find_magic_item(item):
+    """Return the MagicItemDict key for the given item name, or None.
+    Matching is case and whitespace insensitive.
+    """
+    return lookup_alias(MagicItemIndex, item)
+
+
+def get_magic_item_rules(item):
+    """Return the special rules granted by a magic item (empty list if unknown)."""
+    key = lookup_alias(MagicItemIndex, item)
+    return MagicItemDict[key] if key is not None else []
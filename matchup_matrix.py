@@ -0,0 +1,220 @@
+import argparse
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_simulations import batch_combat_simulation
+from character_model import Character, CharacterSpec
+from faction_profiles import FactionProfiles
+from special_rules import RequiresTwoHands
+from weapons import find_weapon_key, get_weapon_special_rules
+
+
+def enumerate_loadouts(profiles: dict | None = None) -> list[dict]:
+    """List every legal (profile, weapon, armour, shield) combination.
+
+    Only melee weapons (those in MeleeWeaponDict) are included, shields are
+    skipped for profiles that can't take one and for two-handed weapons, and
+    combinations that Character rejects are left out.
+
+    Args:
+        profiles: Faction profiles to enumerate (defaults to FactionProfiles)
+
+    Returns:
+        list[dict]: Loadouts with keys faction, profile, weapon, armor and shield
+    """
+    profiles = FactionProfiles if profiles is None else profiles
+    loadouts = []
+    for faction, faction_profiles in profiles.items():
+        for profile_name, data in faction_profiles.items():
+            options = data["equipment_options"]
+            weapons = [w for w in options["weapons"] if find_weapon_key(w) is not None]
+            armours = options["armor"] or [None]
+            shields = [None, "Shield"] if options["shield"] else [None]
+            for weapon, armor, shield in itertools.product(weapons, armours, shields):
+                if shield and RequiresTwoHands in get_weapon_special_rules(weapon):
+                    continue
+                loadout = {"faction": faction, "profile": profile_name, "weapon": weapon, "armor": armor, "shield": shield}
+                try:
+                    build_loadout_spec(loadout)
+                except (KeyError, ValueError):
+                    continue
+                loadouts.append(loadout)
+    return loadouts
+
+
+def build_loadout_spec(loadout: dict) -> CharacterSpec:
+    """Build the CharacterSpec for a loadout from enumerate_loadouts."""
+    return Character(
+        name=loadout["profile"],
+        faction_type=loadout["faction"],
+        profile_name=loadout["profile"],
+        Weapon=loadout["weapon"],
+        Armor=loadout["armor"],
+        Shield=loadout["shield"],
+        elven_honors=loadout.get("honors"),
+    ).to_spec()
+
+
+def loadout_label(loadout: dict) -> str:
+    """Human-readable name of a loadout, e.g. 'Noble (Great Weapon, Heavy Armor)'."""
+    gear = [loadout["weapon"], loadout["armor"] or "No Armor"]
+    if loadout["shield"]:
+        gear.append("Shield")
+    if loadout.get("honors"):
+        gear.extend(loadout["honors"])
+    return f"{loadout['profile']} ({', '.join(gear)})"
+
+
+class MatchupCounts:
+    """Win/draw/game counts for every pairing of a list of loadouts.
+
+    wins[i, j] is how often loadout i beat loadout j and draws[i, j] how often
+    they drew, out of games[i, j] duels. Counts from separate runs (or worker
+    chunks) over the same loadouts can be merged by adding them.
+    """
+
+    def __init__(self, size: int):
+        self.wins = np.zeros((size, size), dtype=np.int64)
+        self.draws = np.zeros((size, size), dtype=np.int64)
+        self.games = np.zeros((size, size), dtype=np.int64)
+
+    def add(self, i: int, j: int, wins_i: int, wins_j: int, draws: int) -> None:
+        """Record the results of duels between loadouts i and j."""
+        games = wins_i + wins_j + draws
+        self.wins[i, j] += wins_i
+        self.draws[i, j] += draws
+        self.games[i, j] += games
+        if i != j:
+            self.wins[j, i] += wins_j
+            self.draws[j, i] += draws
+            self.games[j, i] += games
+
+    def merge(self, other: "MatchupCounts") -> "MatchupCounts":
+        """Add another set of counts over the same loadouts into this one."""
+        self.wins += other.wins
+        self.draws += other.draws
+        self.games += other.games
+        return self
+
+    def win_rate(self) -> np.ndarray:
+        """Fraction of duels loadout i won against loadout j (NaN if never played)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.wins / self.games
+
+
+_worker_specs = None
+
+
+def _init_worker(specs: list[CharacterSpec]) -> None:
+    # Specs are sent once per worker process rather than with every chunk
+    global _worker_specs
+    _worker_specs = specs
+
+
+def _run_chunk(pairs: list[tuple[int, int]], num_duels: int, rounds: int, seed: np.random.SeedSequence) -> list[tuple[int, int, int, int, int]]:
+    """Simulate a chunk of pairings; returns (i, j, wins_i, wins_j, draws) per pairing."""
+    rng = np.random.default_rng(seed)
+    results = []
+    for i, j in pairs:
+        winner = batch_combat_simulation(_worker_specs[i], _worker_specs[j], num_duels, rounds=rounds, rng=rng)['winner']
+        results.append((i, j, int(np.count_nonzero(winner == 1)), int(np.count_nonzero(winner == 2)), int(np.count_nonzero(winner == 0))))
+    return results
+
+
+def run_matchup_matrix(
+    loadouts: list[dict] | np.ndarray | None = None,
+    num_duels: int = 10000,
+    rounds: int = 2,
+    workers: int | None = None,
+    chunk_size: int = 16,
+    seed: int | None = None,
+) -> tuple[list[dict], MatchupCounts]:
+    """Simulate every pairing of loadouts across a process pool.
+
+    Pairings are split into chunks of chunk_size, each with its own spawned
+    random stream, so results for a given seed don't depend on the number of
+    workers.
+
+    Args:
+        loadouts: Loadouts to pit against each other (defaults to enumerate_loadouts()),
+            or rows of a roster_table, whose specs are read from the rows
+        num_duels: Duels simulated per pairing
+        rounds: Maximum number of combat rounds per duel
+        workers: Worker processes (defaults to the CPU count; 1 runs in-process)
+        chunk_size: Pairings per scheduled task
+        seed: Seed for reproducible results
+
+    Returns:
+        tuple containing:
+        - list[dict]: The loadouts, in matrix order
+        - MatchupCounts: Results for every pairing
+    """
+    if isinstance(loadouts, np.ndarray):
+        # Imported here: roster_table builds its rows with build_loadout_spec
+        from roster_table import row_loadout, row_spec
+
+        specs = [row_spec(row) for row in loadouts]
+        loadouts = [row_loadout(row) for row in loadouts]
+    else:
+        loadouts = enumerate_loadouts() if loadouts is None else loadouts
+        specs = [build_loadout_spec(loadout) for loadout in loadouts]
+    pairs = [(i, j) for i in range(len(specs)) for j in range(i, len(specs))]
+    chunks = [pairs[start:start + chunk_size] for start in range(0, len(pairs), chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    counts = MatchupCounts(len(specs))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(specs)
+        partials = (_run_chunk(chunk, num_duels, rounds, chunk_seed) for chunk, chunk_seed in zip(chunks, seeds))
+        for partial in partials:
+            for result in partial:
+                counts.add(*result)
+        return loadouts, counts
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(specs,)) as pool:
+        futures = [pool.submit(_run_chunk, chunk, num_duels, rounds, chunk_seed) for chunk, chunk_seed in zip(chunks, seeds)]
+        for future in futures:
+            for result in future.result():
+                counts.add(*result)
+    return loadouts, counts
+
+
+def write_matrix_csv(path: str, loadouts: list[dict], counts: MatchupCounts) -> None:
+    """Write the win-rate matrix as CSV: rows are the loadout, columns the opponent."""
+    labels = [loadout_label(loadout) for loadout in loadouts]
+    win_rate = counts.win_rate()
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["loadout"] + labels)
+        for label, row in zip(labels, win_rate):
+            writer.writerow([label] + [f"{value:.4f}" for value in row])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Simulate every FactionProfiles loadout against every other.")
+    parser.add_argument("--samples", type=int, default=10000, help="duels per pairing")
+    parser.add_argument("--rounds", type=int, default=2, help="maximum combat rounds per duel")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=16, help="pairings per scheduled task")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible results")
+    parser.add_argument("--output", default="matchup_matrix.csv", help="CSV file for the win-rate matrix")
+    args = parser.parse_args(argv)
+
+    loadouts, counts = run_matchup_matrix(
+        num_duels=args.samples,
+        rounds=args.rounds,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+    )
+    write_matrix_csv(args.output, loadouts, counts)
+    print(f"Wrote {len(loadouts)}x{len(loadouts)} win-rate matrix to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import argparse
+import json
+import math
+
+import numpy as np
+
+from batch_simulations import Z_95, batch_combat_simulation
+from character_model import Character, CharacterSpec, as_spec
+from dice import CommonDice
+from job_runner import parse_fighter
+from matchup_matrix import build_loadout_spec, loadout_label
+
+
+def _as_fighter(fighter: Character | CharacterSpec | dict) -> CharacterSpec:
+    return build_loadout_spec(fighter) if isinstance(fighter, dict) else as_spec(fighter)
+
+
+def paired_comparison(
+    variant_a: Character | CharacterSpec | dict,
+    variant_b: Character | CharacterSpec | dict,
+    opponent: Character | CharacterSpec | dict,
+    num_duels: int = 100000,
+    rounds: int = 2,
+    antithetic: bool = False,
+    leadership: bool = False,
+    chunk_size: int = 100000,
+    seed: int | None = None,
+    z: float = Z_95,
+) -> dict[str, float | int]:
+    """Compare two variants against the same opponent using common random numbers.
+
+    Duel k of variant A and duel k of variant B are fought with the same
+    dice (see CommonDice), so luck that helps or hurts both variants cancels
+    out of the difference. The confidence interval comes from the per-duel
+    differences, and is usually several times narrower than comparing two
+    independent runs of the same size.
+
+    With antithetic set, every duel is also fought with mirrored dice
+    (d -> 7 - d), and each duel and its mirror count as one paired sample.
+
+    Args:
+        variant_a: First variant (Character, CharacterSpec or loadout dict)
+        variant_b: Second variant
+        opponent: Opponent both variants fight
+        num_duels: Duels per variant (pairs of duels with antithetic)
+        rounds: Maximum number of combat rounds
+        antithetic: Also fight every duel with mirrored dice
+        leadership: Whether Terror, Fear and break tests apply
+        chunk_size: Duels simulated at a time
+        seed: Seed for reproducible results
+        z: Normal quantile of the interval (1.96 for 95%)
+
+    Returns:
+        dict containing:
+        - win_rate_a (float): Variant A's win rate
+        - win_rate_b (float): Variant B's win rate
+        - difference (float): win_rate_a - win_rate_b
+        - ci_low (float): Lower bound of the difference
+        - ci_high (float): Upper bound of the difference
+        - half_width (float): Half-width of the interval
+        - duels (int): Duels fought by each variant
+        - efficiency (float): Duels per variant two independent runs would
+          need for the same half-width, divided by duels
+    """
+    spec_a, spec_b, spec_opponent = _as_fighter(variant_a), _as_fighter(variant_b), _as_fighter(opponent)
+    dice = CommonDice(seed)
+    streams = [dice, dice.mirrored()] if antithetic else [dice]
+
+    # Sums over paired samples: A's wins, B's wins, the difference and its square
+    wins_a = wins_b = total = squares = 0.0
+    for start in range(0, num_duels, chunk_size):
+        size = min(chunk_size, num_duels - start)
+        won_a = np.zeros(size)
+        won_b = np.zeros(size)
+        for stream in streams:
+            chunk_dice = stream.shifted(start)
+            won_a += batch_combat_simulation(spec_a, spec_opponent, size, rounds, chunk_dice, leadership)['winner'] == 1
+            won_b += batch_combat_simulation(spec_b, spec_opponent, size, rounds, chunk_dice, leadership)['winner'] == 1
+        won_a /= len(streams)
+        won_b /= len(streams)
+        difference = won_a - won_b
+        wins_a += won_a.sum()
+        wins_b += won_b.sum()
+        total += difference.sum()
+        squares += np.square(difference).sum()
+
+    p_a, p_b = wins_a / num_duels, wins_b / num_duels
+    mean = total / num_duels
+    variance = max(0.0, squares / num_duels - mean * mean) * num_duels / max(1, num_duels - 1)
+    half_width = z * math.sqrt(variance / num_duels)
+
+    # Independent runs of n duels each have variance (p_a(1 - p_a) + p_b(1 - p_b)) / n
+    duels = num_duels * len(streams)
+    independent = z * z * (p_a * (1 - p_a) + p_b * (1 - p_b)) / (half_width * half_width) if half_width > 0 else math.inf
+    return {
+        'win_rate_a': float(p_a),
+        'win_rate_b': float(p_b),
+        'difference': float(mean),
+        'ci_low': float(mean - half_width),
+        'ci_high': float(mean + half_width),
+        'half_width': float(half_width),
+        'duels': duels,
+        'efficiency': float(independent / duels),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare two loadouts against the same opponent with common random numbers.",
+        epilog='Fighters are JSON objects as in job_runner requests, e.g. \'{"faction": "High Elves", "profile": "Prince", "weapon": "GW"}\'',
+    )
+    parser.add_argument("variant_a", type=json.loads, help="first variant")
+    parser.add_argument("variant_b", type=json.loads, help="second variant")
+    parser.add_argument("opponent", type=json.loads, help="opponent both variants fight")
+    parser.add_argument("--duels", type=int, default=100000, help="duels per variant")
+    parser.add_argument("--rounds", type=int, default=2, help="maximum combat rounds per duel")
+    parser.add_argument("--antithetic", action="store_true", help="also fight every duel with mirrored dice")
+    parser.add_argument("--leadership", action="store_true", help="apply Terror, Fear and break tests")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible results")
+    args = parser.parse_args(argv)
+
+    fighters = [parse_fighter(fighter) for fighter in (args.variant_a, args.variant_b, args.opponent)]
+    result = paired_comparison(
+        *fighters, num_duels=args.duels, rounds=args.rounds, antithetic=args.antithetic,
+        leadership=args.leadership, seed=args.seed,
+    )
+    label_a, label_b, label_opponent = (loadout_label(fighter) for fighter in fighters)
+    print(f"Against {label_opponent}:")
+    print(f"  A  {label_a}: {result['win_rate_a']:.4f}")
+    print(f"  B  {label_b}: {result['win_rate_b']:.4f}")
+    print(
+        f"  A - B: {result['difference']:+.4f} (95% CI {result['ci_low']:+.4f} to {result['ci_high']:+.4f}), "
+        f"{result['duels']} duels per variant, {result['efficiency']:.1f}x fewer than independent runs"
+    )
+
+
+if __name__ == "__main__":
+    main()
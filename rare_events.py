@@ -0,0 +1,278 @@
+import argparse
+import json
+import math
+
+import numpy as np
+
+from batch_simulations import Z_95, batch_combat_simulation
+from character_model import Character, CharacterSpec, as_spec
+from dice import TiltedDice, as_generator, tilt_probabilities
+from job_runner import parse_fighter
+from matchup_matrix import build_loadout_spec, loadout_label
+
+# Rolls made by the striking fighter (high is good for them) and by the
+# fighter being struck (high is good for the defender)
+ATTACK_PHASES = ("hit", "hit_reroll", "hatred", "hatred_reroll", "wound")
+DEFENCE_PHASES = ("armour", "ward", "regeneration", "killing_blow_ward", "killing_blow_regeneration")
+
+# Starting tilt; tilt_probabilities(0.1) rolls a 6 about 20% of the time
+STRENGTH = 0.1
+# Cross-entropy refits: pilot duels per refit, and the share of the old tilt kept each time
+PILOT_DUELS = 20000
+REFITS = 4
+SMOOTHING = 0.3
+# Fewest pilot duels with the event needed to refit the tilt from them
+MIN_PILOT_EVENTS = 10
+# Fewest effective samples for the standard error and interval to be trusted
+MIN_EFFECTIVE_SAMPLES = 100
+
+
+def _favour(fighter_id: int, point: tuple, phase: str, theta: float) -> float:
+    """Tilt that helps fighter_id at a strike: high rolls on its attacks, low on its enemy's saves."""
+    if len(point) != 3 or point[1] != "strike":
+        return 0.0
+    attacking = point[2] == fighter_id
+    if phase in ATTACK_PHASES:
+        return theta if attacking else -theta
+    if phase in DEFENCE_PHASES:
+        return -theta if attacking else theta
+    return 0.0
+
+
+def _killing_blow_tilt(fighter_id: int, point: tuple, phase: str, theta: float) -> float:
+    if len(point) != 3 or point[1] != "strike" or point[2] != fighter_id:
+        return 0.0
+    if phase in ATTACK_PHASES:
+        return theta
+    if phase in ("killing_blow_ward", "killing_blow_regeneration"):
+        return -theta
+    return 0.0
+
+
+def _comeback_tilt(fighter_id: int, point: tuple, phase: str, theta: float) -> float:
+    # Behind after the first round, then on top
+    if point and point[0] == 0:
+        return _favour(3 - fighter_id, point, phase, theta)
+    return _favour(fighter_id, point, phase, theta)
+
+
+def _one_round_tilt(fighter_id: int, point: tuple, phase: str, theta: float) -> float:
+    return _favour(fighter_id, point, phase, theta) if point and point[0] == 0 else 0.0
+
+
+# Event name -> (description, starting tilt theta of (fighter_id, point, phase, strength),
+# indicator of (results, fighter_id))
+RARE_EVENTS = {
+    'killing_blow': (
+        "fighter slays the enemy with a Killing Blow",
+        _killing_blow_tilt,
+        lambda results, fighter_id: results['killing_blow'] & (results['winner'] == fighter_id),
+    ),
+    'comeback': (
+        "fighter wins after causing fewer wounds than it suffered in the first round",
+        _comeback_tilt,
+        lambda results, fighter_id: (results['winner'] == fighter_id) & (results['first_round_leader'] == 3 - fighter_id),
+    ),
+    'one_round_kill': (
+        "fighter slays the enemy in the first round",
+        _one_round_tilt,
+        lambda results, fighter_id: (
+            (results['winner'] == fighter_id) & (results['rounds'] == 1) & (results[f'wounds_{3 - fighter_id}'] == 0)
+        ),
+    ),
+}
+
+
+class _Tilt:
+    """Face probabilities per (point, phase): refitted tables, else the event's starting tilt."""
+
+    def __init__(self, start, fighter_id: int, strength: float):
+        self.start = start
+        self.fighter_id = fighter_id
+        self.strength = strength
+        self.tables = {}
+
+    def __call__(self, point: tuple, phase: str):
+        table = self.tables.get((point, phase))
+        if table is not None:
+            return table
+        theta = self.start(self.fighter_id, point, phase, self.strength)
+        return tilt_probabilities(theta) if theta else None
+
+    def refit(self, counts: dict, weights: np.ndarray) -> None:
+        """Cross-entropy step: move each table towards the faces used in the (weighted) event duels."""
+        for key, faces in counts.items():
+            used = weights @ faces
+            if used.sum() <= 0:
+                continue
+            fitted = (used + 1) / (used.sum() + 6)
+            current = self(*key)
+            current = np.full(6, 1 / 6) if current is None else current
+            self.tables[key] = (1 - SMOOTHING) * fitted + SMOOTHING * current
+
+
+def rare_event_probability(
+    character_1: Character | CharacterSpec | dict,
+    character_2: Character | CharacterSpec | dict,
+    event: str,
+    fighter: int = 1,
+    num_duels: int = 100000,
+    strength: float = STRENGTH,
+    refits: int = REFITS,
+    pilot_duels: int = PILOT_DUELS,
+    rounds: int = 2,
+    chunk_size: int = 100000,
+    rng: np.random.Generator | int | None = None,
+    leadership: bool = False,
+    z: float = Z_95,
+) -> dict[str, float | int]:
+    """Estimate the probability of a rare duel outcome by importance sampling.
+
+    Duels are fought with TiltedDice biased towards the event, and each duel
+    where the event happens counts with its likelihood ratio, so the
+    estimate is unbiased for fair dice while the event comes up far more
+    often than with plain sampling.
+
+    The bias starts as a mild hand-picked tilt for the event (e.g. more 6s
+    to wound and fewer Killing Blow saves) and is then refitted by the
+    cross-entropy method: each of refits pilot runs sets the face
+    probabilities of every roll (per round, fighter and phase) to those seen
+    in the pilot duels where the event happened, weighted by likelihood
+    ratio. While pilot runs see too few events to refit from, the starting
+    tilt is doubled instead, for as long as that finds more events. Pilot
+    duels don't count towards the estimate.
+
+    The mean is unbiased whatever the tilt, but the standard error is
+    estimated from the same weights: when a few duels carry most of the
+    weight it is itself badly underestimated, and the interval can miss the
+    truth by many standard errors. The effective sample size of the event
+    weights flags this; below MIN_EFFECTIVE_SAMPLES the result is marked
+    unreliable and should be rerun with more duels.
+
+    Args:
+        character_1: First combatant (Character, CharacterSpec or loadout dict)
+        character_2: Second combatant
+        event: Key of RARE_EVENTS
+        fighter: The fighter (1 or 2) the event is about, e.g. the one
+            landing the Killing Blow
+        num_duels: Duels to simulate for the estimate
+        strength: Starting tilt theta; 0 starts from fair dice
+        refits: Pilot runs for cross-entropy refits; 0 keeps the starting tilt
+        pilot_duels: Duels per refit
+        rounds: Maximum number of combat rounds
+        chunk_size: Duels simulated at a time
+        rng: NumPy random Generator, or a seed for a new one
+        leadership: Whether Terror, Fear and break tests apply (tests are not tilted)
+        z: Normal quantile of the interval (1.96 for 95%)
+
+    Returns:
+        dict containing:
+        - probability (float): Estimated probability of the event
+        - std_error (float): Standard error of the estimate
+        - ci_low (float): Lower bound of the interval
+        - ci_high (float): Upper bound of the interval
+        - events (int): Simulated duels in which the event happened
+        - duels (int): Duels simulated for the estimate
+        - pilot_duels (int): Duels simulated to fit the tilt
+        - effective_samples (float): Effective sample size of the event duels' weights
+        - reliable (bool): Whether effective_samples reaches
+          MIN_EFFECTIVE_SAMPLES, i.e. whether std_error and the interval
+          can be trusted
+        - variance_reduction (float): Variance of plain sampling with the same
+          duels divided by the variance of this estimate (as unreliable as
+          std_error when reliable is False)
+    """
+    if event not in RARE_EVENTS:
+        raise ValueError(f"Unknown event {event!r}; expected one of {', '.join(RARE_EVENTS)}")
+    if fighter not in (1, 2):
+        raise ValueError("fighter must be 1 or 2")
+    spec_1 = build_loadout_spec(character_1) if isinstance(character_1, dict) else as_spec(character_1)
+    spec_2 = build_loadout_spec(character_2) if isinstance(character_2, dict) else as_spec(character_2)
+    _, start, indicator = RARE_EVENTS[event]
+    tilt = _Tilt(start, fighter, strength)
+    rng = as_generator(rng)
+
+    pilots = 0
+    best = (-1, tilt.strength)  # Most pilot events seen before any refit, and the strength that gave them
+    for _ in range(refits):
+        dice = TiltedDice(rng, tilt, pilot_duels, record=True)
+        results = batch_combat_simulation(spec_1, spec_2, pilot_duels, rounds=rounds, rng=dice, leadership=leadership)
+        pilots += pilot_duels
+        happened = indicator(results, fighter)
+        count = np.count_nonzero(happened)
+        if count >= MIN_PILOT_EVENTS:
+            tilt.refit(dice.counts, np.where(happened, dice.weights, 0.0))
+            continue
+        # Too rare to refit from yet: strengthen the starting tilt while that helps
+        if tilt.tables or count < best[0]:
+            tilt.strength = best[1]
+            break
+        best = (count, tilt.strength)
+        tilt.strength = 2 * (tilt.strength or STRENGTH)
+    else:
+        if not tilt.tables:
+            tilt.strength = best[1]
+
+    events = 0
+    total = squares = 0.0
+    for start_duel in range(0, num_duels, chunk_size):
+        size = min(chunk_size, num_duels - start_duel)
+        dice = TiltedDice(rng, tilt, size)
+        results = batch_combat_simulation(spec_1, spec_2, size, rounds=rounds, rng=dice, leadership=leadership)
+        weights = dice.weights[indicator(results, fighter)]
+        events += weights.size
+        total += weights.sum()
+        squares += np.square(weights).sum()
+
+    probability = total / num_duels
+    variance = max(0.0, squares / num_duels - probability * probability) / max(1, num_duels - 1)
+    std_error = math.sqrt(variance)
+    plain_variance = probability * (1 - probability) / num_duels
+    effective_samples = float(total * total / squares) if squares > 0 else 0.0
+    return {
+        'probability': float(probability),
+        'std_error': std_error,
+        'ci_low': float(max(0.0, probability - z * std_error)),
+        'ci_high': float(min(1.0, probability + z * std_error)),
+        'events': int(events),
+        'duels': num_duels,
+        'pilot_duels': pilots,
+        'effective_samples': effective_samples,
+        'reliable': effective_samples >= MIN_EFFECTIVE_SAMPLES,
+        'variance_reduction': float(plain_variance / variance) if variance > 0 else math.inf,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Estimate the probability of a rare duel outcome by importance sampling.",
+        epilog='Fighters are JSON objects as in job_runner requests, e.g. \'{"faction": "High Elves", "profile": "Prince"}\'',
+    )
+    parser.add_argument("fighter_1", type=json.loads, help="first fighter")
+    parser.add_argument("fighter_2", type=json.loads, help="second fighter")
+    parser.add_argument("--event", choices=list(RARE_EVENTS), default="killing_blow", help="outcome to estimate")
+    parser.add_argument("--fighter", type=int, choices=(1, 2), default=1, help="fighter the event is about")
+    parser.add_argument("--duels", type=int, default=100000, help="duels to simulate")
+    parser.add_argument("--strength", type=float, default=STRENGTH, help="tilt of the dice (0 for plain sampling)")
+    parser.add_argument("--rounds", type=int, default=2, help="maximum combat rounds per duel")
+    parser.add_argument("--leadership", action="store_true", help="apply Terror, Fear and break tests")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible results")
+    args = parser.parse_args(argv)
+
+    fighters = [parse_fighter(fighter) for fighter in (args.fighter_1, args.fighter_2)]
+    result = rare_event_probability(
+        *fighters, args.event, fighter=args.fighter, num_duels=args.duels, strength=args.strength,
+        rounds=args.rounds, rng=args.seed, leadership=args.leadership,
+    )
+    print(f"{loadout_label(fighters[0])} vs {loadout_label(fighters[1])}")
+    print(f"P({RARE_EVENTS[args.event][0]}, fighter {args.fighter}) = {result['probability']:.3e} "
+          f"(95% CI {result['ci_low']:.3e} to {result['ci_high']:.3e})")
+    print(f"{result['events']} events in {result['duels']} duels (effective sample size "
+          f"{result['effective_samples']:.0f}), {result['variance_reduction']:.1f}x less variance than plain sampling")
+    if not result['reliable']:
+        print(f"Warning: effective sample size below {MIN_EFFECTIVE_SAMPLES}, so the interval can't be trusted; "
+              f"rerun with more --duels")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+import numpy as np
+
+from armor import find_armour_key
+from batch_simulations import batch_combat_simulation
+from character_model import PROFILE_STATS, Character, CharacterSpec, as_spec
+from dice import DiceSource
+from weapons import find_weapon_key
+
+# Bump when a rules or engine change makes stored results stale
+CACHE_VERSION = 1
+
+
+def loadout_fingerprint(character: Character | CharacterSpec, include_name: bool = False) -> dict:
+    """Canonical description of everything that affects a fighter's results.
+
+    Covers effective stats, race, weapon and armour (by canonical table entry,
+    along with the Strength, AP and saves those entries give), shield and the
+    full rule set (own, honor and weapon rules). The name only matters for
+    Hatred (X) and is left out unless include_name is set.
+    """
+    spec = as_spec(character)
+    rules = spec.compiled_rules
+    weapon_key = find_weapon_key(spec.Weapon)
+    armour_key = find_armour_key(spec.Armor)
+    fingerprint = {
+        "stats": {stat: getattr(spec, stat) for stat in PROFILE_STATS},
+        "race": spec.Race,
+        "weapon": list(weapon_key) if isinstance(weapon_key, tuple) else spec.Weapon,
+        "armor": list(armour_key) if isinstance(armour_key, tuple) else armour_key or spec.Armor,
+        "shield": spec.Shield is not None,
+        "rules": sorted(rules.rules),
+        "weapon_profile": [rules.weapon_strength or 0, rules.weapon_ap],
+        "armour_save": [rules.armour_save, rules.armour_save_shooting],
+    }
+    if include_name:
+        fingerprint["name"] = spec.name
+    return fingerprint
+
+
+def loadout_hash(character: Character | CharacterSpec, include_name: bool = False) -> str:
+    """SHA-256 of a fighter's loadout_fingerprint."""
+    encoded = json.dumps(loadout_fingerprint(character, include_name), sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def matchup_key(
+    character_1: Character | CharacterSpec,
+    character_2: Character | CharacterSpec,
+    rounds: int,
+) -> tuple[str, bool]:
+    """Cache key for a duel, independent of which fighter is listed first.
+
+    Returns:
+        tuple containing:
+        - str: The key
+        - bool: Whether the fighters were swapped into canonical order
+    """
+    spec_1, spec_2 = as_spec(character_1), as_spec(character_2)
+    # Names only matter if a Hatred (X) rule could match them
+    include_name = needs_name(spec_1) or needs_name(spec_2)
+    return pair_key(loadout_hash(spec_1, include_name), loadout_hash(spec_2, include_name), rounds)
+
+
+def needs_name(character: Character | CharacterSpec) -> bool:
+    """Whether a matchup involving character must hash names (it has Hatred of a named race or character)."""
+    return as_spec(character).compiled_rules.hatred not in (None, "all")
+
+
+def pair_key(hash_1: str, hash_2: str, rounds: int) -> tuple[str, bool]:
+    """matchup_key from two loadout hashes, for callers that hash each loadout once."""
+    swapped = hash_2 < hash_1
+    if swapped:
+        hash_1, hash_2 = hash_2, hash_1
+    key = hashlib.sha256(f"{CACHE_VERSION}:{hash_1}:{hash_2}:{rounds}".encode()).hexdigest()
+    return key, swapped
+
+
+class ResultCache:
+    """SQLite store of duel results, keyed by matchup_key, with LRU eviction.
+
+    Each entry holds counts (samples, wins of either fighter, draws, Killing
+    Blow endings), so extra samples for a matchup can be merged in later.
+
+    Args:
+        path: SQLite database file (":memory:" for a throwaway cache)
+        max_entries: Least recently used entries beyond this are evicted
+    """
+
+    def __init__(self, path: str = "matchup_cache.sqlite", max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS matchups (
+                key TEXT PRIMARY KEY,
+                samples INTEGER NOT NULL,
+                wins_1 INTEGER NOT NULL,
+                wins_2 INTEGER NOT NULL,
+                draws INTEGER NOT NULL,
+                killing_blows INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS matchups_last_used ON matchups (last_used)")
+        self.connection.commit()
+
+    def get(self, key: str) -> dict[str, int] | None:
+        """Return the counts stored for a key (marking it as recently used), or None."""
+        row = self.connection.execute(
+            "SELECT samples, wins_1, wins_2, draws, killing_blows FROM matchups WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.connection.execute("UPDATE matchups SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.connection.commit()
+        return dict(zip(("samples", "wins_1", "wins_2", "draws", "killing_blows"), row))
+
+    def merge(self, key: str, counts: dict[str, int]) -> dict[str, int]:
+        """Add counts to an entry (creating it if needed) and return the new totals."""
+        self.connection.execute(
+            """INSERT INTO matchups (key, samples, wins_1, wins_2, draws, killing_blows, last_used)
+            VALUES (:key, :samples, :wins_1, :wins_2, :draws, :killing_blows, :last_used)
+            ON CONFLICT (key) DO UPDATE SET
+                samples = samples + excluded.samples,
+                wins_1 = wins_1 + excluded.wins_1,
+                wins_2 = wins_2 + excluded.wins_2,
+                draws = draws + excluded.draws,
+                killing_blows = killing_blows + excluded.killing_blows,
+                last_used = excluded.last_used""",
+            {**counts, "key": key, "last_used": time.time()},
+        )
+        self.evict()
+        self.connection.commit()
+        return self.get(key)
+
+    def get_many(self, keys: list[str], batch_size: int = 500) -> dict[str, dict[str, int]]:
+        """get() for many keys in one transaction; keys without an entry are left out."""
+        found = {}
+        now = time.time()
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            rows = self.connection.execute(
+                f"SELECT key, samples, wins_1, wins_2, draws, killing_blows FROM matchups WHERE key IN ({','.join('?' * len(batch))})",
+                batch,
+            ).fetchall()
+            for key, *counts in rows:
+                found[key] = dict(zip(("samples", "wins_1", "wins_2", "draws", "killing_blows"), counts))
+        self.connection.executemany("UPDATE matchups SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+        self.connection.commit()
+        return found
+
+    def merge_many(self, entries: dict[str, dict[str, int]]) -> None:
+        """merge() for many keys in one transaction."""
+        now = time.time()
+        self.connection.executemany(
+            """INSERT INTO matchups (key, samples, wins_1, wins_2, draws, killing_blows, last_used)
+            VALUES (:key, :samples, :wins_1, :wins_2, :draws, :killing_blows, :last_used)
+            ON CONFLICT (key) DO UPDATE SET
+                samples = samples + excluded.samples,
+                wins_1 = wins_1 + excluded.wins_1,
+                wins_2 = wins_2 + excluded.wins_2,
+                draws = draws + excluded.draws,
+                killing_blows = killing_blows + excluded.killing_blows,
+                last_used = excluded.last_used""",
+            [{**counts, "key": key, "last_used": now} for key, counts in entries.items()],
+        )
+        self.evict()
+        self.connection.commit()
+
+    def evict(self) -> None:
+        """Drop the least recently used entries beyond max_entries."""
+        self.connection.execute(
+            """DELETE FROM matchups WHERE key IN (
+                SELECT key FROM matchups ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.max_entries,),
+        )
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM matchups").fetchone()[0]
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def swap_counts(counts: dict[str, int]) -> dict[str, int]:
+    """Counts with the two fighters' wins exchanged, for a key stored in the other order."""
+    return {**counts, "wins_1": counts["wins_2"], "wins_2": counts["wins_1"]}
+
+
+def cached_batch_simulation(
+    character_1: Character | CharacterSpec,
+    character_2: Character | CharacterSpec,
+    num_duels: int,
+    rounds: int = 2,
+    cache: ResultCache | None = None,
+    rng: DiceSource | np.random.Generator | int | None = None,
+) -> dict[str, float | int]:
+    """Win rates for a duel, simulating only the samples the cache is missing.
+
+    If the cache already holds at least num_duels samples for the matchup they
+    are returned as-is; otherwise the shortfall is simulated with
+    batch_combat_simulation and merged into the entry.
+
+    An int seed is combined with the matchup key and the samples already
+    cached (as tournament.play_round_robin seeds pairings), so topping up a
+    seeded entry draws new duels rather than repeating the cached ones.
+
+    Args:
+        character_1: First combatant
+        character_2: Second combatant
+        num_duels: Minimum number of samples wanted
+        rounds: Maximum number of combat rounds
+        cache: ResultCache to use (defaults to a ResultCache on the default path)
+        rng: DiceSource, NumPy Generator or int seed for new samples
+
+    Returns:
+        dict with the samples used and the fraction of duels won by
+        character_1, won by character_2, ended in a stalemate, and ended by a
+        Killing Blow
+    """
+    cache = ResultCache() if cache is None else cache
+    key, swapped = matchup_key(character_1, character_2, rounds)
+    counts = cache.get(key)
+    counts = swap_counts(counts) if counts and swapped else counts
+
+    cached = counts["samples"] if counts else 0
+    missing = num_duels - cached
+    if missing > 0:
+        if isinstance(rng, (int, np.integer)):
+            rng = np.random.default_rng([int(rng), int(key[:16], 16), cached])
+        results = batch_combat_simulation(character_1, character_2, missing, rounds=rounds, rng=rng)
+        winner = results["winner"]
+        new_counts = {
+            "samples": missing,
+            "wins_1": int(np.count_nonzero(winner == 1)),
+            "wins_2": int(np.count_nonzero(winner == 2)),
+            "draws": int(np.count_nonzero(winner == 0)),
+            "killing_blows": int(np.count_nonzero(results["killing_blow"])),
+        }
+        counts = cache.merge(key, swap_counts(new_counts) if swapped else new_counts)
+        counts = swap_counts(counts) if swapped else counts
+
+    samples = counts["samples"]
+    return {
+        "samples": samples,
+        "character_1": counts["wins_1"] / samples,
+        "character_2": counts["wins_2"] / samples,
+        "stalemate": counts["draws"] / samples,
+        "killing_blow": counts["killing_blows"] / samples,
+    }
@@ -0,0 +1,252 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from batch_simulations import batch_combat_simulation
+from character_model import Character, CharacterSpec
+from dice import DiceSource, as_generator
+
+# Per-duel outcome columns from batch_combat_simulation and their stored types
+DUEL_COLUMNS = {
+    'winner': np.int8,
+    'rounds': np.int8,
+    'wounds_1': np.int8,
+    'wounds_2': np.int8,
+    'killing_blow': np.bool_,
+    'fled': np.bool_,
+}
+# Extra column for stores holding several matchups: index of the matchup each duel belongs to
+MATCHUP_COLUMN = {'matchup': np.int32}
+
+# Every column file starts with a fixed-size .npy header, so the row count can
+# be rewritten in place as rows are appended
+HEADER_SIZE = 128
+_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def _npy_header(dtype: np.dtype, rows: int) -> bytes:
+    """Version 1.0 .npy header for a 1-D array, padded to HEADER_SIZE bytes."""
+    header = f"{{'descr': {np.dtype(dtype).str!r}, 'fortran_order': False, 'shape': ({rows},), }}"
+    header = header.ljust(HEADER_SIZE - len(_MAGIC) - 2 - 1) + "\n"
+    return _MAGIC + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+class ResultsStore:
+    """Column store of per-duel outcomes, one memory-mappable .npy file per column.
+
+    Rows are appended in chunks straight to disk, so a sweep of any size only
+    holds one chunk in memory. Each column file is a valid .npy file once
+    flushed, and can be opened with np.load(path, mmap_mode="r") without the
+    store. Rows written after the last flush are discarded when the store is
+    reopened for appending.
+
+    Opened with read_only, the store never writes: it sees the rows of the
+    last flush, so analysis can open a store while a sweep is still
+    appending to it.
+
+    Args:
+        path: Directory holding the column files (created if missing)
+        columns: Column name -> dtype for a new store (defaults to DUEL_COLUMNS);
+            an existing store keeps its own columns
+        metadata: JSON-serialisable description of the sweep, stored with a new store
+        read_only: Open an existing store for reading only
+    """
+
+    def __init__(self, path: str, columns: dict | None = None, metadata: dict | None = None, read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+        meta_path = os.path.join(path, "store.json")
+        if read_only and not os.path.exists(meta_path):
+            raise FileNotFoundError(f"No results store at {path!r}")
+        if os.path.exists(meta_path):
+            with open(meta_path) as handle:
+                meta = json.load(handle)
+            self.columns = {name: np.dtype(dtype) for name, dtype in meta["columns"].items()}
+            self.metadata = meta["metadata"]
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.columns = {name: np.dtype(dtype) for name, dtype in (columns or DUEL_COLUMNS).items()}
+            self.metadata = metadata or {}
+            with open(meta_path, "w") as handle:
+                json.dump({"columns": {name: dtype.str for name, dtype in self.columns.items()}, "metadata": self.metadata}, handle)
+
+        self._files = {}
+        rows = None
+        for name, dtype in self.columns.items():
+            column_path = self.column_path(name)
+            if not os.path.exists(column_path) and not read_only:
+                with open(column_path, "wb") as handle:
+                    handle.write(_npy_header(dtype, 0))
+            handle = open(column_path, "rb" if read_only else "r+b")
+            handle.seek(len(_MAGIC))
+            header_length, = struct.unpack("<H", handle.read(2))
+            shape = handle.read(header_length).decode("latin1").split("'shape': (")[1].split(",")[0]
+            column_rows = int(shape) if shape.strip() else 0
+            rows = column_rows if rows is None else min(rows, column_rows)
+            self._files[name] = handle
+        self.rows = rows or 0
+        if read_only:
+            return
+        # Drop anything written after the last flush (or by a partial append)
+        for name, handle in self._files.items():
+            handle.truncate(HEADER_SIZE + self.rows * self.columns[name].itemsize)
+            handle.seek(0, os.SEEK_END)
+        self.flush()
+
+    def column_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.npy")
+
+    def append(self, results: dict[str, np.ndarray], **constants) -> int:
+        """Append a chunk of rows.
+
+        Args:
+            results: Column name -> 1-D array, e.g. from batch_combat_simulation;
+                keys that aren't columns of the store are ignored
+            constants: Column name -> value shared by every row of the chunk,
+                e.g. matchup=3
+
+        Returns:
+            int: Rows appended
+        """
+        if self.read_only:
+            raise ValueError(f"Results store {self.path!r} is open read-only")
+        size = len(next(iter(results.values())))
+        for name, dtype in self.columns.items():
+            if name in constants:
+                values = np.full(size, constants[name], dtype=dtype)
+            elif name in results:
+                values = np.asarray(results[name]).astype(dtype, copy=False)
+            else:
+                raise KeyError(f"No values for column {name!r}")
+            if values.shape != (size,):
+                raise ValueError(f"Column {name!r} has shape {values.shape}, expected ({size},)")
+            self._files[name].write(values.tobytes())
+        self.rows += size
+        return size
+
+    def flush(self) -> None:
+        """Write the current row count into every header and flush to disk."""
+        if self.read_only:
+            return
+        for name, handle in self._files.items():
+            handle.flush()
+            position = handle.tell()
+            handle.seek(0)
+            handle.write(_npy_header(self.columns[name], self.rows))
+            handle.seek(position)
+            handle.flush()
+
+    def close(self) -> None:
+        if self._files:
+            self.flush()
+            for handle in self._files.values():
+                handle.close()
+            self._files = {}
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only memory map of a column, including rows appended since the last flush."""
+        dtype = self.columns[name]
+        if not self.read_only:
+            # Push appended bytes to the file; the header is left to flush()
+            self._files[name].flush()
+        if not self.rows:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self.column_path(name), dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(self.rows,))
+
+    def iter_chunks(self, chunk_size: int = 1000000, columns: list[str] | None = None):
+        """Yield dicts of column name -> array for consecutive chunks of rows.
+
+        Only one chunk per column is in memory at a time.
+        """
+        maps = {name: self.column(name) for name in (columns or self.columns)}
+        for start in range(0, self.rows, chunk_size):
+            yield {name: np.array(column[start:start + chunk_size]) for name, column in maps.items()}
+
+    def summary(self, chunk_size: int = 1000000) -> dict:
+        """Win rates as in summarize_batch, streamed over the whole store.
+
+        For stores with a matchup column, returns one summary per matchup index.
+        """
+        columns = ['winner', 'killing_blow', 'fled'] + (['matchup'] if 'matchup' in self.columns else [])
+        counts = {}
+        for chunk in self.iter_chunks(chunk_size, columns):
+            groups = chunk['matchup'] if 'matchup' in chunk else np.zeros(chunk['winner'].size, dtype=np.int32)
+            for group in np.unique(groups):
+                selected = groups == group
+                winner = chunk['winner'][selected]
+                total = counts.setdefault(int(group), np.zeros(6, dtype=np.int64))
+                total += [
+                    winner.size,
+                    np.count_nonzero(winner == 1),
+                    np.count_nonzero(winner == 2),
+                    np.count_nonzero(winner == 0),
+                    np.count_nonzero(chunk['killing_blow'][selected]),
+                    np.count_nonzero(chunk['fled'][selected]),
+                ]
+        summaries = {}
+        for group, total in sorted(counts.items()):
+            samples, wins_1, wins_2, draws, killing_blows, fled = (int(count) for count in total)
+            summaries[group] = {
+                'samples': samples,
+                'character_1': wins_1 / samples,
+                'character_2': wins_2 / samples,
+                'stalemate': draws / samples,
+                'killing_blow': killing_blows / samples,
+                'fled': fled / samples,
+            }
+        if 'matchup' in self.columns:
+            return summaries
+        return summaries.get(0, {'samples': 0})
+
+    def __repr__(self):
+        return f"ResultsStore({self.path!r}, rows={self.rows}, columns={list(self.columns)}, read_only={self.read_only})"
+
+
+def simulate_to_store(
+    store: ResultsStore,
+    character_1: Character | CharacterSpec,
+    character_2: Character | CharacterSpec,
+    num_duels: int,
+    rounds: int = 2,
+    chunk_size: int = 1000000,
+    rng: DiceSource | np.random.Generator | int | None = None,
+    leadership: bool = False,
+    **constants,
+) -> int:
+    """Stream num_duels duels from batch_combat_simulation into a store, chunk by chunk.
+
+    The store is flushed after every chunk, so an interrupted sweep keeps
+    every completed chunk.
+
+    Args:
+        store: ResultsStore to append to
+        character_1: First combatant
+        character_2: Second combatant
+        num_duels: Number of duels to simulate
+        rounds: Maximum number of combat rounds
+        chunk_size: Duels simulated and written at a time
+        rng: DiceSource or NumPy random Generator, or a seed for a new one
+        leadership: Whether Terror, Fear and break tests apply
+        constants: Values for extra columns, e.g. matchup=3
+
+    Returns:
+        int: Rows in the store afterwards
+    """
+    rng = as_generator(rng)
+    for start in range(0, num_duels, chunk_size):
+        size = min(chunk_size, num_duels - start)
+        results = batch_combat_simulation(character_1, character_2, size, rounds=rounds, rng=rng, leadership=leadership)
+        store.append(results, **constants)
+        store.flush()
+    return len(store)
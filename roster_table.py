@@ -0,0 +1,218 @@
+import hashlib
+import os
+
+import numpy as np
+
+from character_model import PROFILE_STATS, CharacterSpec, CompiledRules
+from faction_profiles import FactionProfiles
+from loadout_optimizer import profile_loadouts
+from matchup_matrix import build_loadout_spec
+from result_cache import loadout_hash
+from weapons import get_weapon_special_rules
+
+# Bump when the table layout or how rows are resolved changes
+ROSTER_VERSION = 1
+# Modules whose contents decide the table: the data, alias resolution, which
+# loadouts are enumerated and how rows are built. A change to any of them
+# rebuilds the cache
+DATA_MODULES = (
+    "faction_profiles.py", "weapons.py", "armor.py", "elven_honors.py",
+    "magic_items.py", "special_rules.py", "item_index.py", "character_model.py",
+    "result_cache.py", "matchup_matrix.py", "loadout_optimizer.py", "roster_table.py",
+)
+# Sentinel for "no value" in the int8 columns (no save, no Killing Blow, ...)
+NONE = 0
+
+# Rule flags of CompiledRules stored as bool columns
+RULE_FLAGS = (
+    "strike_first", "strike_last", "is_magical", "is_flaming", "is_ethereal",
+    "weapon_first_round_only", "causes_fear", "causes_terror",
+    "immune_to_psychology", "stubborn", "veteran", "valour_of_ages",
+)
+# Values of CompiledRules stored as int8 columns, with None stored as NONE
+RULE_VALUES = (
+    "weapon_strength", "weapon_ap", "armour_bane", "killing_blow", "extra_attacks",
+    "armour_save", "armour_save_shooting", "ward", "ward_vs_flaming", "regeneration",
+)
+
+ROSTER_DTYPE = np.dtype(
+    [
+        ("faction", "U24"),
+        ("profile", "U32"),
+        ("weapon", "U32"),
+        ("armor", "U24"),
+        ("shield", "?"),
+        ("honor", "U24"),
+        ("race", "U24"),
+        *[(stat, "i1") for stat in PROFILE_STATS],
+        *[(value, "i1") for value in RULE_VALUES],
+        *[(flag, "?") for flag in RULE_FLAGS],
+        ("reroll_hits", "U24"),
+        ("hatred", "U24"),
+        ("special_rules", "U512"),  # Character and honor rules, joined by RULE_SEPARATOR
+        ("hash", "U64"),            # loadout_hash of the row's fighter
+    ]
+)
+RULE_SEPARATOR = "|"
+
+
+def data_hash() -> str:
+    """SHA-256 over ROSTER_VERSION and the source of every DATA_MODULES file."""
+    digest = hashlib.sha256(str(ROSTER_VERSION).encode())
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for module in DATA_MODULES:
+        with open(os.path.join(directory, module), "rb") as handle:
+            digest.update(handle.read())
+    return digest.hexdigest()
+
+
+def _row(loadout: dict, spec: CharacterSpec) -> tuple:
+    rules = spec.compiled_rules
+    values = {
+        "faction": loadout["faction"],
+        "profile": loadout["profile"],
+        "weapon": loadout["weapon"],
+        "armor": loadout["armor"] or "",
+        "shield": bool(loadout["shield"]),
+        "honor": (loadout.get("honors") or [""])[0],
+        "race": spec.Race,
+        **{stat: getattr(spec, stat) for stat in PROFILE_STATS},
+        **{value: NONE if getattr(rules, value) is None else getattr(rules, value) for value in RULE_VALUES},
+        **{flag: getattr(rules, flag) for flag in RULE_FLAGS},
+        "reroll_hits": rules.reroll_hits or "",
+        "hatred": rules.hatred or "",
+        "special_rules": RULE_SEPARATOR.join(spec.SpecialRules),
+        "hash": loadout_hash(spec),
+    }
+    return tuple(values[name] for name in ROSTER_DTYPE.names)
+
+
+def build_roster_table(profiles: dict | None = None, honors: bool = True) -> np.ndarray:
+    """Resolve every legal loadout of FactionProfiles into one structured array.
+
+    Each row holds a fighter's profile stats, equipment, and its compiled
+    rules (weapon Strength/AP, saves, wards, Killing Blow, flags) already
+    resolved, so sweeps can read rows instead of building Characters.
+
+    Args:
+        profiles: Faction profiles to include (defaults to FactionProfiles)
+        honors: Whether to include Elven Honor variants of High Elf loadouts
+
+    Returns:
+        np.ndarray: ROSTER_DTYPE rows, validated with validate_roster_table
+    """
+    profiles = FactionProfiles if profiles is None else profiles
+    rows = []
+    for faction, faction_profiles in profiles.items():
+        for profile_name in faction_profiles:
+            for loadout in profile_loadouts(faction, profile_name, honors=honors):
+                rows.append(_row(loadout, build_loadout_spec(loadout)))
+    table = np.array(rows, dtype=ROSTER_DTYPE)
+    validate_roster_table(table)
+    return table
+
+
+def validate_roster_table(table: np.ndarray) -> None:
+    """Check a roster table's layout and value ranges; raises ValueError on the first problem."""
+    if table.dtype != ROSTER_DTYPE:
+        raise ValueError("Roster table has the wrong dtype; rebuild it")
+    for stat in PROFILE_STATS:
+        if ((table[stat] < 0) | (table[stat] > 10)).any():
+            raise ValueError(f"{stat} out of range 0-10 in roster table")
+    for save in ("armour_save", "armour_save_shooting", "ward", "ward_vs_flaming", "regeneration", "killing_blow"):
+        column = table[save]
+        if ((column != NONE) & ((column < 1) | (column > 7))).any():
+            raise ValueError(f"{save} out of range in roster table")
+    for name in ("faction", "profile", "weapon", "hash"):
+        if (table[name] == "").any():
+            raise ValueError(f"Empty {name} in roster table")
+    for row in table:
+        # Unicode columns silently truncate, so check the longest value fits
+        if len(row["special_rules"]) >= ROSTER_DTYPE["special_rules"].itemsize // 4:
+            raise ValueError(f"Special rules of {row['profile']} too long for the roster table")
+    if np.unique(table["hash"]).size != table.size:
+        raise ValueError("Duplicate loadouts in roster table")
+
+
+def roster_table(cache_dir: str = ".roster_cache", rebuild: bool = False) -> np.ndarray:
+    """The roster table for the current data modules, built once and cached on disk.
+
+    The cache file is named after data_hash(), so editing any data module
+    (or bumping ROSTER_VERSION) builds a fresh table on the next call.
+
+    Args:
+        cache_dir: Directory for cached tables
+        rebuild: Build the table even if a cached copy exists
+    """
+    path = os.path.join(cache_dir, f"roster-{data_hash()[:16]}.npy")
+    if not rebuild and os.path.exists(path):
+        table = np.load(path)
+        validate_roster_table(table)
+        return table
+    table = build_roster_table()
+    os.makedirs(cache_dir, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as handle:
+        np.save(handle, table)
+    os.replace(temporary, path)
+    return table
+
+
+def _values(row) -> dict:
+    # One conversion to Python values; indexing a NumPy record field by field is slow
+    return row if isinstance(row, dict) else dict(zip(ROSTER_DTYPE.names, row.item()))
+
+
+def row_rules(row) -> CompiledRules:
+    """CompiledRules for one roster row, read from its columns instead of parsing rule strings."""
+    row = _values(row)
+    compiled = CompiledRules()
+    character_rules = row["special_rules"].split(RULE_SEPARATOR) if row["special_rules"] else []
+    compiled.rules = tuple(character_rules + [str(rule) for rule in get_weapon_special_rules(row["weapon"])])
+    for value in RULE_VALUES:
+        setattr(compiled, value, None if row[value] == NONE else row[value])
+    for flag in RULE_FLAGS:
+        setattr(compiled, flag, row[flag])
+    # Columns where 0 is a real value rather than "none"
+    compiled.weapon_ap = row["weapon_ap"]
+    compiled.armour_bane = row["armour_bane"]
+    compiled.extra_attacks = row["extra_attacks"]
+    compiled.reroll_hits = row["reroll_hits"] or None
+    compiled.hatred = row["hatred"] or None
+    return compiled
+
+
+def row_spec(row) -> CharacterSpec:
+    """CharacterSpec for one roster row, skipping Character's validation and rule parsing."""
+    row = _values(row)
+    return CharacterSpec(
+        row["profile"],
+        SpecialRules=row["special_rules"].split(RULE_SEPARATOR) if row["special_rules"] else (),
+        Armor=row["armor"] or None,
+        Weapon=row["weapon"],
+        Shield="Shield" if row["shield"] else None,
+        Race=row["race"],
+        compiled_rules=row_rules(row),
+        **{stat: row[stat] for stat in PROFILE_STATS},
+    )
+
+
+def row_loadout(row) -> dict:
+    """Loadout dict (as from enumerate_loadouts, with honors) for one roster row."""
+    row = _values(row)
+    return {
+        "faction": row["faction"],
+        "profile": row["profile"],
+        "weapon": row["weapon"],
+        "armor": row["armor"] or None,
+        "shield": "Shield" if row["shield"] else None,
+        "honors": [row["honor"]] if row["honor"] else None,
+    }
+
+
+def select_rows(table: np.ndarray, **criteria) -> np.ndarray:
+    """Rows matching every column == value criterion, e.g. select_rows(table, profile="Prince", honor="")."""
+    mask = np.ones(table.size, dtype=bool)
+    for column, value in criteria.items():
+        mask &= table[column] == value
+    return table[mask]
@@ -0,0 +1,274 @@
+import math
+
+import numpy as np
+
+from batch_simulations import _d6, batch_resolve_hits
+from character_model import Character, CharacterSpec, CombatState
+from combat_events import CombatLog, Volley
+from charts import Wounds_vs_ToughnessChart
+from dice import DiceSource, as_generator
+from special_rules import ArrowsOfIsha, FlamingAttacks, IgnoresCover, Magic
+from units import Unit
+from weapons import get_ranged_weapon_stats
+
+# To-hit modifiers for shooting at a target in cover
+COVER_MODIFIERS = {None: 0, "partial": -1, "full": -2}
+VolleyFire = "Volley Fire"
+
+
+def ballistic_skill_target(ballistic_skill: int, modifier: int = 0) -> tuple[int | None, int | None]:
+    """D6 needed to hit with a shot: 7 - BS, adjusted by modifier.
+
+    A natural 1 always misses. Targets above 6 need a 6 followed by a
+    second roll: 7+ is 6 then 4+, 8+ is 6 then 5+, 9+ is 6 then 6+, and
+    anything harder can't hit at all.
+
+    Returns:
+        tuple containing:
+        - int | None: D6 target, or None if the shot can't hit
+        - int | None: Target for the follow-up roll after a 6, or None if not needed
+    """
+    target = max(2, 7 - ballistic_skill - modifier)
+    if target <= 6:
+        return target, None
+    if target <= 9:
+        return 6, target - 3
+    return None, None
+
+
+def get_ranged_weapon(shooter: Character | CharacterSpec, ranged_weapon: str | None = None) -> str:
+    """Return the ranged weapon a shooter fires: ranged_weapon if given, else its equipped Weapon."""
+    weapon = ranged_weapon if ranged_weapon is not None else shooter.Weapon
+    if get_ranged_weapon_stats(weapon, raise_on_missing=False) is None:
+        raise ValueError(f"{shooter.name} has no ranged weapon (Weapon: {weapon})")
+    return weapon
+
+
+def get_shooting_profile(
+    shooter: Character | CharacterSpec,
+    target: Character | CharacterSpec,
+    ranged_weapon: str | None = None,
+    distance: float | None = None,
+    cover: str | None = None,
+    moved: bool = False,
+) -> dict[str, int | bool | None]:
+    """Resolve every rule that shapes one shot into plain numbers.
+
+    The counterpart of get_strike_profile for shooting, with the same wound
+    and save keys, so volleys go through batch_resolve_hits like melee
+    strikes.
+
+    Args:
+        shooter: The Character shooting
+        target: The Character being shot at
+        ranged_weapon: Ranged weapon fired (defaults to the shooter's Weapon)
+        distance: Range to the target in inches (None for short range)
+        cover: None, "partial" or "full"
+        moved: Whether the shooter moved this turn
+
+    Returns:
+        dict containing:
+        - in_range (bool): Whether the target is within the weapon's range
+        - to_hit (int | None): D6 target to hit, or None if no hit is possible
+        - to_hit_followup (int | None): Second roll needed after a 6 for 7+ to hit
+        - to_wound (int | None): D6 target to wound, or None if no wounds are possible
+        - killing_blow (bool): Always False; shots don't cause Killing Blows
+        - save_target (int | None): Armour save against a wound, or None if no save
+        - save_target_ab (int | None): Armour save against a wound rolled on a 6
+        - ward_target (int | None): Target's ward save against this shot
+        - regen_target (int | None): Target's regeneration save
+        - is_flaming (bool): Whether the shot is Flaming
+        - is_magical (bool): Whether the shot is Magical
+
+    Special Rules Handled:
+        - Ignores Cover: Cover modifiers don't apply
+        - Arrows of Isha: Shots count as Magical (they can wound Ethereal targets)
+        - ABX on the ranged weapon: Armour Bane on wound rolls of 6
+        - Improve Armor 2 in Shooting: +2 to the target's armour save
+    """
+    if cover not in COVER_MODIFIERS:
+        raise ValueError(f"Unknown cover {cover!r}; expected one of {', '.join(map(repr, COVER_MODIFIERS))}")
+    weapon_range, weapon_strength, weapon_ap, weapon_rules = get_ranged_weapon_stats(get_ranged_weapon(shooter, ranged_weapon))
+    shooter_rules = shooter.compiled_rules.rules
+    target_rules = target.compiled_rules
+
+    # To-hit modifiers: long range, cover and moving
+    modifier = 0
+    if distance is not None and distance > weapon_range / 2:
+        modifier -= 1
+    if IgnoresCover not in shooter_rules:
+        modifier += COVER_MODIFIERS[cover]
+    if moved:
+        modifier -= 1
+    to_hit, to_hit_followup = ballistic_skill_target(shooter.BallisticSkill, modifier)
+
+    is_magical = Magic in weapon_rules or Magic in shooter_rules or ArrowsOfIsha in shooter_rules
+    is_flaming = FlamingAttacks in weapon_rules or FlamingAttacks in shooter_rules
+    strength = weapon_strength if weapon_strength is not None else shooter.Strength
+
+    to_wound = None
+    if not (target_rules.is_ethereal and not is_magical):
+        to_wound = Wounds_vs_ToughnessChart[strength - 1][target.Toughness - 1]
+
+    # Armour saves, with extra AP from Armor Bane on wound rolls of 6
+    save_target = None
+    save_target_ab = None
+    if target.Armor is not None and target_rules.armour_save_shooting is not None:
+        armour_piercing = abs(weapon_ap or 0)
+        armour_bane = sum(int(rule[2:]) for rule in weapon_rules if rule.startswith("AB") and rule[2:].isdigit())
+        save_target = max(2, target_rules.armour_save_shooting + armour_piercing)
+        save_target_ab = max(2, target_rules.armour_save_shooting + armour_piercing + armour_bane)
+        save_target = save_target if save_target <= 6 else None
+        save_target_ab = save_target_ab if save_target_ab <= 6 else None
+
+    return {
+        'in_range': distance is None or distance <= weapon_range,
+        'to_hit': to_hit,
+        'to_hit_followup': to_hit_followup,
+        'to_wound': to_wound,
+        'killing_blow': False,
+        'save_target': save_target,
+        'save_target_ab': save_target_ab,
+        'ward_target': target_rules.ward_vs_flaming if is_flaming else target_rules.ward,
+        'regen_target': target_rules.regeneration,
+        'is_flaming': is_flaming,
+        'is_magical': is_magical,
+    }
+
+
+def roll_shooting_hits(profile: dict, shape, rng: np.random.Generator | DiceSource) -> np.ndarray:
+    """Roll to hit for a block of shots; returns a boolean array of hits."""
+    if not profile['in_range'] or profile['to_hit'] is None:
+        return np.zeros(shape, dtype=bool)
+    hits = _d6(rng, shape) >= profile['to_hit']
+    if profile['to_hit_followup'] is not None:
+        hits &= _d6(rng, shape) >= profile['to_hit_followup']
+    return hits
+
+
+def batch_volley(
+    profile: dict,
+    shots: int,
+    num_volleys: int,
+    rng: DiceSource | np.random.Generator | int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Roll many independent volleys of shots at once.
+
+    Args:
+        profile: Shooting profile from get_shooting_profile
+        shots: Shots per volley
+        num_volleys: Number of independent volleys
+        rng: DiceSource or NumPy random Generator, or a seed for a new one
+
+    Returns:
+        tuple containing:
+        - np.ndarray: Hits scored by each volley
+        - np.ndarray: Wounds caused by each volley (after all saves)
+    """
+    # A DiceSource is kept, rather than unwrapped, so its rolls count the dice
+    rng = rng if isinstance(rng, DiceSource) else as_generator(rng)
+    hits = roll_shooting_hits(profile, (num_volleys, shots), rng)
+    wounds, _ = batch_resolve_hits(profile, hits, rng)
+    return hits.sum(axis=1), wounds
+
+
+def unit_shots(unit: Unit, volley_fire: bool = False) -> np.ndarray:
+    """Shots each living model of a unit fires.
+
+    Models in the front rank shoot; with Volley Fire, half of the models in
+    the ranks behind (rounding up) shoot as well.
+    """
+    alive = unit.wounds > 0
+    position = np.cumsum(alive) - 1
+    shots = (alive & (position < unit.width)).astype(np.int16)
+    if volley_fire:
+        rear = np.flatnonzero(alive & (position >= unit.width))
+        shots[rear[:math.ceil(rear.size / 2)]] = 1
+    return shots
+
+
+def unit_shooting(
+    shooter: Unit,
+    target: Unit,
+    rng: DiceSource | np.random.Generator | int | None = None,
+    ranged_weapon: str | None = None,
+    distance: float | None = None,
+    cover: str | None = None,
+    moved: bool = False,
+) -> dict[str, int]:
+    """One turn of shooting from a unit at another unit, modifying the target.
+
+    Every profile in the shooting unit with a ranged weapon fires its shots
+    as one volley at the models the target's attacks are allocated to.
+
+    Args:
+        shooter: The unit shooting
+        target: The unit being shot at
+        rng: DiceSource or NumPy random Generator, or a seed for a new one
+        ranged_weapon: Ranged weapon for every model (defaults to each profile's Weapon)
+        distance: Range to the target in inches (None for short range)
+        cover: None, "partial" or "full"
+        moved: Whether the shooting unit moved this turn
+
+    Returns:
+        dict containing:
+        - shots (int): Shots fired
+        - hits (int): Shots that hit
+        - wounds (int): Wounds lost by the target
+    """
+    rng = rng if isinstance(rng, DiceSource) else as_generator(rng)
+    totals = {'shots': 0, 'hits': 0, 'wounds': 0}
+    for index, spec in enumerate(shooter.specs):
+        target_index = target.target_profile()
+        weapon = ranged_weapon if ranged_weapon is not None else spec.Weapon
+        stats = get_ranged_weapon_stats(weapon, raise_on_missing=False)
+        if target_index is None or stats is None:
+            continue
+        shots = int(unit_shots(shooter, VolleyFire in stats[3])[shooter.profile == index].sum())
+        if not shots:
+            continue
+        profile = get_shooting_profile(spec, target.specs[target_index], weapon, distance, cover, moved)
+        hits, wounds = batch_volley(profile, shots, 1, rng)
+        totals['shots'] += shots
+        totals['hits'] += int(hits[0])
+        totals['wounds'] += target.take_wounds(target_index, int(wounds[0]))
+    return totals
+
+
+def shoot_character(
+    shooter: CombatState,
+    target: CombatState,
+    rng: DiceSource | np.random.Generator | int | None = None,
+    ranged_weapon: str | None = None,
+    distance: float | None = None,
+    cover: str | None = None,
+    moved: bool = False,
+    log: CombatLog | None = None,
+) -> int:
+    """Fire a single character's shot at another, reducing target.current_wounds.
+
+    Does nothing if the shooter has no ranged weapon.
+
+    Args:
+        shooter: The fighter shooting
+        target: The fighter being shot at
+        rng: DiceSource or NumPy random Generator, or a seed for a new one
+        ranged_weapon: Ranged weapon fired (defaults to the shooter's Weapon)
+        distance: Range to the target in inches (None for short range)
+        cover: None, "partial" or "full"
+        moved: Whether the shooter moved this turn
+        log: CombatLog receiving a Volley event
+
+    Returns:
+        int: Wounds caused
+    """
+    weapon = ranged_weapon if ranged_weapon is not None else shooter.Weapon
+    if get_ranged_weapon_stats(weapon, raise_on_missing=False) is None:
+        return 0
+    profile = get_shooting_profile(shooter, target, weapon, distance, cover, moved)
+    hits, wounds = batch_volley(profile, 1, 1, rng)
+    wounds = min(int(wounds[0]), max(0, target.current_wounds))
+    target.current_wounds -= wounds
+    if log is not None:
+        log.emit(Volley(shooter.name, target.name, 1, int(hits[0]), wounds, target.current_wounds))
+    return wounds
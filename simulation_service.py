@@ -0,0 +1,225 @@
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_simulations import batch_combat_simulation, win_rate_interval
+from job_runner import job_key, parse_request
+from matchup_matrix import build_loadout_spec
+
+# Duels per scheduled chunk; progress is reported after every chunk
+CHUNK_SIZE = 50000
+
+
+def simulate_chunk(job: dict, size: int, seed) -> dict[str, int]:
+    """Simulate one chunk of a job in a worker process; returns outcome counts."""
+    results = batch_combat_simulation(
+        build_loadout_spec(job['fighter_1']), build_loadout_spec(job['fighter_2']), size,
+        rounds=job['rounds'], rng=np.random.default_rng(seed), leadership=job['leadership'],
+    )
+    winner = results['winner']
+    return {
+        'character_1': int(np.count_nonzero(winner == 1)),
+        'character_2': int(np.count_nonzero(winner == 2)),
+        'stalemate': int(np.count_nonzero(winner == 0)),
+        'killing_blow': int(np.count_nonzero(results['killing_blow'])),
+        'fled': int(np.count_nonzero(results['fled'])),
+    }
+
+
+class _Computation:
+    """One running job and the requests waiting on it."""
+
+    def __init__(self):
+        self.task = None
+        self.listeners = {}  # token -> progress callback (or None)
+        self.samples = 0
+        self.total = 0
+
+
+class SimulationService:
+    """Asyncio front end to the batch engine.
+
+    Jobs are split into chunks of chunk_size duels that run in a process
+    pool, so the event loop never blocks on simulation. Concurrent identical
+    requests (same job_key) share one computation, each getting the same
+    progress updates and result. A computation is cancelled once every
+    request waiting on it has been cancelled.
+
+    Seeded jobs are reproducible: chunk k uses the k-th child of the seed's
+    SeedSequence. With half_width set, the job stops after the first chunk
+    at which character_1's 95% interval is narrow enough, with samples as
+    the budget.
+
+    Args:
+        workers: Worker processes (defaults to the CPU count)
+        chunk_size: Duels per chunk
+    """
+
+    def __init__(self, workers: int | None = None, chunk_size: int = CHUNK_SIZE):
+        # Spawned rather than forked workers, which would inherit (and hold open) client sockets
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.chunk_size = chunk_size
+        self._computations = {}
+
+    async def simulate(self, job: dict, on_progress=None) -> dict:
+        """Run a job (from job_runner.parse_request), joining an identical one if running.
+
+        Args:
+            job: Normalised job
+            on_progress: Called with (samples done, total samples) after each chunk
+
+        Returns:
+            dict with the same fields as job_runner.run_job, plus coalesced
+            (whether this request joined a computation already under way)
+        """
+        key = job_key(job)
+        computation = self._computations.get(key)
+        coalesced = computation is not None
+        if computation is None:
+            computation = _Computation()
+            computation.task = asyncio.create_task(self._compute(key, job, computation))
+            self._computations[key] = computation
+        token = object()
+        computation.listeners[token] = on_progress
+        try:
+            result = await asyncio.shield(computation.task)
+        finally:
+            del computation.listeners[token]
+            if not computation.listeners and not computation.task.done():
+                computation.task.cancel()
+        return {**result, 'coalesced': coalesced}
+
+    async def _compute(self, key: str, job: dict, computation: _Computation) -> dict:
+        loop = asyncio.get_running_loop()
+        try:
+            chunks = math.ceil(job['samples'] / self.chunk_size)
+            seeds = np.random.SeedSequence(job['seed']).spawn(chunks)
+            counts = dict.fromkeys(('character_1', 'character_2', 'stalemate', 'killing_blow', 'fled'), 0)
+            computation.total = job['samples']
+            samples = 0
+            converged = False
+            for chunk, seed in enumerate(seeds):
+                size = min(self.chunk_size, job['samples'] - chunk * self.chunk_size)
+                chunk_counts = await loop.run_in_executor(self.executor, simulate_chunk, job, size, seed)
+                for name, count in chunk_counts.items():
+                    counts[name] += count
+                samples += size
+                computation.samples = samples
+                for callback in list(computation.listeners.values()):
+                    if callback is not None:
+                        callback(samples, job['samples'])
+                _, ci_low, ci_high = win_rate_interval(counts['character_1'], samples)
+                if job['half_width'] is not None and (ci_high - ci_low) / 2 <= job['half_width']:
+                    converged = True
+                    break
+            result = {name: count / samples for name, count in counts.items()}
+            result.update({'samples': samples, 'ci_low': ci_low, 'ci_high': ci_high})
+            if job['half_width'] is not None:
+                # As adaptive_combat_simulation reports for job_runner
+                result.update({'half_width': (ci_high - ci_low) / 2, 'converged': converged})
+            return result
+        finally:
+            self._computations.pop(key, None)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one connection speaking newline-delimited JSON.
+
+        Each line is a job_runner request, optionally with "op": "simulate",
+        or {"op": "cancel", "id": ...}. Replies are lines tagged with the
+        request id and an "event": "progress" (samples, total), "result",
+        "error" or "cancelled". Requests on one connection run concurrently;
+        closing the connection cancels its outstanding requests.
+        """
+        tasks = {}
+        lock = asyncio.Lock()
+
+        async def send(message: dict) -> None:
+            async with lock:
+                writer.write((json.dumps(message) + "\n").encode())
+                await writer.drain()
+
+        async def run(request_id, job) -> None:
+            def progress(samples: int, total: int) -> None:
+                asyncio.ensure_future(send({'id': request_id, 'event': 'progress', 'samples': samples, 'total': total}))
+
+            try:
+                result = await self.simulate(job, progress)
+                await send({'id': request_id, 'event': 'result', **result})
+            except asyncio.CancelledError:
+                await send({'id': request_id, 'event': 'cancelled'})
+            except Exception as error:
+                await send({'id': request_id, 'event': 'error', 'error': f"{type(error).__name__}: {error}"})
+            finally:
+                tasks.pop(request_id, None)
+
+        line_number = 0
+        try:
+            while line := await reader.readline():
+                line_number += 1
+                if not line.strip():
+                    continue
+                message = None
+                try:
+                    message = json.loads(line)
+                    if isinstance(message, dict) and message.get('op') == 'cancel':
+                        task = tasks.get(message.get('id'))
+                        if task is not None:
+                            task.cancel()
+                        continue
+                    request_id, job = parse_request(line, line_number)
+                    job_key(job)
+                except (ValueError, KeyError, TypeError) as error:
+                    request_id = message.get('id', line_number) if isinstance(message, dict) else line_number
+                    await send({'id': request_id, 'event': 'error', 'error': f"{type(error).__name__}: {error}"})
+                    continue
+                tasks[request_id] = asyncio.create_task(run(request_id, job))
+            if tasks:
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            for task in list(tasks.values()):
+                task.cancel()
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, path: str | None = None) -> None:
+        """Listen on a TCP port, or on a Unix socket if path is given, until cancelled."""
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle_client, path=path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve duel simulations over newline-delimited JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--socket", default=None, help="Unix socket path to listen on instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="duels per chunk (progress granularity)")
+    args = parser.parse_args(argv)
+
+    service = SimulationService(workers=args.workers, chunk_size=args.chunk_size)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,9 @@ Hatred = "Hatred"
 RequiresTwoHands = "Requires Two Hands"
 KillingBlow = "Killing Blow"
 KillingBlow6 = "Killing Blow 6+"
+Fear = "Fear"
+Terror = "Terror"
+Veteran = "Veteran"
 
 
 # Derived Special Rules
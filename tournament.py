@@ -0,0 +1,284 @@
+import argparse
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_simulations import Z_95, batch_combat_simulation
+from character_model import CharacterSpec
+from matchup_matrix import MatchupCounts, loadout_label
+from result_cache import ResultCache, loadout_hash, needs_name, pair_key, swap_counts
+from roster_table import roster_table, row_loadout, row_spec
+
+# Default tournament cache; it must hold every pairing, so nothing is evicted
+TOURNAMENT_CACHE = "tournament_cache.sqlite"
+MAX_PAIRINGS = 10 ** 7
+
+# Elo points per natural-log unit of Bradley-Terry strength, and the average rating
+ELO_SCALE = 400 / math.log(10)
+ELO_MEAN = 1500
+
+_worker_specs = None
+
+
+def _init_worker(specs: list[CharacterSpec]) -> None:
+    # Specs are sent once per worker process rather than with every chunk
+    global _worker_specs
+    _worker_specs = specs
+
+
+def _play_chunk(pairs: list[tuple[int, int, int, list[int]]], rounds: int) -> list[tuple[int, int, dict[str, int]]]:
+    """Simulate a chunk of (i, j, duels, seed) pairings; returns (i, j, counts) per pairing."""
+    played = []
+    for i, j, num_duels, seed in pairs:
+        results = batch_combat_simulation(
+            _worker_specs[i], _worker_specs[j], num_duels,
+            rounds=rounds, rng=np.random.default_rng(seed),
+        )
+        winner = results['winner']
+        played.append((i, j, {
+            'samples': num_duels,
+            'wins_1': int(np.count_nonzero(winner == 1)),
+            'wins_2': int(np.count_nonzero(winner == 2)),
+            'draws': int(np.count_nonzero(winner == 0)),
+            'killing_blows': int(np.count_nonzero(results['killing_blow'])),
+        }))
+    return played
+
+
+def play_round_robin(
+    table: np.ndarray | None = None,
+    num_duels: int = 1000,
+    rounds: int = 2,
+    cache: ResultCache | None = None,
+    workers: int | None = None,
+    chunk_size: int = 64,
+    seed: int = 0,
+) -> tuple[list[dict], MatchupCounts, dict[str, int]]:
+    """Play every loadout against every other, reusing cached pairings.
+
+    Pairings are stored in a ResultCache under matchup_key, which hashes
+    everything that decides a duel (stats, rules, weapon Strength and AP,
+    armour saves). After a profile, weapon or honor changes, only pairings
+    involving a loadout whose fingerprint changed get a new key, so only
+    those are simulated again; the rest come straight from the cache.
+
+    Each pairing's dice are seeded from seed and its key (and the samples
+    already cached), so a pairing's result doesn't depend on which other
+    pairings were replayed.
+
+    Args:
+        table: Roster table rows to enter (defaults to the full roster_table())
+        num_duels: Duels per pairing
+        rounds: Maximum number of combat rounds per duel
+        cache: ResultCache for pairings (defaults to TOURNAMENT_CACHE)
+        workers: Worker processes (defaults to the CPU count; 1 runs in-process)
+        chunk_size: Pairings per scheduled task
+        seed: Base seed for new pairings
+
+    Returns:
+        tuple containing:
+        - list[dict]: The loadouts, in matrix order
+        - MatchupCounts: Results for every pairing
+        - dict: Totals of pairings, reused and simulated pairings, and
+          changed loadouts (new or edited: none of their pairings were cached)
+    """
+    table = roster_table() if table is None else table
+    cache = ResultCache(TOURNAMENT_CACHE, max_entries=MAX_PAIRINGS) if cache is None else cache
+    specs = [row_spec(row) for row in table]
+    loadouts = [row_loadout(row) for row in table]
+
+    # Hash each loadout once, with and without its name (see matchup_key)
+    hashes = [(loadout_hash(spec), loadout_hash(spec, include_name=True), needs_name(spec)) for spec in specs]
+    keys = {}
+    for i in range(len(specs)):
+        for j in range(i + 1, len(specs)):
+            include_name = hashes[i][2] or hashes[j][2]
+            keys[(i, j)] = pair_key(hashes[i][include_name], hashes[j][include_name], rounds)
+
+    cached = cache.get_many(sorted({key for key, _ in keys.values()}))
+    counts = MatchupCounts(len(specs))
+    to_play = []
+    for (i, j), (key, swapped) in keys.items():
+        entry = cached.get(key, {'samples': 0, 'wins_1': 0, 'wins_2': 0, 'draws': 0, 'killing_blows': 0})
+        if entry['samples'] < num_duels:
+            # Seeded by content (and by the samples already cached, so top-ups don't repeat duels)
+            to_play.append((i, j, num_duels - entry['samples'], [seed, int(key[:16], 16), entry['samples']]))
+            cached[key] = entry
+        else:
+            entry = swap_counts(entry) if swapped else entry
+            counts.add(i, j, entry['wins_1'], entry['wins_2'], entry['draws'])
+
+    def record(played: list[tuple[int, int, dict[str, int]]]) -> None:
+        entries = {}
+        for i, j, new_counts in played:
+            key, swapped = keys[(i, j)]
+            entries[key] = swap_counts(new_counts) if swapped else new_counts
+            total = {name: cached[key][name] + entries[key][name] for name in ('wins_1', 'wins_2', 'draws')}
+            total = swap_counts(total) if swapped else total
+            counts.add(i, j, total['wins_1'], total['wins_2'], total['draws'])
+        cache.merge_many(entries)
+
+    chunks = [to_play[start:start + chunk_size] for start in range(0, len(to_play), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(specs)
+        for chunk in chunks:
+            record(_play_chunk(chunk, rounds))
+    elif chunks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(specs,)) as pool:
+            for played in pool.map(_play_chunk, chunks, [rounds] * len(chunks)):
+                record(played)
+
+    replayed = np.bincount([index for i, j, _, _ in to_play for index in (i, j)], minlength=len(specs))
+    stats = {
+        'pairings': len(keys),
+        'reused': len(keys) - len(to_play),
+        'simulated': len(to_play),
+        'changed': int(np.count_nonzero(replayed == len(specs) - 1)) if len(specs) > 1 else 0,
+    }
+    return loadouts, counts, stats
+
+
+def fit_bradley_terry(
+    counts: MatchupCounts,
+    prior: float = 1.0,
+    tolerance: float = 1e-9,
+    max_iterations: int = 100,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Bradley-Terry ratings on the Elo scale, with standard errors.
+
+    Maximum likelihood by Newton's method on the log-strengths, counting
+    draws as half a win for each side. Every loadout also gets prior virtual
+    games against an opponent of log-strength 0, half of them won, which
+    keeps the ratings of loadouts that win (or lose) every game finite.
+
+    Args:
+        counts: Pairing results, e.g. from play_round_robin
+        prior: Virtual games per loadout against the reference opponent
+        tolerance: Stop once no log-strength moves by more than this
+        max_iterations: Newton step cap
+
+    Returns:
+        tuple containing:
+        - np.ndarray: Elo rating of each loadout (averaging ELO_MEAN)
+        - np.ndarray: Standard error of each rating, from the Fisher information
+    """
+    games = counts.games.astype(np.float64)
+    np.fill_diagonal(games, 0.0)
+    scores = counts.wins.astype(np.float64) + counts.draws / 2
+    np.fill_diagonal(scores, 0.0)
+    scored = scores.sum(axis=1) + prior / 2
+
+    def information(theta: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Gradient of the log-likelihood and its negative Hessian (the Fisher information)
+        p = 1 / (1 + np.exp(theta[None, :] - theta[:, None]))
+        p_prior = 1 / (1 + np.exp(-theta))
+        gradient = scored - (games * p).sum(axis=1) - prior * p_prior
+        matrix = -games * p * (1 - p)
+        matrix[np.diag_indices_from(matrix)] = -matrix.sum(axis=1) + prior * p_prior * (1 - p_prior)
+        return gradient, matrix
+
+    theta = np.zeros(games.shape[0])
+    for _ in range(max_iterations):
+        gradient, matrix = information(theta)
+        step = np.linalg.solve(matrix, gradient)
+        # Damped while far from the optimum, where full Newton steps can overshoot
+        step *= min(1.0, 2.0 / max(np.max(np.abs(step)), 1e-300))
+        theta += step
+        if np.max(np.abs(step)) < tolerance:
+            break
+
+    # Covariance of the log-strengths, then of the ratings centred on their mean
+    covariance = np.linalg.inv(information(theta)[1])
+    centring = np.eye(len(theta)) - 1 / len(theta)
+    variance = np.einsum("ij,jk,ki->i", centring, covariance, centring)
+    ratings = ELO_MEAN + ELO_SCALE * (theta - theta.mean())
+    return ratings, ELO_SCALE * np.sqrt(np.maximum(variance, 0.0))
+
+
+def elo_ladder(loadouts: list[dict], counts: MatchupCounts, prior: float = 1.0, z: float = Z_95) -> list[dict]:
+    """Rank loadouts by Bradley-Terry rating.
+
+    Returns:
+        list[dict]: One row per loadout, best first, containing:
+        - rank (int): 1 for the best loadout
+        - label (str): Human-readable loadout name
+        - loadout (dict): The loadout
+        - rating (float): Elo rating
+        - std_error (float): Standard error of the rating
+        - ci_low (float): Lower bound of the rating's confidence interval
+        - ci_high (float): Upper bound of the rating's confidence interval
+        - score (float): Fraction of games won, counting draws as half
+        - games (int): Games played
+    """
+    ratings, errors = fit_bradley_terry(counts, prior=prior)
+    games = counts.games.sum(axis=1) - np.diag(counts.games)
+    scores = counts.wins.sum(axis=1) - np.diag(counts.wins) + (counts.draws.sum(axis=1) - np.diag(counts.draws)) / 2
+    ladder = [
+        {
+            'label': loadout_label(loadout),
+            'loadout': loadout,
+            'rating': float(ratings[i]),
+            'std_error': float(errors[i]),
+            'ci_low': float(ratings[i] - z * errors[i]),
+            'ci_high': float(ratings[i] + z * errors[i]),
+            'score': float(scores[i] / games[i]) if games[i] else math.nan,
+            'games': int(games[i]),
+        }
+        for i, loadout in enumerate(loadouts)
+    ]
+    ladder.sort(key=lambda row: row['rating'], reverse=True)
+    for rank, row in enumerate(ladder, start=1):
+        row['rank'] = rank
+    return ladder
+
+
+def format_ladder(ladder: list[dict], limit: int | None = None) -> str:
+    """Text table of elo_ladder results."""
+    rows = ladder if limit is None else ladder[:limit]
+    width = max([len("Loadout")] + [len(row['label']) for row in rows])
+    lines = [f"{'Rank':>4}  {'Loadout':<{width}}  {'Elo':>6}  {'+/-':>5}  {'Score':>6}  {'Games':>8}"]
+    for row in rows:
+        lines.append(
+            f"{row['rank']:>4}  {row['label']:<{width}}  {row['rating']:>6.0f}  {row['std_error']:>5.1f}  {row['score']:>6.3f}  {row['games']:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Round-robin tournament of every loadout, with an Elo ladder.")
+    parser.add_argument("--duels", type=int, default=1000, help="duels per pairing")
+    parser.add_argument("--rounds", type=int, default=2, help="maximum combat rounds per duel")
+    parser.add_argument("--cache", default=TOURNAMENT_CACHE, help="SQLite file holding played pairings")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--faction", default=None, help="only enter loadouts of this faction")
+    parser.add_argument("--no-honors", action="store_true", help="leave Elven Honor variants out")
+    parser.add_argument("--seed", type=int, default=0, help="base seed for new pairings")
+    parser.add_argument("--top", type=int, default=30, help="rows to print")
+    parser.add_argument("--output", default=None, help="write the full ladder as JSON")
+    args = parser.parse_args(argv)
+
+    table = roster_table()
+    if args.faction is not None:
+        table = table[table['faction'] == args.faction]
+    if args.no_honors:
+        table = table[table['honor'] == ""]
+    cache = ResultCache(args.cache, max_entries=MAX_PAIRINGS)
+    try:
+        loadouts, counts, stats = play_round_robin(table, args.duels, args.rounds, cache, args.workers, seed=args.seed)
+    finally:
+        cache.close()
+    ladder = elo_ladder(loadouts, counts)
+    print(f"{stats['pairings']} pairings: {stats['simulated']} simulated, {stats['reused']} from cache "
+          f"({stats['changed']} new or changed loadouts)")
+    print(format_ladder(ladder, args.top))
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(ladder, handle, indent=1)
+
+
+if __name__ == "__main__":
+    main()
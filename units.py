@@ -0,0 +1,376 @@
+from functools import lru_cache
+
+import numpy as np
+
+from batch_simulations import _d6
+from character_model import PROFILE_STATS, Character, CharacterSpec, CombatState, as_spec
+from combat_simulations import get_strike_profile
+from dice import DiceSource, as_generator
+from leadership import batch_leadership_test, break_test_reroll, break_test_target, combat_result
+
+# Model roles, in the order attacks against a unit are allocated to them
+RANK_AND_FILE = 0
+CHAMPION = 1
+CHARACTER = 2
+
+
+def make_champion(model: Character | CharacterSpec) -> CharacterSpec:
+    """Return the champion profile for a rank-and-file model: +1 Attack."""
+    spec = as_spec(model)
+    return CharacterSpec(
+        f"{spec.name} Champion",
+        SpecialRules=spec.SpecialRules,
+        Armor=spec.Armor,
+        Weapon=spec.Weapon,
+        Shield=spec.Shield,
+        Race=spec.Race,
+        **{stat: getattr(spec, stat) for stat in PROFILE_STATS if stat != "Attacks"},
+        Attacks=(spec.Attacks or 0) + 1,
+    )
+
+
+class Unit:
+    """A regiment of models held as NumPy arrays, with champion and character slots.
+
+    Models are kept in formation order: characters first, then the champion,
+    then the rank-and-file, filling the front rank from the left. Every
+    per-model value is an array indexed by model: wounds left, role, the
+    index of the model's profile in specs, and one array per profile stat
+    (WeaponSkill, Strength, ..., Attacks). Rank-and-file casualties are
+    removed from the rear, so the front rank stays full while there are
+    models to fill it.
+
+    Args:
+        name: Name of the unit
+        model: Rank-and-file profile
+        size: Number of rank-and-file models, including the champion
+        width: Number of models in each rank
+        champion: Champion profile (True for make_champion(model), None for no champion)
+        characters: Characters joining the unit's front rank
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: Character | CharacterSpec,
+        size: int,
+        width: int = 5,
+        champion: Character | CharacterSpec | bool | None = None,
+        characters: list[Character | CharacterSpec] | tuple = (),
+    ):
+        if size < 1:
+            raise ValueError(f"Unit {name} needs at least one model")
+        if width < 1:
+            raise ValueError(f"Unit {name} needs a rank width of at least 1")
+        if len(characters) >= width:
+            raise ValueError(f"Unit {name} has no front rank room for {len(characters)} character(s)")
+        if champion is True:
+            champion = make_champion(model)
+
+        self.name = name
+        self.width = width
+        self.specs = [as_spec(model)]
+        roles, profiles = [], []
+        for character in characters:
+            self.specs.append(as_spec(character))
+            roles.append(CHARACTER)
+            profiles.append(len(self.specs) - 1)
+        if champion:
+            self.specs.append(as_spec(champion))
+            roles.append(CHAMPION)
+            profiles.append(len(self.specs) - 1)
+            size -= 1
+        roles.extend([RANK_AND_FILE] * size)
+        profiles.extend([0] * size)
+
+        self.role = np.array(roles, dtype=np.int8)
+        self.profile = np.array(profiles, dtype=np.int8)
+        for stat in PROFILE_STATS:
+            values = np.array([getattr(spec, stat) or 0 for spec in self.specs], dtype=np.int16)
+            setattr(self, stat, values[self.profile])
+        self.wounds = self.Wounds.copy()
+
+    def reset(self) -> None:
+        """Restore every model to full wounds."""
+        self.wounds = self.Wounds.copy()
+
+    def copy(self) -> "Unit":
+        """Return a copy with its own wounds, sharing the immutable profiles."""
+        unit = object.__new__(Unit)
+        unit.__dict__.update(self.__dict__)
+        unit.wounds = self.wounds.copy()
+        return unit
+
+    @property
+    def alive(self) -> np.ndarray:
+        """Boolean mask of models still standing."""
+        return self.wounds > 0
+
+    @property
+    def models_remaining(self) -> int:
+        return int(np.count_nonzero(self.wounds > 0))
+
+    @property
+    def destroyed(self) -> bool:
+        return not self.wounds.any()
+
+    @property
+    def ranks(self) -> int:
+        """Number of complete ranks."""
+        return self.models_remaining // self.width
+
+    def leader(self) -> CharacterSpec | None:
+        """Living model whose Leadership the unit tests on (the highest), or None if destroyed."""
+        living = np.unique(self.profile[self.wounds > 0])
+        if not living.size:
+            return None
+        return max((self.specs[index] for index in living), key=lambda spec: spec.Leadership)
+
+    def fighting_attacks(self) -> np.ndarray:
+        """Attacks each model makes this step.
+
+        Models in the front rank fight with their full Attacks; models in the
+        second rank make a single supporting attack.
+        """
+        alive = self.wounds > 0
+        position = np.cumsum(alive) - 1  # Slot of each living model in the formation
+        front = alive & (position < self.width)
+        support = alive & (position >= self.width) & (position < 2 * self.width)
+        return np.where(front, self.Attacks, 0) + support
+
+    def target_profile(self) -> int | None:
+        """Index into specs of the models attacks are allocated to, or None if destroyed.
+
+        Attacks hit the rank-and-file, then the champion, then the characters.
+        """
+        alive = self.wounds > 0
+        for role in (RANK_AND_FILE, CHAMPION, CHARACTER):
+            living = np.flatnonzero(alive & (self.role == role))
+            if living.size:
+                return int(self.profile[living[0]])
+        return None
+
+    def take_wounds(self, profile: int, wounds: int, killing_blows: int = 0) -> int:
+        """Remove wounds from the living models of one profile, rearmost first.
+
+        Each Killing Blow slays a whole model; wounds then carry from one model
+        to the next, and any excess over the group's wounds is lost.
+
+        Args:
+            profile: Index into specs of the models taking the wounds
+            wounds: Unsaved wounds
+            killing_blows: Unsaved Killing Blows
+
+        Returns:
+            int: Wounds actually lost by the unit
+        """
+        living = np.flatnonzero((self.wounds > 0) & (self.profile == profile))[::-1]
+        before = int(self.wounds[living].sum())
+        if killing_blows:
+            self.wounds[living[:killing_blows]] = 0
+        survivors = living[killing_blows:]
+        if wounds and survivors.size:
+            remaining = self.wounds[survivors]
+            # Each model soaks up whatever the models behind it didn't
+            reaching = np.maximum(0, wounds - (np.cumsum(remaining) - remaining))
+            self.wounds[survivors] = remaining - np.minimum(remaining, reaching)
+        return before - int(self.wounds[living].sum())
+
+    def __repr__(self):
+        return f"Unit({self.name!r}, models={self.models_remaining}, width={self.width})"
+
+
+@lru_cache(maxsize=4096)
+def _strike_profile(attacker: CharacterSpec, defender: CharacterSpec, is_first_round: bool) -> dict:
+    # Specs are immutable, so a strike profile never changes for a pairing
+    return get_strike_profile(CombatState(attacker), CombatState(defender), is_first_round=is_first_round)
+
+
+def roll_attacks(profile: dict, attacks: int, rng: np.random.Generator | DiceSource) -> tuple[int, int]:
+    """Roll a block of attacks sharing one strike profile.
+
+    Unlike batch_strike, every attack is resolved on its own: each Killing
+    Blow slays one model (no armour save, but ward and regeneration apply)
+    and every other wound takes armour, ward and regeneration saves.
+
+    Args:
+        profile: Strike profile from get_strike_profile
+        attacks: Number of attacks
+        rng: NumPy random Generator (or DiceSource) used for all dice
+
+    Returns:
+        tuple containing:
+        - int: Unsaved wounds
+        - int: Unsaved Killing Blows
+    """
+    if not attacks or profile['to_wound'] is None:
+        return 0, 0
+
+    # Roll to hit, rerolling 1s and (Hatred) failed hits
+    to_hit = profile['to_hit']
+    rolls = _d6(rng, attacks)
+    if profile['reroll_ones']:
+        ones = rolls == 1
+        rolls[ones] = _d6(rng, ones.sum())
+    hits = rolls >= to_hit
+    if profile['hatred']:
+        missed = ~hits
+        rerolls = _d6(rng, missed.sum())
+        if profile['reroll_ones']:
+            ones = rerolls == 1
+            rerolls[ones] = _d6(rng, ones.sum())
+        hits[missed] = rerolls >= to_hit
+
+    # Roll to wound for the hits only; Killing Blow on any successful 6
+    wound_rolls = _d6(rng, np.count_nonzero(hits))
+    wounded = wound_rolls >= profile['to_wound']
+    killing_blow = wounded & (wound_rolls == 6) if profile['killing_blow'] else np.zeros_like(wounded)
+    wounded &= ~killing_blow
+
+    # Armour saves, with Armor Bane on wound rolls of 6
+    save_target = profile['save_target'] or 7
+    save_target_ab = profile['save_target_ab'] or 7
+    if min(save_target, save_target_ab) <= 6:
+        targets = np.where(wound_rolls[wounded] == 6, save_target_ab, save_target)
+        wounds = int(np.count_nonzero(_d6(rng, targets.size) < targets))
+    else:
+        wounds = int(np.count_nonzero(wounded))
+    killing_blows = int(np.count_nonzero(killing_blow))
+
+    # Ward then regeneration saves against everything that got through
+    for target in (profile['ward_target'], profile['regen_target']):
+        if target is not None:
+            wounds -= int(np.count_nonzero(_d6(rng, wounds) >= target))
+            killing_blows -= int(np.count_nonzero(_d6(rng, killing_blows) >= target))
+    return wounds, killing_blows
+
+
+def _strike_step(spec: CharacterSpec) -> tuple[int, int]:
+    # Higher steps strike first: Strike First, then no rule, then Strike Last, each by Initiative
+    rules = spec.compiled_rules
+    priority = 1 if rules.strike_first else -1 if rules.strike_last else 0
+    return priority, spec.Initiative or 0
+
+
+def unit_combat_round(
+    unit_1: Unit,
+    unit_2: Unit,
+    rng: DiceSource | np.random.Generator | int | None = None,
+    is_first_round: bool = True,
+) -> dict[str, int]:
+    """Fight one round of combat between two units, modifying both.
+
+    Models strike in steps ordered by Strike First/Last and Initiative; all
+    models at the same step strike simultaneously, and casualties are
+    removed before the next step, so models slain early don't strike back.
+    All attacks of one profile at one step are rolled as a single block.
+
+    Args:
+        unit_1: First unit
+        unit_2: Second unit
+        rng: DiceSource or NumPy random Generator, or a seed for a new one
+        is_first_round: Whether this is the first round (weapon bonuses, Hatred)
+
+    Returns:
+        dict containing:
+        - wounds_1 (int): Wounds caused by unit_1
+        - wounds_2 (int): Wounds caused by unit_2
+    """
+    # A DiceSource is kept, rather than unwrapped, so its rolls count the dice
+    rng = rng if isinstance(rng, DiceSource) else as_generator(rng)
+    units = ((unit_1, unit_2), (unit_2, unit_1))
+    steps = sorted({_strike_step(spec) for unit in (unit_1, unit_2) for spec in unit.specs}, reverse=True)
+    caused = [0, 0]
+    for step in steps:
+        # Roll every strike at this step before any casualties are removed
+        strikes = []
+        for side, (attacker, defender) in enumerate(units):
+            target = defender.target_profile()
+            if target is None:
+                continue
+            attacks = np.bincount(attacker.profile, weights=attacker.fighting_attacks(), minlength=len(attacker.specs))
+            for index, spec in enumerate(attacker.specs):
+                if attacks[index] and _strike_step(spec) == step:
+                    profile = _strike_profile(spec, defender.specs[target], is_first_round)
+                    strikes.append((side, defender, target, *roll_attacks(profile, int(attacks[index]), rng)))
+        for side, defender, target, wounds, killing_blows in strikes:
+            caused[side] += defender.take_wounds(target, wounds, killing_blows)
+    return {'wounds_1': caused[0], 'wounds_2': caused[1]}
+
+
+def unit_combat(
+    unit_1: Unit,
+    unit_2: Unit,
+    rounds: int = 3,
+    rng: DiceSource | np.random.Generator | int | None = None,
+    leadership: bool = False,
+) -> dict[str, int]:
+    """Fight up to rounds rounds of combat between two units.
+
+    The units passed in are not modified; the combat runs on copies.
+
+    Args:
+        unit_1: First unit
+        unit_2: Second unit
+        rounds: Maximum number of combat rounds
+        rng: DiceSource or NumPy random Generator, or a seed for a new one
+        leadership: Whether the loser of each round takes a break test
+
+    Returns:
+        dict containing:
+        - winner (int): 1 or 2 for the winning unit, 0 for a draw
+        - rounds (int): Number of rounds fought
+        - wounds_1 (int): Total wounds caused by unit_1
+        - wounds_2 (int): Total wounds caused by unit_2
+        - models_1 (int): Models left in unit_1
+        - models_2 (int): Models left in unit_2
+        - fled (bool): Whether the combat ended with the loser fleeing
+
+    Victory Conditions:
+        - A unit wins when the other is destroyed
+        - With leadership, a unit wins when the other fails a break test after
+          losing a round on combat result (wounds caused plus rank bonus)
+        - Otherwise the unit that caused more wounds wins
+        - Draw if both caused the same number of wounds (or both are destroyed)
+    """
+    rng = rng if isinstance(rng, DiceSource) else as_generator(rng)
+    unit_1, unit_2 = unit_1.copy(), unit_2.copy()
+    wounds_1 = wounds_2 = 0
+    rounds_fought = 0
+    fled = None
+    for r in range(rounds):
+        rounds_fought = r + 1
+        ranks = (unit_1.ranks, unit_2.ranks)
+        result = unit_combat_round(unit_1, unit_2, rng, is_first_round=(r == 0))
+        wounds_1 += result['wounds_1']
+        wounds_2 += result['wounds_2']
+        if unit_1.destroyed or unit_2.destroyed:
+            break
+        if leadership:
+            lost_by = combat_result(result['wounds_2'], ranks[1]) - combat_result(result['wounds_1'], ranks[0])
+            if lost_by:
+                loser = unit_1 if lost_by > 0 else unit_2
+                leader = loser.leader()
+                target = break_test_target(leader, leader.Leadership, abs(lost_by))
+                # Passed or failed straight from the pass probability: no dice are rolled
+                if not batch_leadership_test(target, 1, as_generator(rng), break_test_reroll(leader))[0]:
+                    fled = 1 if lost_by > 0 else 2
+                    break
+
+    if fled is not None:
+        winner = 3 - fled
+    elif unit_1.destroyed != unit_2.destroyed:
+        winner = 2 if unit_1.destroyed else 1
+    elif wounds_1 != wounds_2 and not unit_1.destroyed:
+        winner = 1 if wounds_1 > wounds_2 else 2
+    else:
+        winner = 0
+    return {
+        'winner': winner,
+        'rounds': rounds_fought,
+        'wounds_1': wounds_1,
+        'wounds_2': wounds_2,
+        'models_1': unit_1.models_remaining,
+        'models_2': unit_2.models_remaining,
+        'fled': fled is not None,
+    }
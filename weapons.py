@@ -1,5 +1,14 @@
-from faction_profiles import *
-from special_rules import *
+from item_index import build_alias_index, lookup_alias
+from special_rules import (
+    FirstRoundOnly,
+    FirstRoundStr,
+    KillingBlow6,
+    Magic,
+    RequiresTwoHands,
+    RerollHits1,
+    StrikeFirst,
+    StrikeLast,
+)
 
 # Special rules can include: "+1A" for +1 Attack
 MeleeWeaponDict = {
@@ -21,37 +30,37 @@ MeleeWeaponDict = {
     
 }
 
+# Alias -> MeleeWeaponDict key, and key -> (strength_bonus, armour_piercing, special_rules)
+WeaponIndex = build_alias_index(MeleeWeaponDict)
+WeaponStats = {
+    key: (data[0], data[1], data[2] if data[2] else [])
+    for key, data in MeleeWeaponDict.items()
+}
+
+
 def find_weapon_key(weapon):
-    """Return the MeleeWeaponDict key tuple that contains the given weapon name, or None."""
-    for key in MeleeWeaponDict:
-        if weapon in key:
-            return key
-    return None
+    """Return the MeleeWeaponDict key tuple that contains the given weapon name, or None.
+    Matching is case and whitespace insensitive.
+    """
+    return lookup_alias(WeaponIndex, weapon)
 
 
 def get_weapon_stats(weapon, raise_on_missing=True):
     """Return (strength_bonus, armour_piercing, special_rules) for a weapon name.
     If raise_on_missing is True, raise ValueError when weapon not found.
     """
-    key = find_weapon_key(weapon)
+    key = lookup_alias(WeaponIndex, weapon)
     if key is None:
         if raise_on_missing:
             raise ValueError(f"Weapon '{weapon}' not found in MeleeWeaponDict")
         return (None, 0, [])
-    data = MeleeWeaponDict[key]
-    strength_bonus = data[0]
-    armour_piercing = data[1]
-    rules = data[2] if data[2] else []
-    return (strength_bonus, armour_piercing, rules)
+    return WeaponStats[key]
 
 
 def get_weapon_special_rules(weapon):
     # Return normalized list of special rules, don't raise on missing by default
-    try:
-        _, _, rules = get_weapon_stats(weapon, raise_on_missing=False)
-        return rules
-    except Exception:
-        return []
+    _, _, rules = get_weapon_stats(weapon, raise_on_missing=False)
+    return rules
 
 def get_weapon_strength_bonus(weapon, raise_on_missing=True):
     """Return the weapon's strength bonus (or None)."""
@@ -63,3 +72,39 @@ def get_weapon_ap(weapon, raise_on_missing=True):
     """Return the weapon's armour-piercing value (int, may be negative or 0)."""
     _, ap, _ = get_weapon_stats(weapon, raise_on_missing=raise_on_missing)
     return ap
+
+
+# Ranged weapons: [range in inches, strength (None uses the shooter's), armour piercing, special rules]
+RangedWeaponDict = {
+    ("Shortbow", "Short Bow"): [18, 3, 0, None],  # Shortbow, 18", Strength 3
+    ("Longbow", "Long Bow", "Bow"): [30, 3, 0, None],  # Longbow, 30", Strength 3
+    ("Warbow", "War Bow"): [30, 3, 0, ["AB1", "Volley Fire"]],  # Warbow, 30", Strength 3, Armour Bane 1, Volley Fire
+    ("Crossbow",): [30, 4, -1, None],  # Crossbow, 30", Strength 4, -1 Armor Piercing
+    ("Bow of Avelorn", "BowofAvelorn"): [30, 4, -1, [Magic, "Volley Fire"]],  # Bow of Avelorn, 30", Strength 4, -1 Armor Piercing, Magic
+}
+
+# Alias -> RangedWeaponDict key, and key -> (range, strength, armour_piercing, special_rules)
+RangedWeaponIndex = build_alias_index(RangedWeaponDict)
+RangedWeaponStats = {
+    key: (data[0], data[1], data[2], data[3] if data[3] else [])
+    for key, data in RangedWeaponDict.items()
+}
+
+
+def find_ranged_weapon_key(weapon):
+    """Return the RangedWeaponDict key tuple that contains the given weapon name, or None.
+    Matching is case and whitespace insensitive.
+    """
+    return lookup_alias(RangedWeaponIndex, weapon)
+
+
+def get_ranged_weapon_stats(weapon, raise_on_missing=True):
+    """Return (range, strength, armour_piercing, special_rules) for a ranged weapon name.
+    If raise_on_missing is True, raise ValueError when weapon not found.
+    """
+    key = lookup_alias(RangedWeaponIndex, weapon)
+    if key is None:
+        if raise_on_missing:
+            raise ValueError(f"Weapon '{weapon}' not found in RangedWeaponDict")
+        return None
+    return RangedWeaponStats[key]